@@ -12,7 +12,9 @@ from decouple import config
 from queue import Empty, Queue
 from sentry_sdk.integrations.logging import LoggingIntegration
 
+from clients.ai_client.ai_client import AIClient
 from graph import SDRAgent
+from knowledge_base import knowledge_base_cache
 
 @st.cache_resource
 def install_playwright():
@@ -25,6 +27,22 @@ def install_playwright():
         print(f"Error installing playwright: {e}")
 
 install_playwright()
+
+
+@st.cache_resource
+def preload_prompts():
+    AIClient.preload_prompts()
+
+
+preload_prompts()
+
+
+@st.cache_resource
+def preload_knowledge_base():
+    knowledge_base_cache.preload()
+
+
+preload_knowledge_base()
 SENTRY_DSN = config('SENTRY_DSN')
 
 if SENTRY_DSN:
@@ -48,7 +66,7 @@ def execute_graph_async(linkedin_url, email, progress_queue):
         graph_agent = SDRAgent(progress_callback)
 
         # Execute the graph
-        success, message = graph_agent.invoke_graph(linkedin_url, email)
+        success, message = graph_agent.invoke_graph(linkedin_url, email, stream_sections=True)
 
         # Send final result
         progress_queue.put({
@@ -78,6 +96,21 @@ def check_progress():
                 status_data = update['data']
                 st.session_state.progress_messages.append(status_data)
 
+            elif update['type'] == 'token':
+                # Tokens of a new prompt (e.g. the citations pass) replace the section's draft
+                token_data = update['data']
+                draft = st.session_state.section_drafts.get(token_data['section'])
+                if not draft or draft['prompt'] != token_data['prompt']:
+                    draft = {'prompt': token_data['prompt'], 'text': ""}
+                draft['text'] += token_data['text']
+                st.session_state.section_drafts[token_data['section']] = draft
+
+            elif update['type'] == 'section':
+                section_data = update['data']
+                st.session_state.section_drafts.pop(section_data['section'], None)
+                if section_data['markdown']:
+                    st.session_state.report_sections[section_data['section']] = section_data['markdown']
+
             elif update['type'] == 'complete':
                 # Handle completion
                 st.session_state.api_call_status = update['success']
@@ -93,6 +126,21 @@ def check_progress():
         pass
 
 
+def render_report_sections():
+    """Show the report sections finished so far, followed by the ones still being written"""
+    if not st.session_state.report_sections and not st.session_state.section_drafts:
+        return
+
+    st.markdown("**Report preview:**")
+    for markdown in st.session_state.report_sections.values():
+        st.markdown(markdown)
+
+    for section, draft in st.session_state.section_drafts.items():
+        title = section.removeprefix("process_").replace("_", " ").capitalize()
+        st.markdown(f"*Writing {title}...*")
+        st.markdown(draft['text'])
+
+
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
 
@@ -113,6 +161,10 @@ if 'current_step' not in st.session_state:
     st.session_state.current_step = ""
 if 'progress_messages' not in st.session_state:
     st.session_state.progress_messages = []
+if 'report_sections' not in st.session_state:
+    st.session_state.report_sections = {}
+if 'section_drafts' not in st.session_state:
+    st.session_state.section_drafts = {}
 
 
 # --- Callback for starting search ---
@@ -143,6 +195,8 @@ def reset():
     st.session_state.linkedin_url = ""
     st.session_state.email = ""
     st.session_state.progress_messages = []
+    st.session_state.report_sections = {}
+    st.session_state.section_drafts = {}
     st.session_state.progress_queue = Queue()
 
 
@@ -568,6 +622,8 @@ if st.session_state.authenticated:
                                 unsafe_allow_html=True
                             )
 
+                    render_report_sections()
+
                     # If still running, rerun after a short delay
                     if st.session_state.run_search:
                         time.sleep(1)
@@ -582,6 +638,7 @@ if st.session_state.authenticated:
                         unsafe_allow_html=True,
                     )
 
+                render_report_sections()
                 st.button("🔁 Start Over", on_click=reset)
 
         # Close the gray box
@@ -0,0 +1,179 @@
+"""
+Generate SDR reports for many prospects concurrently.
+
+The input is a CSV (with a header row) or JSONL file with `linkedin_url` and `email` fields and an optional
+`run_id`. Every prospect runs the async SDRAgent graph in a shared event loop, while calls to each external
+provider are bounded separately (see `provider_limits`). One JSON line per prospect is appended to the
+manifest as soon as it finishes.
+
+Usage:
+    python batch.py prospects.csv --manifest manifest.jsonl --prospects 20 --limit proxycurl=5 --limit openrouter=30
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from clients.ai_client.ai_client import AIClient
+from clients.serp.scholar_matcher import scholar_author_matcher
+from company_cache import company_cache
+from graph import CHECKPOINT_DB_PATH, SDRAgent
+from knowledge_base import knowledge_base_cache
+from linkedin_profile_cache import linkedin_profile_cache
+from provider_limits import configure_provider_limits, provider_limits
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT_PROSPECTS = 10
+
+
+def load_prospects(input_path):
+    """
+    Read prospects from a CSV or JSONL file, skipping rows without a LinkedIn URL or email.
+    """
+    input_path = Path(input_path)
+    with input_path.open(newline="", encoding="utf-8") as input_file:
+        if input_path.suffix.lower() in (".jsonl", ".ndjson"):
+            rows = [json.loads(line) for line in input_file if line.strip()]
+        else:
+            rows = list(csv.DictReader(input_file))
+
+    prospects = []
+    for row in rows:
+        linkedin_url = (row.get("linkedin_url") or "").strip()
+        email = (row.get("email") or "").strip()
+        if linkedin_url and email:
+            prospects.append({"linkedin_url": linkedin_url, "email": email, "run_id": row.get("run_id") or None})
+        else:
+            logger.warning("Skipping prospect without linkedin_url or email: %s", row)
+
+    return prospects
+
+
+def prospect_run_id(batch_id, linkedin_url, email):
+    """
+    Derive a stable run id, so re-running a batch resumes failed prospects and skips completed ones.
+    """
+    digest = hashlib.sha1(f"{linkedin_url}|{email}".encode("utf-8")).hexdigest()[:16]
+    return f"{batch_id}-{digest}"
+
+
+def _progress_logger(linkedin_url):
+    def progress_callback(msg_type, data):
+        if msg_type == "status":
+            logger.info("%s %s", linkedin_url, data["message"])
+
+    return progress_callback
+
+
+async def _run_prospect(prospect, batch_id, prospects_semaphore, manifest_file, checkpointer):
+    run_id = prospect["run_id"] or prospect_run_id(batch_id, prospect["linkedin_url"], prospect["email"])
+    queued_at = time.monotonic()
+
+    async with prospects_semaphore:
+        started_at = datetime.now(timezone.utc)
+        start = time.monotonic()
+        agent = SDRAgent(_progress_logger(prospect["linkedin_url"]))
+        status, message = await agent.ainvoke_graph(
+            prospect["linkedin_url"], prospect["email"], run_id=run_id, checkpointer=checkpointer
+        )
+        duration = time.monotonic() - start
+
+    result = {
+        "linkedin_url": prospect["linkedin_url"],
+        "email": prospect["email"],
+        "run_id": run_id,
+        "status": "succeeded" if status == 200 else "failed",
+        "message": message,
+        "started_at": started_at.isoformat(),
+        "queued_seconds": round(start - queued_at, 3),
+        "duration_seconds": round(duration, 3),
+    }
+    manifest_file.write(json.dumps(result) + "\n")
+    manifest_file.flush()
+    logger.info("%s %s in %.1fs", prospect["linkedin_url"], result["status"], duration)
+
+    return result
+
+
+async def arun_batch(input_path, manifest_path, max_concurrent_prospects=DEFAULT_MAX_CONCURRENT_PROSPECTS,
+                     provider_limits=None, batch_id=None):
+    """
+    Run the SDRAgent graph for every prospect in `input_path` and return the manifest records.
+    `provider_limits` maps provider names (proxycurl, apify, serp, openrouter, sendgrid, crawl4ai) to
+    their maximum number of concurrent calls.
+    """
+    if provider_limits:
+        configure_provider_limits(provider_limits)
+
+    await asyncio.to_thread(AIClient.preload_prompts)
+    await asyncio.to_thread(knowledge_base_cache.preload)
+    prospects = load_prospects(input_path)
+    batch_id = batch_id or Path(input_path).stem
+    prospects_semaphore = asyncio.Semaphore(max_concurrent_prospects)
+
+    # Every prospect checkpoints through the same saver rather than opening the database once per prospect.
+    async with AsyncSqliteSaver.from_conn_string(CHECKPOINT_DB_PATH) as checkpointer:
+        with open(manifest_path, "a", encoding="utf-8") as manifest_file:
+            results = await asyncio.gather(*(
+                _run_prospect(prospect, batch_id, prospects_semaphore, manifest_file, checkpointer)
+                for prospect in prospects
+            ))
+
+    succeeded = sum(result["status"] == "succeeded" for result in results)
+    logger.info("Batch %s finished: %s/%s prospects succeeded", batch_id, succeeded, len(results))
+    logger.info("LinkedIn profile cache: %s", linkedin_profile_cache.stats())
+    logger.info("Company cache: %s", company_cache.stats())
+    logger.info("Google Scholar author matches: %s", scholar_author_matcher.stats())
+
+    return results
+
+
+def run_batch(input_path, manifest_path, max_concurrent_prospects=DEFAULT_MAX_CONCURRENT_PROSPECTS,
+              provider_limits=None, batch_id=None):
+    """
+    Blocking wrapper around `arun_batch`.
+    """
+    return asyncio.run(
+        arun_batch(input_path, manifest_path, max_concurrent_prospects, provider_limits, batch_id)
+    )
+
+
+def _parse_limit(value):
+    provider, _, limit = value.partition("=")
+    provider = provider.strip().lower()
+    if not limit.isdigit() or int(limit) < 1:
+        raise argparse.ArgumentTypeError(f"Expected PROVIDER=N with N >= 1, got '{value}'")
+    if provider not in provider_limits:
+        raise argparse.ArgumentTypeError(
+            f"Unknown provider '{provider}', expected one of: {', '.join(sorted(provider_limits))}"
+        )
+    return provider, int(limit)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate SDR reports for a batch of prospects.")
+    parser.add_argument("input", help="CSV or JSONL file with linkedin_url and email columns")
+    parser.add_argument("--manifest", default="batch_manifest.jsonl", help="results manifest (JSONL, appended)")
+    parser.add_argument("--prospects", type=int, default=DEFAULT_MAX_CONCURRENT_PROSPECTS,
+                        help="maximum number of prospects processed at once")
+    parser.add_argument("--limit", type=_parse_limit, action="append", default=[], metavar="PROVIDER=N",
+                        help="maximum concurrent calls to a provider, e.g. --limit proxycurl=5 (repeatable)")
+    parser.add_argument("--batch-id", help="prefix of the derived run ids (defaults to the input file name)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    results = run_batch(args.input, args.manifest, args.prospects, dict(args.limit), args.batch_id)
+
+    return 0 if all(result["status"] == "succeeded" for result in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
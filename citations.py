@@ -0,0 +1,100 @@
+import re
+from collections import namedtuple
+
+CITATION_INSTRUCTIONS = (
+    "Cite your sources inline: right after each statement, add the id of the source it is based on in square "
+    "brackets, e.g. [2] or [2][4]. Only use the ids listed below and do not add a reference list.\n"
+    "Sources:\n{sources}"
+)
+
+# A group of citation ids such as [2], [2, 4], [2-4] or [^2], but not the text of a markdown link ([2](url)).
+CITATION_GROUP_PATTERN = re.compile(r"(\s?)\[\^?(\d+(?:\s*(?:,|;|-|–)\s*\d+)*)\](?!\()")
+CITATION_RUN_PATTERN = re.compile(r"\[\d+\](?:\s*\[\d+\])+")
+
+
+def citation_ids(context):
+    """
+    Return the citation ids of a citation context, whose keys look like "[3]".
+    """
+    return {int(key.strip("[]")) for key in context if key.strip("[]").isdigit()}
+
+
+def _expand_ids(group):
+    ids = []
+    for part in re.split(r"\s*[,;]\s*", group):
+        bounds = re.split(r"\s*[-–]\s*", part)
+        if len(bounds) == 2 and int(bounds[0]) <= int(bounds[1]):
+            ids.extend(range(int(bounds[0]), int(bounds[1]) + 1))
+        else:
+            ids.extend(int(bound) for bound in bounds)
+    return ids
+
+
+def repair_citations(text, valid_ids):
+    """
+    Check the [n] references of generated text against the citation ids the section may use. Groups and
+    ranges are rewritten as separate markers ([2, 4] -> [2][4]), unknown ids are removed and repeated markers
+    are collapsed ([2] [2][3] -> [2][3]). Returns the repaired text and the list of removed ids.
+    """
+    removed_ids = []
+
+    def repair(match):
+        ids = []
+        for citation_id in _expand_ids(match.group(2)):
+            if citation_id in valid_ids:
+                if citation_id not in ids:
+                    ids.append(citation_id)
+            else:
+                removed_ids.append(citation_id)
+
+        return match.group(1) + "".join(f"[{citation_id}]" for citation_id in ids) if ids else ""
+
+    def collapse(match):
+        return "".join(f"[{citation_id}]" for citation_id in dict.fromkeys(re.findall(r"\d+", match.group(0))))
+
+    repaired_text = CITATION_GROUP_PATTERN.sub(repair, text)
+    return CITATION_RUN_PATTERN.sub(collapse, repaired_text), removed_ids
+
+
+Citation = namedtuple("Citation", ["id", "kind", "source", "company"])
+
+
+class CitationRegistry:
+    """
+    Citation ids of the sources of a report, assigned once in citation order. Sources are the rows and lists
+    the AIClient holds and are looked up by identity, so no lookup compares their content. Empty sources get
+    no id.
+    """
+
+    def __init__(self):
+        self.citations = []
+        self._ids = {}
+
+    def add(self, kind, source, company=None):
+        """
+        Register a source of the given kind ("profile", "company", "website", "posts", "comments",
+        "publications" or "news"). A website keeps the company row it belongs to, for its reference name.
+        """
+        if not source or id(source) in self._ids:
+            return None
+
+        citation = Citation(len(self.citations) + 1, kind, source, company)
+        self.citations.append(citation)
+        self._ids[id(source)] = citation.id
+        return citation.id
+
+    def id_of(self, source):
+        return self._ids.get(id(source))
+
+    def key_of(self, source):
+        citation_id = self.id_of(source)
+        return f"[{citation_id}]" if citation_id else None
+
+    def __getitem__(self, citation_id):
+        return self.citations[citation_id - 1]
+
+    def __iter__(self):
+        return iter(self.citations)
+
+    def __len__(self):
+        return len(self.citations)
@@ -1,16 +1,52 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+
 import dotenv
 from decouple import config
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.runnables.config import ensure_config
 from langchain_openai import ChatOpenAI
-from langsmith import Client as LangSmithClient
 
-from clients.web_scrapper_client.web_scrapper_client import WebsiteCrawler
-from pydantic_models import ScholarProfile, GoogleNews, AvailableNews
+from citations import CITATION_INSTRUCTIONS, CitationRegistry, citation_ids, repair_citations
+from clients.proxy_curl.linkedin_profile import recent_company_urls
+from clients.serp.news_ranker import NEWS_LOCAL_RANKING, NEWS_TOP_COUNT, rank_news
+from clients.web_scrapper_client.web_scrapper_client import acrawl_pages, crawl_pages
+from company_cache import company_cache, company_key, profile_keys
+from context_packer import CONTEXT_PACKING_ENABLED, pack_context
+from context_serializer import COMPACT_CONTEXT_ENABLED, serialize_context
+from deadlines import provider_timeout
+from instrumentation import record_llm_usage, span
+from knowledge_base import knowledge_base_cache
+from node_cache import fingerprint, node_result_cache
+from prompt_layout import (
+    SHARED_PREFIX_BUDGET, SHARED_PREFIX_LAYOUT, reference_shared_values, shared_prefix_message,
+)
+from prompt_registry import prompt_registry
+from provider_limits import aprovider_slot, provider_slot
+from pydantic_models import ScholarProfile, GoogleNews, GoogleNewsConfig, AvailableNews
 from streamlit_styles import processing_spinner_style
-from supabase_client import supabase_client
+from supabase_client import get_async_supabase_client, supabase_client
+from website_digest import (
+    WEBSITE_DIGEST_ENABLED, WEBSITE_DIGEST_PROMPT_NAME, combine_digest, digest_chunk_inputs, needs_digest,
+)
 
 dotenv.load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# News section of prospects without any Google News result about them.
+NO_RELEVANT_NEWS = "### Google News\nNo relevant news about the prospect was found.\n"
+
+# Generate sections with inline citations in one LLM call instead of a second `add_citations_chain_prompt` pass.
+SINGLE_PASS_CITATIONS = config("SINGLE_PASS_CITATIONS", default=True, cast=bool)
+
+# Citation context function of the section being generated (sections run concurrently on one AIClient).
+_citation_context_function = ContextVar("citation_context_function", default=None)
+
 
 class AIClient:
     """
@@ -19,41 +55,178 @@ class AIClient:
     opportunities, and suggested outreach strategies.
     """
 
+    # Every LangSmith prompt the chains use, preloaded into the prompt registry at startup.
+    PROMPT_NAMES = [
+        "about_company_chain_prompt", "add_citations_chain_prompt", "engagement_highlights_chain_prompt",
+        "engagement_style_chain_prompt", "google_scholar_profile_chain_prompt", "linkedin_data_chain_prompt",
+        "markdown_news_chain_prompt", "news_available_chain_prompt", "news_chain_prompt", "objection_handling_prompt",
+        "opportunities_chain_prompt", "outreach_email_chain_prompt", "publications_chain_prompt",
+        "suggested_additional_outreach_chain_prompt", "talking_point_chain_prompt",
+        "trigger_events_and_timing_chain_prompt",
+    ]
+
+    SDR_DATA_SELECT = """
+        *,
+        sdr_agent_companylinkedinprofile(*, sdr_agent_companywebsite(*)),
+        sdr_agent_linkedinpost(*, sdr_agent_linkedinpostreaction(*)),
+        sdr_agent_linkedincomment(*),
+        sdr_agent_googlenews(*),
+        sdr_agent_googlescholarprofile(*, sdr_agent_googlepublication(*))
+        """
+
     def __init__(self, linkedin_profile_id):
-        self.langsmith_client = LangSmithClient(api_key=config("LANGSMITH_API_KEY"))
+        self._initialize_clients()
+        self._initialize_sdr_data(linkedin_profile_id)
+
+    @classmethod
+    def preload_prompts(cls):
+        """
+        Load every prompt into the process-wide registry, so that no chain waits for LangSmith.
+        """
+        prompt_registry.preload(cls.PROMPT_NAMES)
+
+    @classmethod
+    def for_author_matching(cls, linkedin_profile):
+        """
+        This method creates a client that only knows the prospect's LinkedIn profile, which is all the Google
+        Scholar author matching needs, without loading the rest of the prospect data. `load_sdr_data` turns it
+        into a full client, keeping its model and prompts.
+        """
+        ai_client = cls.__new__(cls)
+        ai_client._initialize_clients()
+        ai_client.linkedin_profile = linkedin_profile
+        return ai_client
+
+    def load_sdr_data(self, linkedin_profile_id):
+        self._initialize_sdr_data(linkedin_profile_id)
+
+    async def aload_sdr_data(self, linkedin_profile_id):
+        await self._ainitialize_sdr_data(linkedin_profile_id)
+
+    def _profile_from_state(self, state):
+        """
+        This method nests the records the fetch nodes stored, as found in the graph state, the way
+        `SDR_DATA_SELECT` returns them. Records are copied, so the state is left untouched.
+        """
+        websites = [dict(website) for websites in state.get("company_websites") or [] for website in websites or []]
+        scholar_profile = state.get("google_scholar_profile")
+        publications = [dict(publication) for publication in state.get("google_publications") or []]
+        return {
+            **state["linkedin_profile"],
+            "sdr_agent_companylinkedinprofile": [
+                {
+                    **company,
+                    "sdr_agent_companywebsite": [
+                        website for website in websites if website.get("company_profile_id") == company.get("id")
+                    ],
+                }
+                for company in state.get("linkedin_company_profiles") or []
+            ],
+            "sdr_agent_linkedinpost": [dict(post) for post in state.get("linkedin_posts") or []],
+            "sdr_agent_linkedincomment": [dict(comment) for comment in state.get("linkedin_comments") or []],
+            "sdr_agent_googlenews": [dict(news) for news in state.get("google_news") or []],
+            "sdr_agent_googlescholarprofile": {
+                **scholar_profile,
+                "sdr_agent_googlepublication": publications,
+            } if scholar_profile else None,
+        }
+
+    def load_sdr_data_from_state(self, state):
+        """
+        This method loads the prospect data from the records the fetch nodes just stored, instead of reading
+        them back from Supabase with `load_sdr_data`.
+        """
+        if self._set_sdr_data(self._profile_from_state(state)):
+            self._load_knowledge_base()
+
+    async def aload_sdr_data_from_state(self, state):
+        if self._set_sdr_data(self._profile_from_state(state)):
+            await self._aload_knowledge_base()
+
+    def _initialize_clients(self):
         self.model = ChatOpenAI(
             base_url="https://openrouter.ai/api/v1",
             model="google/gemini-2.5-flash-preview-04-17",
             api_key=config("OPEN_ROUTER_API_KEY"),
-            temperature=0
+            temperature=0,
+            timeout=provider_timeout("openrouter"),
         )
         self.news_availability = False
+        self.context_reports = {}
+        self._shared_prefix = None
+        self.sdr_data_loaded = False
         processing_spinner_style()
-        self._initialize_sdr_data(linkedin_profile_id)
 
     def _initialize_sdr_data(self, linkedin_profile_id):
         profile = (
             supabase_client.table("sdr_agent_linkedinprofile")
-            .select(
-                """
-                *,
-                sdr_agent_companylinkedinprofile(*, sdr_agent_companywebsite(*)),
-                sdr_agent_linkedinpost(*, sdr_agent_linkedinpostreaction(*)),
-                sdr_agent_linkedincomment(*),
-                sdr_agent_googlenews(*),
-                sdr_agent_googlescholarprofile(*, sdr_agent_googlepublication(*))
-                """
-            )
+            .select(self.SDR_DATA_SELECT)
+            .eq("id", linkedin_profile_id)
+            .single()
+            .execute()
+        ).data
+
+        if profile:
+            self._add_shared_companies(profile, [company_cache.get(key) for key in self._shared_company_keys(profile)])
+        if self._set_sdr_data(profile):
+            self._load_knowledge_base()
+
+    @staticmethod
+    def _shared_company_keys(profile):
+        """
+        This method returns the cache keys of the prospect's current companies that are not linked to the
+        profile. Company rows shared from another prospect keep that prospect's `linkedin_profile_id`, so
+        `SDR_DATA_SELECT` does not return them; the company cache does, within its TTL.
+        """
+        linked_keys = {
+            key for company in profile.get("sdr_agent_companylinkedinprofile") or [] for key in profile_keys(company)
+        }
+        keys = [company_key(url) for url in recent_company_urls(profile)]
+        return [key for key in dict.fromkeys(keys) if key and key not in linked_keys]
+
+    @staticmethod
+    def _add_shared_companies(profile, shared_companies):
+        companies = profile.get("sdr_agent_companylinkedinprofile") or []
+        company_ids = {company.get("id") for company in companies}
+        for shared_company in filter(None, shared_companies):
+            if shared_company.profile["id"] not in company_ids:
+                company_ids.add(shared_company.profile["id"])
+                companies.append({**shared_company.profile, "sdr_agent_companywebsite": shared_company.websites})
+        profile["sdr_agent_companylinkedinprofile"] = companies
+
+    def _load_knowledge_base(self):
+        # Pre-serialized fields of the process-wide knowledge base snapshot, identical for every report.
+        self.knowledge_base = knowledge_base_cache.get().fields
+
+    async def _aload_knowledge_base(self):
+        self.knowledge_base = (await knowledge_base_cache.aget()).fields
+
+    async def _ainitialize_sdr_data(self, linkedin_profile_id):
+        async_supabase_client = await get_async_supabase_client()
+        profile = (
+            await async_supabase_client.table("sdr_agent_linkedinprofile")
+            .select(self.SDR_DATA_SELECT)
             .eq("id", linkedin_profile_id)
             .single()
             .execute()
         ).data
 
+        if profile:
+            shared_companies = await asyncio.gather(
+                *(company_cache.aget(key) for key in self._shared_company_keys(profile))
+            )
+            self._add_shared_companies(profile, shared_companies)
+        if self._set_sdr_data(profile):
+            await self._aload_knowledge_base()
+
+    def _set_sdr_data(self, profile):
+        self.sdr_data_loaded = True
         if not profile:
             print("Failed to fetch LinkedIn profile:", profile.error)
             self.linkedin_profile = None
             self.companies = self.posts = self.comments = self.google_news = self.publications = self.companies_websites = []
-            return
+            self.citations = CitationRegistry()
+            return False
 
         self.linkedin_profile = profile
         self.companies = profile.get("sdr_agent_companylinkedinprofile", [])
@@ -78,34 +251,248 @@ class AIClient:
         for redundant_linkedin_profile_item in remove_linkedin_profile_items:
             self.linkedin_profile.pop(redundant_linkedin_profile_item, None)
 
-        self.citation_list = [
-            source for source in (
-                    [self.linkedin_profile] +
-                    self.companies +
-                    self.companies_websites +
-                    [self.posts, self.comments, self.publications, self.google_news]
-            ) if source
+        self.citations = CitationRegistry()
+        self.citations.add("profile", self.linkedin_profile)
+        for company in self.companies:
+            self.citations.add("company", company)
+        for company in self.companies:
+            for website in company.get("sdr_agent_companywebsite", []):
+                self.citations.add("website", website, company)
+        self.citations.add("posts", self.posts)
+        self.citations.add("comments", self.comments)
+        self.citations.add("publications", self.publications)
+        self.citations.add("news", self.google_news)
+
+        return True
+
+    def _chain_config(self, prompt_name, parser):
+        """
+        This method tags the LLM call with its prompt, so streamed tokens can be attributed to it. Tokens of
+        structured (parsed) outputs are not meant to be shown. The metadata inherited from the calling graph
+        node is kept, since an explicit config replaces it.
+        """
+        chain_config = ensure_config()
+        return {
+            **chain_config,
+            "metadata": {**chain_config["metadata"], "prompt": prompt_name, "structured": parser is not None},
+        }
+
+    def _citation_label(self, citation):
+        if citation.kind == "profile":
+            return f"LinkedIn profile of {citation.source.get('full_name')}"
+        if citation.kind == "company":
+            return f"LinkedIn company profile of {citation.source.get('name')}"
+        if citation.kind == "website":
+            return f"Company website {citation.source.get('url')}"
+        if citation.kind == "posts":
+            return "LinkedIn posts of the prospect"
+        if citation.kind == "comments":
+            return "LinkedIn comments of the prospect"
+        if citation.kind == "publications":
+            return "Google Scholar publications of the prospect"
+        return "Google News articles about the prospect"
+
+    def _citation_message(self, parser):
+        """
+        This method returns the message listing the citation ids of the current section, appended to the
+        prompt in single-pass mode so that the model cites its sources while generating the section.
+        """
+        context_function = _citation_context_function.get()
+        if not SINGLE_PASS_CITATIONS or parser is not None or context_function is None:
+            return None
+
+        sources = "\n".join(
+            f"[{citation_id}]: {self._citation_label(self.citations[citation_id])}"
+            for citation_id in sorted(citation_ids(context_function()))
+        )
+        return HumanMessage(CITATION_INSTRUCTIONS.format(sources=sources)) if sources else None
+
+    def _shared_blocks(self):
+        """
+        This method lists the contexts several chains send, as `(input key, title, value)`, from the most
+        stable (the knowledge base, identical for every prospect) to the most prospect-specific.
+        """
+        knowledge_base = getattr(self, "knowledge_base", None) or {}
+        blocks = [
+            ("connect", "Knowledge base: connect", knowledge_base.get("connect")),
+            ("ai_summary", "Knowledge base: AI summary", knowledge_base.get("ai_summary")),
+            ("knowledge_insights", "Knowledge base: insights", knowledge_base.get("knowledge_insights")),
+            ("sell_for_enterprise", "Knowledge base: selling to enterprises",
+             knowledge_base.get("sell_for_enterprise")),
+            ("sell_for_education", "Knowledge base: selling to education", knowledge_base.get("sell_for_education")),
+            ("objection_handling", "Knowledge base: objection handling",
+             knowledge_base.get("objection_handling_context")),
+            ("competitors_insights", "Knowledge base: insights vs competitors",
+             knowledge_base.get("insights_vs_competitors")),
+            ("pitches", "Knowledge base: pitches", knowledge_base.get("pitches")),
+            ("linkedin_profile", "Prospect LinkedIn profile", self.linkedin_profile),
+            ("linkedin_companies", "Prospect company LinkedIn profiles", self.companies),
+            ("linkedin_companies_websites", "Prospect company websites", self._websites_input()),
+            ("linkedin_posts", "Prospect LinkedIn posts", self.posts),
+            ("linkedin_comments", "Prospect LinkedIn comments", self.comments),
         ]
+        return [block for block in blocks if block[2]]
 
-        self.knowledge_base = (
-            supabase_client.table("sdr_agent_knowledgebase")
-            .select(
-                "*"
+    def _shared_prefix_layout(self):
+        """
+        This method returns the shared blocks and the prefix message rendering them, built once per client
+        (and again after the website digests are created) so that every chain sends the identical prefix.
+        """
+        if self._shared_prefix is None:
+            blocks = self._shared_blocks()
+            packed_blocks = self._packed_input(
+                "shared_prefix", {key: value for key, _, value in blocks}, SHARED_PREFIX_BUDGET
             )
-            .eq("id", config("KNOWLEDGE_BASE_ID"))
-            .single()
-            .execute()
-        ).data
+            self._shared_prefix = (
+                [(title, value) for _, title, value in blocks],
+                shared_prefix_message([(title, packed_blocks[key]) for key, title, _ in blocks]),
+            )
+        return self._shared_prefix
 
-    def _run_chain(self, prompt_name, chain_input, parser=None):
-        prompt = self.langsmith_client.pull_prompt(f"{prompt_name}:{config('LANGSMITH_PROMPT_TAG')}")
-        chain = (prompt | self.model | parser) if parser else (prompt | self.model)
-        response = chain.invoke(chain_input)
+    def _layout_input(self, chain_input):
+        """
+        This method applies the prompt layout. In the shared-prefix layout, inputs that are part of the shared
+        context are replaced by a reference and the shared prefix message is returned to be sent first.
+        """
+        if not SHARED_PREFIX_LAYOUT:
+            return chain_input, None
 
-        return response
+        blocks, prefix_message = self._shared_prefix_layout()
+        layout_input = reference_shared_values(chain_input, blocks)
+        return layout_input, prefix_message if layout_input != chain_input else None
 
-    def linkedin_data_chain(self):
-        input_data = {
+    def _chain(self, prompt, prefix_message=None, citation_message=None):
+        if prefix_message is None and citation_message is None:
+            return prompt | self.model
+
+        def layout(prompt_value):
+            return (
+                ([prefix_message] if prefix_message else [])
+                + prompt_value.to_messages()
+                + ([citation_message] if citation_message else [])
+            )
+
+        return prompt | layout | self.model
+
+    def _cache_key(self, prompt_name, chain_input, prefix_message=None, citation_message=None, cache_context=None):
+        """
+        This method returns the graph node making an LLM call and the key of its output in the node result
+        cache. The key covers the node, the prompt name and tag, the model, and the chain input and any added
+        messages, or `cache_context` instead of them when the chain gives what its output depends on. The
+        citation message is always covered: it maps the [n] ids of the output to the sources of this report,
+        so an output is only shared by reports citing the same sources under the same ids.
+        """
+        metadata = ensure_config()["metadata"]
+        node = metadata.get("section") or metadata.get("langgraph_node") or "ai_client"
+        added_messages = [message.content for message in (prefix_message, citation_message) if message is not None]
+        context = [chain_input, *added_messages] if added_messages else chain_input
+        if cache_context is not None:
+            context = [cache_context, citation_message.content] if citation_message is not None else cache_context
+        cache_key = fingerprint(
+            node, f"{prompt_name}:{config('LANGSMITH_PROMPT_TAG')}", self.model.model_name, context
+        )
+        return node, cache_key
+
+    def _cached_response(self, prompt_name, node, cache_key):
+        with span("node_cache", "cache", node=node, prompt=prompt_name) as record:
+            cached = node_result_cache.get(cache_key, node)
+            record["hit"] = cached is not None
+
+        return AIMessage(content=cached) if cached is not None else None
+
+    async def _acached_response(self, prompt_name, node, cache_key):
+        with span("node_cache", "cache", node=node, prompt=prompt_name) as record:
+            cached = await node_result_cache.aget(cache_key, node)
+            record["hit"] = cached is not None
+
+        return AIMessage(content=cached) if cached is not None else None
+
+    def _packed_input(self, prompt_name, chain_input, budget=None):
+        """
+        This method fits the chain input into the token budget of the prompt and keeps the packing report,
+        which lists what was left out, in `context_reports`.
+        """
+        if not CONTEXT_PACKING_ENABLED:
+            return chain_input
+
+        packed_input, report = pack_context(prompt_name, chain_input, budget, self._rendered)
+        self.context_reports[prompt_name] = report
+        if report["dropped"]:
+            logger.info(
+                "%s: packed context from %s to %s tokens (budget %s): %s", prompt_name, report["tokens_before"],
+                report["tokens_after"], report["budget"], "; ".join(report["dropped"]),
+            )
+        return packed_input
+
+    @staticmethod
+    def _rendered(value):
+        # How the prompt template renders a chain input value.
+        return serialize_context(value) if COMPACT_CONTEXT_ENABLED else str(value)
+
+    def _serialized_input(self, chain_input):
+        if not COMPACT_CONTEXT_ENABLED:
+            return chain_input
+        return {key: serialize_context(value) for key, value in chain_input.items()}
+
+    def prepare_chain_input(self, prompt_name, chain_input):
+        """
+        This method turns a chain input into what is sent to the prompt: laid out, packed into the prompt's
+        token budget and serialized. Packing measures every value as it is serialized, so the budget holds for
+        the text the model receives. Returns the input and the shared prefix message, if any.
+        """
+        chain_input, prefix_message = self._layout_input(chain_input)
+        chain_input = self._packed_input(prompt_name, chain_input)
+        return self._serialized_input(chain_input), prefix_message
+
+    def _report_prompt_cache(self, prompt_name, record):
+        if SHARED_PREFIX_LAYOUT:
+            logger.info(
+                "%s: %s of %s input tokens cached", prompt_name, record["cached_tokens"], record["input_tokens"]
+            )
+
+    def _run_chain(self, prompt_name, chain_input, parser=None, cache_context=None):
+        chain_input, prefix_message = self.prepare_chain_input(prompt_name, chain_input)
+        citation_message = self._citation_message(parser)
+        node, cache_key = self._cache_key(
+            prompt_name, chain_input, prefix_message, citation_message, cache_context=cache_context
+        )
+        response = self._cached_response(prompt_name, node, cache_key)
+        if response is not None:
+            return parser.invoke(response) if parser else response
+
+        chain = self._chain(prompt_registry.get(prompt_name), prefix_message, citation_message)
+        with span("openrouter", "llm", prompt=prompt_name, model=self.model.model_name) as record, \
+                provider_slot("openrouter"):
+            response = chain.invoke(chain_input, self._chain_config(prompt_name, parser))
+            record_llm_usage(record, response)
+        self._report_prompt_cache(prompt_name, record)
+        # Parsed before it is cached, so a malformed structured output is not served again by every rerun.
+        output = parser.invoke(response) if parser else response
+        node_result_cache.set(cache_key, node, prompt_name, self.model.model_name, response.content)
+        return output
+
+    async def _arun_chain(self, prompt_name, chain_input, parser=None, cache_context=None):
+        chain_input, prefix_message = self.prepare_chain_input(prompt_name, chain_input)
+        citation_message = self._citation_message(parser)
+        node, cache_key = self._cache_key(
+            prompt_name, chain_input, prefix_message, citation_message, cache_context=cache_context
+        )
+        response = await self._acached_response(prompt_name, node, cache_key)
+        if response is not None:
+            return parser.invoke(response) if parser else response
+
+        chain = self._chain(await prompt_registry.aget(prompt_name), prefix_message, citation_message)
+        with span("openrouter", "llm", prompt=prompt_name, model=self.model.model_name) as record:
+            async with aprovider_slot("openrouter"):
+                response = await chain.ainvoke(chain_input, self._chain_config(prompt_name, parser))
+            record_llm_usage(record, response)
+        self._report_prompt_cache(prompt_name, record)
+        output = parser.invoke(response) if parser else response
+        await node_result_cache.aset(cache_key, node, prompt_name, self.model.model_name, response.content)
+        return output
+
+    def _linkedin_data_chain_input(self):
+        return {
             "summary": self.linkedin_profile.get("summary"),
             "headline": self.linkedin_profile.get("headline"),
             "experiences": self.linkedin_profile.get("experiences"),
@@ -116,94 +503,237 @@ class AIClient:
             "skills": self.linkedin_profile.get("skills"),
             "recommendations": self.linkedin_profile.get("recommendations"),
         }
-        return self._run_chain("linkedin_data_chain_prompt", input_data).content
+
+    def linkedin_data_chain(self):
+        return self._run_chain("linkedin_data_chain_prompt", self._linkedin_data_chain_input()).content
+
+    async def alinkedin_data_chain(self):
+        return (await self._arun_chain("linkedin_data_chain_prompt", self._linkedin_data_chain_input())).content
+
+    def _websites_input(self):
+        """
+        This method returns the company websites as the chains see them: the digest of a website replaces
+        its crawled markdown once it has been created.
+        """
+        return [
+            {"url": website.get("url"), "digest": website["digest"]} if website.get("digest") else website
+            for website in self.companies_websites
+        ]
+
+    def _digest_chunks(self):
+        return [
+            (website, chunk_input)
+            for website in self.companies_websites if needs_digest(website)
+            for chunk_input in digest_chunk_inputs(website)
+        ]
+
+    def _set_website_digests(self, chunks, summaries):
+        for website in {id(website): website for website, _ in chunks}.values():
+            website_summaries = [
+                summary for (chunk_website, _), summary in zip(chunks, summaries) if chunk_website is website
+            ]
+            error = next((summary for summary in website_summaries if isinstance(summary, Exception)), None)
+            if error is not None:
+                logger.warning("Failed to digest %s, using its crawled markdown: %s", website.get("url"), error)
+                continue
+
+            website["digest"] = combine_digest(website, website_summaries)
+
+        self._shared_prefix = None
+
+    def _summarize_chunk(self, chunk_input):
+        try:
+            return self._run_chain(WEBSITE_DIGEST_PROMPT_NAME, chunk_input).content
+        except Exception as e:
+            return e
+
+    async def _asummarize_chunk(self, chunk_input):
+        try:
+            return (await self._arun_chain(WEBSITE_DIGEST_PROMPT_NAME, chunk_input)).content
+        except Exception as e:
+            return e
+
+    def create_website_digests(self):
+        """
+        This method summarizes every long company website, all chunks in parallel, and sets the digest on the
+        website for the company chains to read. Digests are not stored with the website rows: each chunk
+        summary is kept in the node result cache under the chunk's content, so the same crawled website is
+        digested again from the cache without LLM calls.
+        """
+        chunks = self._digest_chunks() if WEBSITE_DIGEST_ENABLED else []
+        if not chunks:
+            return
+
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            futures = [
+                executor.submit(copy_context().run, self._summarize_chunk, chunk_input) for _, chunk_input in chunks
+            ]
+            self._set_website_digests(chunks, [future.result() for future in futures])
+
+    async def acreate_website_digests(self):
+        """
+        Async variant of `create_website_digests`.
+        """
+        chunks = self._digest_chunks() if WEBSITE_DIGEST_ENABLED else []
+        if not chunks:
+            return
+
+        summaries = await asyncio.gather(*(self._asummarize_chunk(chunk_input) for _, chunk_input in chunks))
+        self._set_website_digests(chunks, summaries)
+
+    def _company_about_chain_input(self):
+        return {
+            "linkedin_companies_profiles": self.companies,
+            "linkedin_companies_websites": self._websites_input(),
+        }
+
+    def _company_versions(self):
+        """
+        This method identifies the companies of the report and the versions of their stored data: the key of
+        each company with the creation time of its profile and of its websites, and whether they are digested.
+        The company section is cached under it, so prospects sharing companies share the section.
+        """
+        return sorted(
+            [
+                ":".join(min(profile_keys(company), default=("id", str(company.get("id"))))),
+                str(company.get("created_at")),
+                sorted(
+                    [str(website.get("url")), str(website.get("created_at")), bool(website.get("digest"))]
+                    for website in company.get("sdr_agent_companywebsite") or []
+                ),
+            ]
+            for company in self.companies
+        )
 
     def company_about_chain(self):
         return self._run_chain(
-            "about_company_chain_prompt",
-            {
-                "linkedin_companies_profiles": self.companies,
-                "linkedin_companies_websites": self.companies_websites,
-            },
+            "about_company_chain_prompt", self._company_about_chain_input(), cache_context=self._company_versions()
         ).content
 
+    async def acompany_about_chain(self):
+        return (await self._arun_chain(
+            "about_company_chain_prompt", self._company_about_chain_input(), cache_context=self._company_versions()
+        )).content
+
+    def _engagement_style_chain_input(self):
+        return {
+            "linkedin_posts_caption": [post.get("text") for post in self.posts if not post.get("post_type") == "repost"],
+            "linkedin_comments": [comment.get("comment_text") for comment in self.comments],
+        }
+
     def engagement_style_chain(self):
-        return self._run_chain(
-            "engagement_style_chain_prompt",
-            {
-                "linkedin_posts_caption": [post.get("text") for post in self.posts if not post.get("post_type") == "repost"],
-                "linkedin_comments": [comment.get("comment_text") for comment in self.comments],
-            },
-        ).content
+        return self._run_chain("engagement_style_chain_prompt", self._engagement_style_chain_input()).content
+
+    async def aengagement_style_chain(self):
+        return (await self._arun_chain("engagement_style_chain_prompt", self._engagement_style_chain_input())).content
+
+    def _suggested_additional_outreach_chain_input(self):
+        return {
+            "people_also_viewed": self.linkedin_profile.get("people_also_viewed"),
+            "linkedin_headline": self.linkedin_profile.get("headline"),
+            "linkedin_summary": self.linkedin_profile.get("summary"),
+        }
 
     def suggested_additional_outreach_chain(self):
         return self._run_chain(
             "suggested_additional_outreach_chain_prompt",
-            {
-                "people_also_viewed": self.linkedin_profile.get("people_also_viewed"),
-                "linkedin_headline": self.linkedin_profile.get("headline"),
-                "linkedin_summary": self.linkedin_profile.get("summary"),
-            },
+            self._suggested_additional_outreach_chain_input(),
         ).content
 
+    async def asuggested_additional_outreach_chain(self):
+        return (await self._arun_chain(
+            "suggested_additional_outreach_chain_prompt",
+            self._suggested_additional_outreach_chain_input(),
+        )).content
+
+    def _talking_point_chain_input(self, user_publications, user_google_news):
+        return {
+            "linkedin_experiences": self.linkedin_profile.get("experiences"),
+            "linkedin_education": self.linkedin_profile.get("education"),
+            "linkedin_posts": self.posts,
+            "linkedin_comments": self.comments,
+            "publications": user_publications,
+            "news": user_google_news,
+            "connect": self.knowledge_base.get("connect"),
+            "ai_summary": self.knowledge_base.get("ai_summary"),
+            "knowledge_insights": self.knowledge_base.get("knowledge_insights")
+        }
+
     def talking_point_chain(self, user_publications, user_google_news):
         return self._run_chain(
             "talking_point_chain_prompt",
-            {
-                "linkedin_experiences": self.linkedin_profile.get("experiences"),
-                "linkedin_education": self.linkedin_profile.get("education"),
-                "linkedin_posts": self.posts,
-                "linkedin_comments": self.comments,
-                "publications": user_publications,
-                "news": user_google_news,
-                "connect": self.knowledge_base.get("connect"),
-                "ai_summary": self.knowledge_base.get("ai_summary"),
-                "knowledge_insights": self.knowledge_base.get("knowledge_insights")
-            },
+            self._talking_point_chain_input(user_publications, user_google_news),
         ).content
 
+    async def atalking_point_chain(self, user_publications, user_google_news):
+        return (await self._arun_chain(
+            "talking_point_chain_prompt",
+            self._talking_point_chain_input(user_publications, user_google_news),
+        )).content
+
+    def _opportunities_chain_input(self):
+        return {
+            "linkedin_companies_profiles": self.companies,
+            "linkedin_companies_websites": self._websites_input(),
+            "linkedin_headline": self.linkedin_profile.get("headline"),
+            "sell_for_enterprise": self.knowledge_base.get("sell_for_enterprise"),
+            "sell_for_education": self.knowledge_base.get("sell_for_education")
+        }
+
     def opportunities_chain(self):
-        return self._run_chain(
-            "opportunities_chain_prompt",
-            {
-                "linkedin_companies_profiles": self.companies,
-                "linkedin_companies_websites": self.companies_websites,
-                "linkedin_headline": self.linkedin_profile.get("headline"),
-                "sell_for_enterprise": self.knowledge_base.get("sell_for_enterprise"),
-                "sell_for_education": self.knowledge_base.get("sell_for_education")
-            },
-        ).content
+        return self._run_chain("opportunities_chain_prompt", self._opportunities_chain_input()).content
+
+    async def aopportunities_chain(self):
+        return (await self._arun_chain("opportunities_chain_prompt", self._opportunities_chain_input())).content
+
+    def _engagement_highlights_chain_input(self):
+        return {
+            "linkedin_posts": self.posts,
+        }
 
     def engagement_highlights_chain(self):
-        return self._run_chain(
+        return self._run_chain("engagement_highlights_chain_prompt", self._engagement_highlights_chain_input()).content
+
+    async def aengagement_highlights_chain(self):
+        return (await self._arun_chain(
             "engagement_highlights_chain_prompt",
-            {
-                "linkedin_posts": self.posts,
-            },
-        ).content
+            self._engagement_highlights_chain_input(),
+        )).content
+
+    def _trigger_events_and_timing_chain_input(self):
+        return {
+            "linkedin_posts": self.posts,
+            "linkedin_companies": self.companies,
+            "linkedin_companies_websites": self._websites_input(),
+        }
 
     def trigger_events_and_timing_chain(self):
         return self._run_chain(
             "trigger_events_and_timing_chain_prompt",
-            {
-                "linkedin_posts": self.posts,
-                "linkedin_companies": self.companies,
-                "linkedin_companies_websites": self.companies_websites,
-            },
+            self._trigger_events_and_timing_chain_input(),
         ).content
 
+    async def atrigger_events_and_timing_chain(self):
+        return (await self._arun_chain(
+            "trigger_events_and_timing_chain_prompt",
+            self._trigger_events_and_timing_chain_input(),
+        )).content
+
+    def _objection_handling_chain_input(self):
+        return {
+            "linkedin_profile": self.linkedin_profile,
+            "linkedin_companies": self.companies,
+            "linkedin_companies_websites": self._websites_input(),
+            "objection_handling": self.knowledge_base.get("objection_handling_context"),
+            "competitors_insights": self.knowledge_base.get("insights_vs_competitors"),
+            "pitches": self.knowledge_base.get("pitches"),
+        }
+
     def objection_handling_chain(self):
-        return self._run_chain(
-            "objection_handling_prompt",
-            {
-                "linkedin_profile": self.linkedin_profile,
-                "linkedin_companies": self.companies,
-                "linkedin_companies_websites": self.companies_websites,
-                "objection_handling": self.knowledge_base.get("objection_handling_context"),
-                "competitors_insights": self.knowledge_base.get("insights_vs_competitors"),
-                "pitches": self.knowledge_base.get("pitches"),
-            },
-        ).content
+        return self._run_chain("objection_handling_prompt", self._objection_handling_chain_input()).content
+
+    async def aobjection_handling_chain(self):
+        return (await self._arun_chain("objection_handling_prompt", self._objection_handling_chain_input())).content
 
     def _outreach_email_chain(self, outreach_email_input):
         return self._run_chain(
@@ -211,42 +741,74 @@ class AIClient:
             outreach_email_input
         ).content
 
+    async def _aoutreach_email_chain(self, outreach_email_input):
+        return (await self._arun_chain(
+            "outreach_email_chain_prompt",
+            outreach_email_input
+        )).content
+
+    def _publications_chain_input(self):
+        return {
+            "publications": self.publications,
+        }
+
     def publications_chain(self):
-        return self._run_chain(
-            "publications_chain_prompt",
-            {
-                "publications": self.publications,
-            }
-        ).content
+        return self._run_chain("publications_chain_prompt", self._publications_chain_input()).content
+
+    async def apublications_chain(self):
+        return (await self._arun_chain("publications_chain_prompt", self._publications_chain_input())).content
+
+    def _publication_author_chain_input(self, google_scholar_profiles):
+        return {
+            "google_scholar_profiles": google_scholar_profiles,
+            "linkedin_profile": self.linkedin_profile,
+        }
 
     def publication_author_chain(self, google_scholar_profiles):
         return self._run_chain(
             "google_scholar_profile_chain_prompt",
-            {
-                "google_scholar_profiles": google_scholar_profiles,
-                "linkedin_profile": self.linkedin_profile,
-            },
+            self._publication_author_chain_input(google_scholar_profiles),
+            PydanticOutputParser(pydantic_object=ScholarProfile)
+        )
+
+    async def apublication_author_chain(self, google_scholar_profiles):
+        return await self._arun_chain(
+            "google_scholar_profile_chain_prompt",
+            self._publication_author_chain_input(google_scholar_profiles),
             PydanticOutputParser(pydantic_object=ScholarProfile)
         )
 
+    def _google_news_content_chain_input(self):
+        return {
+            "linkedin_profile": self.linkedin_profile,
+            "google_news": self.google_news
+        }
+
     def _google_news_content_chain(self):
         return self._run_chain(
             "news_chain_prompt",
-            {
-                "linkedin_profile": self.linkedin_profile,
-                "google_news": self.google_news
-            },
+            self._google_news_content_chain_input(),
+            PydanticOutputParser(pydantic_object=GoogleNews)
+        )
+
+    async def _agoogle_news_content_chain(self):
+        return await self._arun_chain(
+            "news_chain_prompt",
+            self._google_news_content_chain_input(),
             PydanticOutputParser(pydantic_object=GoogleNews)
         )
 
+    def _google_news_chain_input(self, news):
+        return {
+            "linkedin_profile": self.linkedin_profile,
+            "google_news": news
+        }
+
     def _google_news_chain(self, news):
-        return self._run_chain(
-            "markdown_news_chain_prompt",
-            {
-                "linkedin_profile": self.linkedin_profile,
-                "google_news": news
-            }
-        ).content
+        return self._run_chain("markdown_news_chain_prompt", self._google_news_chain_input(news)).content
+
+    async def _agoogle_news_chain(self, news):
+        return (await self._arun_chain("markdown_news_chain_prompt", self._google_news_chain_input(news))).content
 
     def _check_google_news_availability_chain(self, news):
         return self._run_chain(
@@ -257,6 +819,15 @@ class AIClient:
             PydanticOutputParser(pydantic_object=AvailableNews)
         )
 
+    async def _acheck_google_news_availability_chain(self, news):
+        return await self._arun_chain(
+            "news_available_chain_prompt",
+            {
+                "news": news
+            },
+            PydanticOutputParser(pydantic_object=AvailableNews)
+        )
+
     def _add_citations_chain(self, content, context):
         return self._run_chain(
             "add_citations_chain_prompt",
@@ -266,68 +837,123 @@ class AIClient:
             }
         ).content
 
+    async def _aadd_citations_chain(self, content, context):
+        return (await self._arun_chain(
+            "add_citations_chain_prompt",
+            {
+                "content": content,
+                "context": context
+            }
+        )).content
+
+    def _top_news(self, google_news_content):
+        return google_news_content.news[:3] if hasattr(google_news_content, 'news') and isinstance(
+            google_news_content.news, list) else []
+
+    def _ranked_news(self):
+        """
+        This method ranks the Google News results locally and returns the top articles about the prospect,
+        without syndicated copies.
+        """
+        ranked_news = rank_news(self.google_news, self.linkedin_profile, NEWS_TOP_COUNT)
+        logger.info(
+            "%s of %s Google News results are about the prospect", len(ranked_news), len(self.google_news or [])
+        )
+        return [GoogleNewsConfig(title=news["title"], link=news["link"]) for news in ranked_news]
+
+    def _no_relevant_news(self):
+        self.news_availability = AvailableNews(news_available=False)
+        return NO_RELEVANT_NEWS
+
     def process_google_news_content(self):
         """
         This method fetches top 3 Google News articles, crawls their content,
         generate structured news output and updates news availability.
+        When no result is about the prospect, no article is crawled and no LLM is called.
         """
 
-        google_news_content = self._google_news_content_chain()
-        google_news_with_article_content = []
+        if NEWS_LOCAL_RANKING:
+            top_news = self._ranked_news()
+            if not top_news:
+                return self._no_relevant_news()
+        else:
+            top_news = self._top_news(self._google_news_content_chain())
 
-        top_news = google_news_content.news[:3] if hasattr(google_news_content, 'news') and isinstance(
-            google_news_content.news, list) else []
-
-        for news in top_news:
-            article_crawler = WebsiteCrawler({"website_url": news.link})
-            google_news_with_article_content.append({
-                "title": news.title,
-                "content": article_crawler.crawl_page()
-            })
+        articles_content = crawl_pages([news.link for news in top_news]) if top_news else []
+        google_news_with_article_content = [
+            {"title": news.title, "content": content}
+            for news, content in zip(top_news, articles_content)
+        ]
 
         google_news = self._google_news_chain(google_news_with_article_content)
         self.news_availability = self._check_google_news_availability_chain(google_news)
 
         return google_news
 
-    def create_citations(self, linkedin_url):
+    async def aprocess_google_news_content(self):
+        """
+        Async variant of `process_google_news_content`, crawling the top articles concurrently.
+        """
+
+        if NEWS_LOCAL_RANKING:
+            top_news = self._ranked_news()
+            if not top_news:
+                return self._no_relevant_news()
+        else:
+            top_news = self._top_news(await self._agoogle_news_content_chain())
+
+        articles_content = await acrawl_pages([news.link for news in top_news]) if top_news else []
+        google_news_with_article_content = [
+            {"title": news.title, "content": content}
+            for news, content in zip(top_news, articles_content)
+        ]
+
+        google_news = await self._agoogle_news_chain(google_news_with_article_content)
+        self.news_availability = await self._acheck_google_news_availability_chain(google_news)
+
+        return google_news
+
+    def has_available_news(self):
+        return bool(self.news_availability and self.news_availability.news_available)
+
+    def create_citations(self, linkedin_url, news_available=None):
+        if news_available is None:
+            news_available = self.has_available_news()
+
         citations = "## References\n"
 
-        for index, citation_content in enumerate(self.citation_list, start=1):
-            if citation_content == self.linkedin_profile:
+        for index, kind, citation_content, company in self.citations:
+            if kind == "profile":
                 name = citation_content.get("full_name", "LinkedIn Profile")
                 citations += f"{index}. [LinkedIn Profile - {name}]({linkedin_url})\n"
 
-            elif citation_content in self.companies:
+            elif kind == "company":
                 name = citation_content.get("name", "Company Profile")
                 url = f"https://www.linkedin.com/company/{citation_content.get('universal_name_id')}"
                 citations += f"{index}. [LinkedIn Company Profile - {name}]({url})\n"
 
-            elif citation_content in self.companies_websites:
-                company_id = citation_content.get("company_profile_id")
-                company_info = supabase_client.table("sdr_agent_companylinkedinprofile").select("name").eq("id",
-                                                                                                           company_id).single().execute()
-                name = company_info.data.get("name", "Company Website")
+            elif kind == "website":
+                name = company.get("name", "Company Website")
                 url = citation_content.get("url", "#")
                 citations += f"{index}. [Company Website - {name}]({url})\n"
 
-            elif citation_content == self.posts:
+            elif kind == "posts":
                 name = self.linkedin_profile.get("full_name", "Posts")
                 url = f"{linkedin_url}{'' if linkedin_url.endswith('/') else '/'}recent-activity/all/"
                 citations += f"{index}. [LinkedIn Posts - {name}]({url})\n"
 
-            elif citation_content == self.comments:
+            elif kind == "comments":
                 name = self.linkedin_profile.get("full_name", "Comments")
                 url = f"{linkedin_url}{'' if linkedin_url.endswith('/') else '/'}recent-activity/comments/"
                 citations += f"{index}. [LinkedIn Comments - {name}]({url})\n"
 
-            elif citation_content == self.publications or citation_content == self.scholar_profile:
+            elif kind == "publications":
                 name = self.scholar_profile.get("name", "Google Scholar")
                 author_id = self.scholar_profile.get("author_id", "")
                 url = f"https://scholar.google.com/citations?user={author_id}&hl=en&oi=ao"
                 citations += f"{index}. [Google Publications - {name}]({url})\n"
 
-            elif citation_content == self.google_news and self.news_availability and self.news_availability.news_available:
+            elif kind == "news" and news_available:
                 name = self.linkedin_profile.get("full_name", "Google News")
                 query = name.replace(" ", "+")
                 url = f"https://www.google.com/search?q={query}&tbm=nws"
@@ -350,62 +976,113 @@ class AIClient:
         )
         return profile_info_markdown
 
-    def process_with_spinner(self, label, chain_function, citation_context_function=None, progress_callback=None, show_spinner_message=None,
-                show_status_message=None):
+    def _repair_citations(self, label, output, context):
+        """
+        This method validates the inline citations of a single-pass section against the sources it was given.
+        """
+        output, removed_ids = repair_citations(output, citation_ids(context))
+        if removed_ids:
+            logger.info("%s: removed invalid citations %s", label, sorted(set(removed_ids)))
+        return output
+
+    def _start_section(self, label, citation_context_function, show_spinner_message):
+        """
+        This method shows that a report section is being generated and, in single-pass mode, gives its chains
+        the sources they cite. Returns the start time and the token resetting the citation context.
+        """
+        logger.debug("%s started", label)
+        show_spinner_message(f"{label}...")
+        single_pass = citation_context_function if SINGLE_PASS_CITATIONS else None
+        return time.monotonic(), _citation_context_function.set(single_pass)
+
+    def _needs_citation_pass(self, citation_context_function):
+        return citation_context_function is not None and not SINGLE_PASS_CITATIONS
+
+    def _finish_section(self, label, output, citation_context_function, start, show_status_message):
+        if citation_context_function and SINGLE_PASS_CITATIONS:
+            output = self._repair_citations(label, output, citation_context_function())
+        show_status_message(f"✅ {label}...", 'success')
+        logger.debug("%s ended in %.1fs", label, time.monotonic() - start)
+        return f"{output}\n\n"
+
+    def process_with_spinner(self, label, chain_function, citation_context_function=None, progress_callback=None,
+                             show_spinner_message=None, show_status_message=None):
+        start, token = self._start_section(label, citation_context_function, show_spinner_message)
         try:
-            print(f"{label} started")
-            show_spinner_message(f"{label}...")
             output = chain_function()
-            if citation_context_function:
-                context = citation_context_function()
-                output = self._add_citations_chain(output, context)
-            show_status_message(f"✅ {label}...", 'success')
-            print(f"{label} ended")
-            return f"{output}\n\n"
+            if self._needs_citation_pass(citation_context_function):
+                output = self._add_citations_chain(output, citation_context_function())
+            return self._finish_section(label, output, citation_context_function, start, show_status_message)
         except Exception as e:
             show_status_message(f"❌ {label}...{e}", 'error')
-            return ""
+            raise
+        finally:
+            _citation_context_function.reset(token)
+
+    async def aprocess_with_spinner(self, label, chain_function, citation_context_function=None, progress_callback=None,
+                                    show_spinner_message=None, show_status_message=None):
+        """
+        Async variant of `process_with_spinner` where `chain_function` is a coroutine function.
+        """
+        start, token = self._start_section(label, citation_context_function, show_spinner_message)
+        try:
+            output = await chain_function()
+            if self._needs_citation_pass(citation_context_function):
+                output = await self._aadd_citations_chain(output, citation_context_function())
+            return self._finish_section(label, output, citation_context_function, start, show_status_message)
+        except Exception as e:
+            show_status_message(f"❌ {label}...{e}", 'error')
+            raise
+        finally:
+            _citation_context_function.reset(token)
 
     def get_context_from_sources(self, sources):
         context = {}
         for source in sources:
-            if source in self.citation_list:
-                index = self.citation_list.index(source) + 1
-                if source == self.posts:
+            citation_id = self.citations.id_of(source)
+            if citation_id:
+                kind = self.citations[citation_id].kind
+                if kind == "posts":
                     data = [post.get("text") for post in source if post.get("text")]
-                elif source == self.comments:
+                elif kind == "comments":
                     data = [comment.get("comment_text") for comment in source if comment.get("comment_text")]
                 else:
                     data = source
+                data = self._serialized_context(data)
                 if data:
-                    context[f"[{index}]"] = data
+                    context[f"[{citation_id}]"] = data
         return context
 
+    def _serialized_context(self, data):
+        return serialize_context(data) if COMPACT_CONTEXT_ENABLED else data
+
     def get_company_context(self):
         return {
-            **{f"[{self.citation_list.index(company) + 1}]": company for company in self.companies},
-            **{f"[{self.citation_list.index(site) + 1}]": site for site in self.companies_websites},
+            **{self.citations.key_of(company): self._serialized_context(company) for company in self.companies},
+            **{
+                self.citations.key_of(site): self._serialized_context(site_input)
+                for site, site_input in zip(self.companies_websites, self._websites_input())
+            },
         }
 
     def get_profile_context(self):
-        return {f"[{self.citation_list.index(self.linkedin_profile) + 1}]": self.linkedin_profile}
+        return {
+            self.citations.key_of(self.linkedin_profile): self._serialized_context(self.linkedin_profile)
+        }
 
     def get_google_news_context(self):
+        """
+        This method returns the news citation context. While the news section is being generated, news
+        availability is not checked yet and the news are offered as a source; afterwards only available news are.
+        """
         result = {}
-        if self.news_availability.news_available:
-            context = {}
-
-            if self.google_news in self.citation_list and self.google_news:
-                if not (isinstance(self.google_news, (list, dict)) and not self.google_news):
-                    index = self.citation_list.index(self.google_news) + 1
-                    context[f"[{index}]"] = self.google_news
-
-            result = context
+        if not self.news_availability or self.news_availability.news_available:
+            result = self.get_context_from_sources([self.google_news])
 
         return result
 
-    def create_additional_outreach_email(self, llm_output, progress_callback, show_spinner_message, show_status_message):
-        outreach_email_input = {
+    def _outreach_email_input(self, llm_output):
+        return {
             "opportunities": llm_output.get("opportunities"),
             "talking_point": llm_output.get("talking_points"),
             "engagement_highlights": llm_output.get("engagement_highlights"),
@@ -420,6 +1097,9 @@ class AIClient:
             "pitches": self.knowledge_base.get("pitches"),
             "access_ai": self.knowledge_base.get("ai_summary"),
         }
+
+    def create_additional_outreach_email(self, llm_output, progress_callback, show_spinner_message, show_status_message):
+        outreach_email_input = self._outreach_email_input(llm_output)
         return self.process_with_spinner(
             "Crafting personalized outreach email",
             lambda: self._outreach_email_chain(outreach_email_input),
@@ -428,3 +1108,15 @@ class AIClient:
             show_spinner_message,
             show_status_message
         ) + "\n\n"
+
+    async def acreate_additional_outreach_email(self, llm_output, progress_callback, show_spinner_message,
+                                                show_status_message):
+        outreach_email_input = self._outreach_email_input(llm_output)
+        return await self.aprocess_with_spinner(
+            "Crafting personalized outreach email",
+            lambda: self._aoutreach_email_chain(outreach_email_input),
+            None,
+            progress_callback,
+            show_spinner_message,
+            show_status_message
+        ) + "\n\n"
@@ -1,7 +1,10 @@
-from apify_client import ApifyClient
+from apify_client import ApifyClient, ApifyClientAsync
 from decouple import config
 
-from supabase_client import supabase_client
+from deadlines import provider_timeout
+from instrumentation import span
+from provider_limits import aprovider_slot, provider_slot
+from supabase_client import get_async_supabase_client, supabase_client
 
 
 class LinkedinCommentsActor:
@@ -14,6 +17,7 @@ class LinkedinCommentsActor:
 
     def __init__(self, linkedin_url, linkedin_profile_id):
         self.client = ApifyClient(config("APIFY_API_KEY"))
+        self.async_client = ApifyClientAsync(config("APIFY_API_KEY"))
         self.linkedin_profile_id = linkedin_profile_id
         self.run_input = {"username": linkedin_url, "page_number": 1, "limit": 10}
 
@@ -39,8 +43,12 @@ class LinkedinCommentsActor:
         return parsed_linkedin_comments
 
     def store_linkedin_comments(self):
-        run = self.client.actor(config("LINKEDIN_COMMENTS_ACTOR_ID")).call(run_input=self.run_input)
-        linkedin_comments_iter = self.client.dataset(run["defaultDatasetId"]).iterate_items()
+        with span("apify", "actor", actor=config("LINKEDIN_COMMENTS_ACTOR_ID")) as record, provider_slot("apify"):
+            run = self.client.actor(config("LINKEDIN_COMMENTS_ACTOR_ID")).call(
+                run_input=self.run_input, timeout_secs=int(provider_timeout("apify"))
+            )
+            linkedin_comments_iter = list(self.client.dataset(run["defaultDatasetId"]).iterate_items())
+            record["items"] = len(linkedin_comments_iter)
         parsed_linkedin_comments = self._parse_linkedin_comments(linkedin_comments_iter)
         response = []
 
@@ -48,3 +56,22 @@ class LinkedinCommentsActor:
             response = supabase_client.table("sdr_agent_linkedincomment").insert(parsed_linkedin_comments).execute()
 
         return response.data if response else None
+
+    async def astore_linkedin_comments(self):
+        with span("apify", "actor", actor=config("LINKEDIN_COMMENTS_ACTOR_ID")) as record:
+            async with aprovider_slot("apify"):
+                run = await self.async_client.actor(config("LINKEDIN_COMMENTS_ACTOR_ID")).call(
+                    run_input=self.run_input, timeout_secs=int(provider_timeout("apify"))
+                )
+                linkedin_comments = [
+                    item async for item in self.async_client.dataset(run["defaultDatasetId"]).iterate_items()
+                ]
+            record["items"] = len(linkedin_comments)
+        parsed_linkedin_comments = self._parse_linkedin_comments(linkedin_comments)
+        response = []
+
+        if parsed_linkedin_comments:
+            async_supabase_client = await get_async_supabase_client()
+            response = await async_supabase_client.table("sdr_agent_linkedincomment").insert(parsed_linkedin_comments).execute()
+
+        return response.data if response else None
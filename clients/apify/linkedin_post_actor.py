@@ -4,10 +4,13 @@ from datetime import date
 from decimal import Decimal
 from json import JSONEncoder
 
-from apify_client import ApifyClient
+from apify_client import ApifyClient, ApifyClientAsync
 from decouple import config
 
-from supabase_client import supabase_client
+from deadlines import provider_timeout
+from instrumentation import span
+from provider_limits import aprovider_slot, provider_slot
+from supabase_client import get_async_supabase_client, supabase_client
 from utils import parse_datetime
 
 
@@ -33,6 +36,7 @@ class LinkedinPostActor:
 
     def __init__(self, linkedin_url, linkedin_profile_id):
         self.client = ApifyClient(config("APIFY_API_KEY"))
+        self.async_client = ApifyClientAsync(config("APIFY_API_KEY"))
         self.linkedin_profile_id = linkedin_profile_id
         self.run_input = {"username": linkedin_url, "page_number": 1, "limit": 10}
 
@@ -65,8 +69,12 @@ class LinkedinPostActor:
         return posts
 
     def store_linkedin_posts(self):
-        run = self.client.actor(config("LINKEDIN_POST_ACTOR_ID")).call(run_input=self.run_input)
-        linkedin_posts_iter = self.client.dataset(run["defaultDatasetId"]).iterate_items()
+        with span("apify", "actor", actor=config("LINKEDIN_POST_ACTOR_ID")) as record, provider_slot("apify"):
+            run = self.client.actor(config("LINKEDIN_POST_ACTOR_ID")).call(
+                run_input=self.run_input, timeout_secs=int(provider_timeout("apify"))
+            )
+            linkedin_posts_iter = list(self.client.dataset(run["defaultDatasetId"]).iterate_items())
+            record["items"] = len(linkedin_posts_iter)
         parsed_linkedin_posts = self._parse_linkedin_posts(linkedin_posts_iter)
 
         if parsed_linkedin_posts:
@@ -74,3 +82,22 @@ class LinkedinPostActor:
             return response.data
 
         return []
+
+    async def astore_linkedin_posts(self):
+        with span("apify", "actor", actor=config("LINKEDIN_POST_ACTOR_ID")) as record:
+            async with aprovider_slot("apify"):
+                run = await self.async_client.actor(config("LINKEDIN_POST_ACTOR_ID")).call(
+                    run_input=self.run_input, timeout_secs=int(provider_timeout("apify"))
+                )
+                linkedin_posts = [
+                    item async for item in self.async_client.dataset(run["defaultDatasetId"]).iterate_items()
+                ]
+            record["items"] = len(linkedin_posts)
+        parsed_linkedin_posts = self._parse_linkedin_posts(linkedin_posts)
+
+        if parsed_linkedin_posts:
+            async_supabase_client = await get_async_supabase_client()
+            response = await async_supabase_client.table("sdr_agent_linkedinpost").insert(parsed_linkedin_posts).execute()
+            return response.data
+
+        return []
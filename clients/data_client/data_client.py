@@ -11,7 +11,7 @@ from clients.proxy_curl.linkedin_profile import LinkedinProfileClient
 from clients.serp.google_news import GoogleNewsClient
 from clients.serp.google_scholars import GoogleScholarsClient
 from streamlit_styles import processing_spinner_style
-from supabase_client import supabase_client
+from supabase_client import get_async_supabase_client, supabase_client
 
 logger = logging.getLogger(__name__)
 dotenv.load_dotenv()
@@ -21,8 +21,19 @@ class DataClient:
     def __init__(self):
         pass
 
+    def _storage_path(self, linkedin_profile):
+        return f"{linkedin_profile.get('public_identifier')}_{linkedin_profile.get('id')}_profile.pdf"
+
+    def _profile_data(self, markdown_text, email_to, final_pdf, linkedin_profile):
+        return {
+            "text": markdown_text,
+            "email_to": email_to,
+            "final_pdf": final_pdf,
+            "linkedin_profile_id": linkedin_profile.get("id"),
+        }
+
     def store_processed_profile(self, pdf, markdown_text, email_to, linkedin_profile):
-        storage_path = f"{linkedin_profile.get('public_identifier')}_{linkedin_profile.get('id')}_profile.pdf"
+        storage_path = self._storage_path(linkedin_profile)
 
         supabase_client.storage.from_("processedprofiles").upload(
             file=pdf, path=storage_path, file_options={"content-type": "application/pdf"}
@@ -32,13 +43,26 @@ class DataClient:
         final_pdf = supabase_client.storage.from_("processedprofiles").get_public_url(storage_path)
 
         # Store profile data in Supabase
-        profile_data = {
-            "text": markdown_text,
-            "email_to": email_to,
-            "final_pdf": final_pdf,
-            "linkedin_profile_id": linkedin_profile.get("id"),
-        }
+        profile_data = self._profile_data(markdown_text, email_to, final_pdf, linkedin_profile)
 
         supabase_client.table("sdr_agent_processedprofile").insert(profile_data).execute()
 
         return final_pdf, storage_path
+
+    async def astore_processed_profile(self, pdf, markdown_text, email_to, linkedin_profile):
+        storage_path = self._storage_path(linkedin_profile)
+        async_supabase_client = await get_async_supabase_client()
+
+        await async_supabase_client.storage.from_("processedprofiles").upload(
+            file=pdf, path=storage_path, file_options={"content-type": "application/pdf"}
+        )
+
+        # Get public URL
+        final_pdf = await async_supabase_client.storage.from_("processedprofiles").get_public_url(storage_path)
+
+        # Store profile data in Supabase
+        profile_data = self._profile_data(markdown_text, email_to, final_pdf, linkedin_profile)
+
+        await async_supabase_client.table("sdr_agent_processedprofile").insert(profile_data).execute()
+
+        return final_pdf, storage_path
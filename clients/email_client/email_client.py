@@ -1,5 +1,6 @@
 import base64
 
+import httpx
 from decouple import config
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import (
@@ -13,14 +14,17 @@ from sendgrid.helpers.mail import (
     Mail,
 )
 
+from deadlines import provider_timeout
+from instrumentation import span
+from provider_limits import aprovider_slot, provider_slot
 from streamlit_styles import processing_spinner_style
 
 
 class EmailClient:
-    def send_email(self, linkedin_profile, final_pdf, email_to, storage_path, pdf):
-        processing_spinner_style()
+    SENDGRID_MAIL_SEND_URL = "https://api.sendgrid.com/v3/mail/send"
 
-        email_template = f"""
+    def _email_template(self, linkedin_profile, final_pdf, email_to):
+        return f"""
                 <html>
                     <body>
                         <p>Hello <strong>{email_to.split("@")[0]}</strong>,</p>
@@ -49,22 +53,33 @@ class EmailClient:
                 </html>
                 """
 
-        self.send_email_with_attachment(
-            email_to=email_to,
-            email_subject="Panopto SDR AI Prospect Profile ready for review",
-            email_body=email_template,
-            attachments=[
+    def _report_email_kwargs(self, linkedin_profile, final_pdf, email_to, storage_path, pdf):
+        return {
+            "email_to": email_to,
+            "email_subject": "Panopto SDR AI Prospect Profile ready for review",
+            "email_body": self._email_template(linkedin_profile, final_pdf, email_to),
+            "attachments": [
                 {
                     "filename": storage_path,
                     "content": pdf,
                     "mimetype": "application/pdf",
                 }
             ],
+        }
+
+    def send_email(self, linkedin_profile, final_pdf, email_to, storage_path, pdf):
+        processing_spinner_style()
+        self.send_email_with_attachment(
+            **self._report_email_kwargs(linkedin_profile, final_pdf, email_to, storage_path, pdf)
         )
 
-    def send_email_with_attachment(self, email_to, email_subject, email_body, attachments=None):
-        """Send email with attachments using SendGrid API"""
+    async def asend_email(self, linkedin_profile, final_pdf, email_to, storage_path, pdf):
+        processing_spinner_style()
+        await self.asend_email_with_attachment(
+            **self._report_email_kwargs(linkedin_profile, final_pdf, email_to, storage_path, pdf)
+        )
 
+    def _build_message(self, email_to, email_subject, email_body, attachments=None):
         message = Mail(
             from_email=Email(config("EMAIL_HOST_USER")),
             to_emails=email_to,
@@ -82,8 +97,39 @@ class EmailClient:
             )
             message.add_attachment(attached_file)
 
+        return message
+
+    def send_email_with_attachment(self, email_to, email_subject, email_body, attachments=None):
+        """Send email with attachments using SendGrid API"""
+
+        message = self._build_message(email_to, email_subject, email_body, attachments)
+
         try:
             sg = SendGridAPIClient(config("SENDGRID_API_KEY"))
-            sg.send(message)
+            sg.client.timeout = provider_timeout("sendgrid")
+            with span("sendgrid", "http", method="POST", url=self.SENDGRID_MAIL_SEND_URL) as record, \
+                    provider_slot("sendgrid"):
+                response = sg.send(message)
+                record["status"] = response.status_code
+        except Exception as e:
+            print(f"Error sending email: {e}")
+            raise
+
+    async def asend_email_with_attachment(self, email_to, email_subject, email_body, attachments=None):
+        """Send email with attachments by posting directly to the SendGrid v3 API"""
+
+        message = self._build_message(email_to, email_subject, email_body, attachments)
+
+        try:
+            with span("sendgrid", "http", method="POST", url=self.SENDGRID_MAIL_SEND_URL) as record:
+                async with aprovider_slot("sendgrid"), httpx.AsyncClient(timeout=provider_timeout("sendgrid")) as client:
+                    response = await client.post(
+                        self.SENDGRID_MAIL_SEND_URL,
+                        json=message.get(),
+                        headers={"Authorization": f"Bearer {config('SENDGRID_API_KEY')}"},
+                    )
+                    record["status"] = response.status_code
+                    response.raise_for_status()
         except Exception as e:
             print(f"Error sending email: {e}")
+            raise
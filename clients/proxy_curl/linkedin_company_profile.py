@@ -1,7 +1,20 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
 from decouple import config
 
-from supabase_client import supabase_client
-from utils import call_api
+from clients.web_scrapper_client.web_scrapper_client import WebsiteCrawler
+from company_cache import CachedCompany, company_cache, company_key, profile_keys
+from deadlines import ahedged, hedged
+from supabase_client import get_async_supabase_client, supabase_client
+from utils import acall_api, call_api
+
+logger = logging.getLogger(__name__)
+
+# Companies whose profile and website are fetched at the same time.
+COMPANY_FETCH_CONCURRENCY = config("COMPANY_FETCH_CONCURRENCY", default=4, cast=int)
 
 
 class LinkedinCompanyProfileClient:
@@ -44,24 +57,159 @@ class LinkedinCompanyProfileClient:
 
         return parsed_company_profile_data
 
-    def store_company_linkedin_profiles(self):
-        company_records = []
+    def _company_profile_url(self, url):
+        base_url = self.school_base_url if url.startswith("https://www.linkedin.com/school/") else self.company_base_url
+        return f"{base_url}{url}"
+
+    def _fetch_company_profile(self, url):
+        try:
+            raw_data = hedged(
+                "proxycurl", call_api, "get", self._company_profile_url(url), self.headers, provider="proxycurl"
+            )
+            return self._parse_company_profile_data(raw_data)
+        except Exception as e:
+            logger.warning("Failed to process %s: %s", url, e)
+
+    def _pool_size(self):
+        return max(min(len(self.company_linkedin_urls), COMPANY_FETCH_CONCURRENCY), 1)
+
+    @staticmethod
+    def _shared_company_key(record, url_key):
+        """
+        This method returns the `universal_name_id` key of a fetched company when it differs from the name in the
+        prospect's URL (e.g. after a rename), so that the company's stored rows are shared rather than duplicated.
+        """
+        key = next((key for key in profile_keys(record) if key[0] == "universal_name_id"), None) if record else None
+        return key if key != url_key else None
+
+    def _shared_company(self, record, url_key):
+        key = self._shared_company_key(record, url_key)
+        return company_cache.get(key) if key else None
+
+    def _store_company(self, record, website_crawler):
+        response = supabase_client.table("sdr_agent_companylinkedinprofile").insert(record).execute()
+        company_profile = response.data[0]
+        websites = []
+        if website_crawler and website_crawler.result:
+            websites = website_crawler.save_company_website(company_profile["id"])
+
+        company_cache.put(company_profile, websites)
+        return CachedCompany(company_profile, websites)
+
+    def _fetch_company(self, url):
+        """
+        This method returns the stored company of the URL when it was fetched within the company cache TTL.
+        Otherwise it fetches the company profile, crawls its website as soon as the profile gives its URL, and
+        stores and caches both. Concurrent misses of the same company wait for the first one to store it.
+        """
+        url_key = company_key(url)
+        with company_cache.single_flight(url_key):
+            cached_company = company_cache.get(url_key)
+            if cached_company:
+                logger.info("Sharing the stored company profile of %s", url_key[1])
+                return cached_company
+
+            record = self._fetch_company_profile(url)
+            cached_company = self._shared_company(record, url_key)
+            if cached_company or not record:
+                return cached_company
+
+            website_crawler = None
+            if record.get("website"):
+                website_crawler = WebsiteCrawler({"website_url": record["website"]})
+                try:
+                    website_crawler.crawl_page()
+                except Exception as e:
+                    logger.warning("Error in WebsiteCrawler: %s", e)
+
+            return self._store_company(record, website_crawler)
+
+    def _combine_companies(self, companies):
+        """
+        This method lists the companies in the order of their URLs, once each. Returns the company profiles
+        and their websites.
+        """
+        company_profiles, company_websites, company_ids = [], [], set()
+        for company_profile, websites in filter(None, companies):
+            if company_profile["id"] not in company_ids:
+                company_ids.add(company_profile["id"])
+                company_profiles.append(company_profile)
+                if websites:
+                    company_websites.append(websites)
+
+        self.saved_profiles = company_profiles
+        return company_profiles, company_websites
+
+    def store_company_profiles_and_websites(self):
+        """
+        This method fetches the company profiles and crawls their websites in a bounded pool, each crawl
+        starting as soon as its company profile arrives. Companies stored for another prospect within the
+        company cache TTL are shared instead. Returns the profiles and websites of the companies.
+        """
+        with ThreadPoolExecutor(max_workers=self._pool_size()) as executor:
+            futures = [
+                executor.submit(copy_context().run, self._fetch_company, url) for url in self.company_linkedin_urls
+            ]
+            return self._combine_companies([future.result() for future in futures])
+
+    async def _afetch_company_profile(self, url):
+        try:
+            raw_data = await ahedged(
+                "proxycurl", acall_api, "get", self._company_profile_url(url), self.headers, provider="proxycurl"
+            )
+            return self._parse_company_profile_data(raw_data)
+        except Exception as e:
+            logger.warning("Failed to process %s: %s", url, e)
+
+    async def _ashared_company(self, record, url_key):
+        key = self._shared_company_key(record, url_key)
+        return await company_cache.aget(key) if key else None
+
+    async def _astore_company(self, record, website_crawler):
+        async_supabase_client = await get_async_supabase_client()
+        response = await async_supabase_client.table("sdr_agent_companylinkedinprofile").insert(record).execute()
+        company_profile = response.data[0]
+        websites = []
+        if website_crawler and website_crawler.result:
+            websites = await website_crawler.asave_company_website(company_profile["id"])
+
+        company_cache.put(company_profile, websites)
+        return CachedCompany(company_profile, websites)
+
+    async def _afetch_company(self, url, semaphore):
+        """
+        Async variant of `_fetch_company`, holding a slot of `semaphore` while it fetches.
+        """
+        url_key = company_key(url)
+        async with company_cache.asingle_flight(url_key):
+            cached_company = await company_cache.aget(url_key)
+            if cached_company:
+                logger.info("Sharing the stored company profile of %s", url_key[1])
+                return cached_company
+
+            async with semaphore:
+                record = await self._afetch_company_profile(url)
+                cached_company = await self._ashared_company(record, url_key)
+                if cached_company or not record:
+                    return cached_company
 
-        for url in self.company_linkedin_urls:
-            try:
-                base_url = self.school_base_url if url.startswith("https://www.linkedin.com/school/") else self.company_base_url
-                full_url = f"{base_url}{url}"
-                raw_data = call_api("get", full_url, self.headers)
+                website_crawler = None
+                if record.get("website"):
+                    website_crawler = WebsiteCrawler({"website_url": record["website"]})
+                    try:
+                        await website_crawler.acrawl_page()
+                    except Exception as e:
+                        logger.warning("Error in WebsiteCrawler: %s", e)
 
-                parsed_data = self._parse_company_profile_data(raw_data)
-                company_records.append(parsed_data)
-            except Exception as e:
-                print(f"Failed to process {url}: {str(e)}")
+                return await self._astore_company(record, website_crawler)
 
-        if company_records:
-            response = supabase_client.table("sdr_agent_companylinkedinprofile").insert(company_records).execute()
-            self.saved_profiles = response.data
-            return self.saved_profiles
+    async def astore_company_profiles_and_websites(self):
+        """
+        Async variant of `store_company_profiles_and_websites`.
+        """
+        semaphore = asyncio.Semaphore(COMPANY_FETCH_CONCURRENCY)
+        companies = await asyncio.gather(*(self._afetch_company(url, semaphore) for url in self.company_linkedin_urls))
+        return self._combine_companies(companies)
 
     def get_company_websites(self):
         return [
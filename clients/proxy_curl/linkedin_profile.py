@@ -1,13 +1,35 @@
+import logging
+from datetime import datetime, timezone
+
 from decouple import config
 
-from supabase_client import supabase_client
-from utils import call_api
+from linkedin_profile_cache import linkedin_profile_cache, public_identifier
+from supabase_client import get_async_supabase_client, supabase_client
+from utils import acall_api, call_api
+
+logger = logging.getLogger(__name__)
+
+# Current companies of the prospect whose profile and website are fetched.
+RECENT_COMPANIES_COUNT = config("RECENT_COMPANIES_COUNT", default=2, cast=int)
+
+
+def recent_company_urls(linkedin_profile):
+    """
+    LinkedIn URLs of the current companies of a profile, in the order of its experiences, whose profiles and
+    websites are fetched.
+    """
+    return list(dict.fromkeys(
+        exp.get("company_linkedin_profile_url")
+        for exp in linkedin_profile.get("experiences") or []
+        if not exp.get("ends_at") and exp.get("company_linkedin_profile_url")
+    ))[:RECENT_COMPANIES_COUNT]
 
 
 class LinkedinProfileClient:
     def __init__(self, linkedin_profile_url):
         self.headers = {"Authorization": f"Bearer {config('PROXY_CURL_API_KEY')}"}
         self.url = f"{config('PROXY_CURL_LINKEDIN_PROFILE_URL')}{linkedin_profile_url}"
+        self.public_identifier = public_identifier(linkedin_profile_url)
         self.linkedin_profile = None
 
     def remove_redundant_profile_data(self, profile_data):
@@ -34,30 +56,62 @@ class LinkedinProfileClient:
 
         return profile_data
 
-    def store_linkedin_profile(self):
-        profile_data = call_api("get", self.url, self.headers)
-
+    def _format_profile_data(self, profile_data):
         if profile_data.get("code") and profile_data.get("code") != 200:
             raise Exception("❌ Failed to fetch LinkedIn profile. Please check the URL.")
 
-        formatted_profile_data = self.remove_redundant_profile_data(profile_data)
-
-        response = supabase_client.table("sdr_agent_linkedinprofile").insert(formatted_profile_data).execute()
+        return self.remove_redundant_profile_data(profile_data)
 
+    def _set_linkedin_profile(self, response, cached_profile=None):
         if response.data:
             self.linkedin_profile = response.data[0]
         else:
             raise Exception("Failed to insert LinkedIn profile.")
 
+        fetched_at = cached_profile.fetched_at if cached_profile else None
+        linkedin_profile_cache.put(self.linkedin_profile, self.public_identifier, fetched_at)
         return self.linkedin_profile
 
+    def _profile_data(self, cached_profile):
+        if cached_profile is None:
+            return None
+
+        logger.info(
+            "Reusing the LinkedIn profile of %s fetched at %s",
+            self.public_identifier,
+            datetime.fromtimestamp(cached_profile.fetched_at, timezone.utc).isoformat(),
+        )
+        return cached_profile.payload
+
+    def store_linkedin_profile(self):
+        """
+        This method stores the prospect's profile as a new row of this report. The Proxycurl payload is
+        reused when it was fetched less than the cache TTL ago, and otherwise fetched from Proxycurl.
+        """
+        cached_profile = linkedin_profile_cache.get(self.public_identifier)
+        formatted_profile_data = self._profile_data(cached_profile)
+        if formatted_profile_data is None:
+            profile_data = call_api("get", self.url, self.headers, provider="proxycurl")
+            formatted_profile_data = self._format_profile_data(profile_data)
+
+        response = supabase_client.table("sdr_agent_linkedinprofile").insert(formatted_profile_data).execute()
+
+        return self._set_linkedin_profile(response, cached_profile)
+
+    async def astore_linkedin_profile(self):
+        cached_profile = await linkedin_profile_cache.aget(self.public_identifier)
+        formatted_profile_data = self._profile_data(cached_profile)
+        if formatted_profile_data is None:
+            profile_data = await acall_api("get", self.url, self.headers, provider="proxycurl")
+            formatted_profile_data = self._format_profile_data(profile_data)
+
+        async_supabase_client = await get_async_supabase_client()
+        response = await async_supabase_client.table("sdr_agent_linkedinprofile").insert(formatted_profile_data).execute()
+
+        return self._set_linkedin_profile(response, cached_profile)
+
     def get_recent_experience(self):
         if not self.linkedin_profile:
             raise ValueError("LinkedIn profile data not available. Call store_linkedin_profile first.")
 
-        experiences = self.linkedin_profile.get("experiences", [])
-        return set(list(
-            exp.get("company_linkedin_profile_url")
-            for exp in experiences
-            if not exp.get("ends_at") and exp.get("company_linkedin_profile_url")
-        )[:2])
+        return recent_company_urls(self.linkedin_profile)
@@ -1,7 +1,8 @@
 from decouple import config
 
-from supabase_client import supabase_client
-from utils import call_api
+from deadlines import ahedged, hedged
+from supabase_client import get_async_supabase_client, supabase_client
+from utils import acall_api, call_api
 
 
 class GoogleNewsClient:
@@ -30,10 +31,20 @@ class GoogleNewsClient:
         return parsed_news[:20]
 
     def store_persons_news(self):
-        google_news = call_api("get", self.base_url, {}, params=self.params)
+        google_news = hedged("serp", call_api, "get", self.base_url, {}, params=self.params, provider="serp")
         parsed_news = self._parse_news(google_news)
         response = []
         if parsed_news:
             response = supabase_client.table("sdr_agent_googlenews").insert(parsed_news).execute()
 
         return response.data if response else None
+
+    async def astore_persons_news(self):
+        google_news = await ahedged("serp", acall_api, "get", self.base_url, {}, params=self.params, provider="serp")
+        parsed_news = self._parse_news(google_news)
+        response = []
+        if parsed_news:
+            async_supabase_client = await get_async_supabase_client()
+            response = await async_supabase_client.table("sdr_agent_googlenews").insert(parsed_news).execute()
+
+        return response.data if response else None
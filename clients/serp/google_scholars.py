@@ -1,12 +1,12 @@
 from decouple import config
 
-from clients.ai_client.ai_client import AIClient
-from supabase_client import supabase_client
-from utils import call_api
+from clients.serp.scholar_matcher import scholar_author_matcher
+from supabase_client import get_async_supabase_client, supabase_client
+from utils import acall_api, call_api
 
 
 class GoogleScholarsClient:
-    def __init__(self, search_term, linkedin_profile_id):
+    def __init__(self, search_term, linkedin_profile_id, ai_client):
         self.base_url = f"{config('SERP_URL')}"
         self.linkedin_profile_id = linkedin_profile_id
         self.google_scholar_params = {
@@ -15,6 +15,8 @@ class GoogleScholarsClient:
             "api_key": config("SERP_API_KEY"),
         }
         self.scholar_profile = None
+        # The AIClient of the run, shared with the analysis stage. Author matching only reads its LinkedIn profile.
+        self.ai_client = ai_client
 
     def _remove_redundant_profile_data(self, profiles):
         updated_profiles = []
@@ -23,24 +25,57 @@ class GoogleScholarsClient:
             updated_profiles.append(profile)
         return updated_profiles
 
+    def _find_author_profile(self, parsed_profiles, author_id):
+        author_profile = next((profile for profile in parsed_profiles if profile["author_id"] == author_id), None)
+        if author_profile:
+            author_profile["linkedin_profile_id"] = self.linkedin_profile_id
+
+        return author_profile
+
+    def _set_scholar_profile(self, response):
+        if response.data:
+            self.scholar_profile = response.data[0]
+        else:
+            raise Exception("Failed to insert scholar profile.")
+
     def store_scholar_profile(self):
-        scholar_profiles = call_api("get", self.base_url, {}, params=self.google_scholar_params)
+        scholar_profiles = call_api("get", self.base_url, {}, params=self.google_scholar_params, provider="serp")
         parsed_profiles = self._remove_redundant_profile_data(scholar_profiles)
 
-        ai_client = AIClient(self.linkedin_profile_id)
-        author = ai_client.publication_author_chain(parsed_profiles)
-        author_id = author.author_id
+        author_id, ambiguous_profiles, _ = scholar_author_matcher.match(
+            parsed_profiles, self.ai_client.linkedin_profile
+        )
+        if ambiguous_profiles:
+            author = self.ai_client.publication_author_chain(ambiguous_profiles)
+            author_id = author.author_id
 
         if author_id:
-            author_profile = next((profile for profile in parsed_profiles if profile["author_id"] == author_id), None)
+            author_profile = self._find_author_profile(parsed_profiles, author_id)
 
             if author_profile:
-                author_profile["linkedin_profile_id"] = self.linkedin_profile_id
                 response = supabase_client.table("sdr_agent_googlescholarprofile").insert(author_profile).execute()
-                if response.data:
-                    self.scholar_profile = response.data[0]
-                else:
-                    raise Exception("Failed to insert scholar profile.")
+                self._set_scholar_profile(response)
+
+        return author_id
+
+    async def astore_scholar_profile(self):
+        scholar_profiles = await acall_api("get", self.base_url, {}, params=self.google_scholar_params, provider="serp")
+        parsed_profiles = self._remove_redundant_profile_data(scholar_profiles)
+
+        author_id, ambiguous_profiles, _ = scholar_author_matcher.match(
+            parsed_profiles, self.ai_client.linkedin_profile
+        )
+        if ambiguous_profiles:
+            author = await self.ai_client.apublication_author_chain(ambiguous_profiles)
+            author_id = author.author_id
+
+        if author_id:
+            author_profile = self._find_author_profile(parsed_profiles, author_id)
+
+            if author_profile:
+                async_supabase_client = await get_async_supabase_client()
+                response = await async_supabase_client.table("sdr_agent_googlescholarprofile").insert(author_profile).execute()
+                self._set_scholar_profile(response)
 
         return author_id
 
@@ -63,16 +98,32 @@ class GoogleScholarsClient:
 
         return parsed_articles
 
-    def store_scholar_articles(self, author_id):
-        google_articles_params = {
+    def _scholar_articles_params(self, author_id):
+        return {
             "engine": "google_scholar_author",
             "author_id": author_id,
             "api_key": config("SERP_API_KEY"),
         }
-        scholar_articles = call_api("get", self.base_url, {}, params=google_articles_params)
+
+    def store_scholar_articles(self, author_id):
+        scholar_articles = call_api(
+            "get", self.base_url, {}, params=self._scholar_articles_params(author_id), provider="serp"
+        )
         parsed_articles = self._parse_scholar_articles_data(scholar_articles)
         response = []
         if parsed_articles:
             response = supabase_client.table("sdr_agent_googlepublication").insert(parsed_articles).execute()
 
         return response.data if response else None
+
+    async def astore_scholar_articles(self, author_id):
+        scholar_articles = await acall_api(
+            "get", self.base_url, {}, params=self._scholar_articles_params(author_id), provider="serp"
+        )
+        parsed_articles = self._parse_scholar_articles_data(scholar_articles)
+        response = []
+        if parsed_articles:
+            async_supabase_client = await get_async_supabase_client()
+            response = await async_supabase_client.table("sdr_agent_googlepublication").insert(parsed_articles).execute()
+
+        return response.data if response else None
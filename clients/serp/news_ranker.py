@@ -0,0 +1,97 @@
+import re
+import unicodedata
+
+from decouple import config
+
+# Rank the Google News results locally instead of asking the LLM to pick the articles to crawl.
+NEWS_LOCAL_RANKING = config("NEWS_LOCAL_RANKING", default=True, cast=bool)
+# Articles crawled and summarized for the news section.
+NEWS_TOP_COUNT = config("NEWS_TOP_COUNT", default=3, cast=int)
+# Score an article needs to be about the prospect.
+NEWS_MIN_SCORE = config("NEWS_MIN_SCORE", default=0.5, cast=float)
+# Share of title words two results need in common to be copies of the same story.
+NEWS_DUPLICATE_SIMILARITY = config("NEWS_DUPLICATE_SIMILARITY", default=0.6, cast=float)
+
+# Weight of each signal in the score of an article.
+NEWS_SIGNAL_WEIGHTS = {"name": 0.7, "employer": 0.3}
+
+# Words that are not part of what makes an employer or a story recognizable.
+STOP_WORDS = {
+    "a", "an", "and", "at", "by", "for", "in", "is", "of", "on", "the", "to", "with", "inc", "llc", "ltd",
+    "corp", "corporation", "company", "co", "group", "gmbh", "plc",
+}
+NAME_TITLES = {"dr", "prof", "mr", "mrs", "ms", "phd", "md", "jr", "sr"}
+
+
+def _words(text):
+    text = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode().lower()
+    return [word for word in re.findall(r"[a-z0-9]+", text) if word not in STOP_WORDS]
+
+
+def _prospect_signals(linkedin_profile):
+    experiences = linkedin_profile.get("experiences") or []
+    name = linkedin_profile.get("full_name") or " ".join(
+        filter(None, [linkedin_profile.get("first_name"), linkedin_profile.get("last_name")])
+    )
+    employers = [
+        (set(_words(experience.get("company"))), experience.get("ends_at") is None) for experience in experiences
+    ]
+    return {
+        "name": [word for word in _words(name) if word not in NAME_TITLES],
+        "employers": [(words, current) for words, current in employers if words],
+    }
+
+
+def _name_score(title_words, name_words):
+    if not name_words:
+        return 0.0
+    if set(name_words) <= title_words:
+        return 1.0
+    # The last name alone may be someone else's; it only counts along with an employer.
+    return 0.4 if name_words[-1] in title_words else 0.0
+
+
+def _employer_score(words, employers):
+    return max((1.0 if current else 0.8 for employer, current in employers if employer <= words), default=0.0)
+
+
+def score_news(news, prospect):
+    """
+    Relevance in [0, 1] of a Google News result to the prospect, from their name in the title and their
+    current or past employers in the title or source.
+    """
+    title_words = set(_words(news.get("title")))
+    employer_words = title_words | set(_words(news.get("source_name")))
+    return round(
+        NEWS_SIGNAL_WEIGHTS["name"] * _name_score(title_words, prospect["name"])
+        + NEWS_SIGNAL_WEIGHTS["employer"] * _employer_score(employer_words, prospect["employers"]),
+        3,
+    )
+
+
+def _is_duplicate(title_words, other_title_words):
+    union = title_words | other_title_words
+    return bool(union) and len(title_words & other_title_words) / len(union) >= NEWS_DUPLICATE_SIMILARITY
+
+
+def rank_news(news, linkedin_profile, limit=NEWS_TOP_COUNT, min_score=NEWS_MIN_SCORE):
+    """
+    Return up to `limit` Google News results about the prospect, most relevant first. Results under
+    `min_score` are dropped and syndicated copies of a story are kept once, in their best ranked copy.
+    """
+    prospect = _prospect_signals(linkedin_profile or {})
+    scored = [(score_news(item, prospect), item) for item in news or [] if item.get("link")]
+    scored = [(score, item) for score, item in scored if score >= min_score]
+    scored.sort(key=lambda scored_item: (-scored_item[0], scored_item[1].get("position") or 0))
+
+    ranked, ranked_titles = [], []
+    for score, item in scored:
+        title_words = set(_words(item.get("title")))
+        if any(_is_duplicate(title_words, ranked_title) for ranked_title in ranked_titles):
+            continue
+        ranked.append({**item, "score": score})
+        ranked_titles.append(title_words)
+        if len(ranked) == limit:
+            break
+
+    return ranked
@@ -0,0 +1,192 @@
+import logging
+import re
+import threading
+import unicodedata
+from collections import Counter, namedtuple
+from difflib import SequenceMatcher
+
+from decouple import config
+
+from instrumentation import annotate_span
+
+logger = logging.getLogger(__name__)
+
+# Candidates whose name is less similar than this to the prospect's are never considered the prospect.
+SCHOLAR_NAME_THRESHOLD = config("SCHOLAR_NAME_THRESHOLD", default=0.85, cast=float)
+# Score a candidate needs to be accepted without the LLM, and its lead over the runner-up.
+SCHOLAR_ACCEPT_SCORE = config("SCHOLAR_ACCEPT_SCORE", default=0.7, cast=float)
+SCHOLAR_ACCEPT_MARGIN = config("SCHOLAR_ACCEPT_MARGIN", default=0.15, cast=float)
+
+# Weight of each signal in the score of a candidate.
+SCHOLAR_SIGNAL_WEIGHTS = {"name": 0.5, "affiliation": 0.25, "email": 0.15, "interests": 0.1}
+
+# Words that say nothing about which organization or field someone belongs to.
+STOP_WORDS = {
+    "a", "an", "and", "at", "for", "in", "of", "on", "the", "to", "with", "de", "la", "university", "college",
+    "school", "institute", "department", "dept", "faculty", "inc", "llc", "ltd", "corp", "corporation",
+    "company", "group", "co", "gmbh", "professor", "assistant", "associate", "senior", "student", "phd",
+    "researcher", "research", "scientist", "engineer", "director", "head", "lead", "chief", "manager",
+}
+NAME_TITLES = {"dr", "prof", "professor", "mr", "mrs", "ms", "phd", "md", "jr", "sr"}
+# Labels of an email domain that are not the organization, e.g. the "mail" and "edu" of "mail.mit.edu".
+DOMAIN_LABELS = {"com", "org", "net", "edu", "gov", "ac", "co", "io", "ai", "mail", "email", "cs", "www"}
+
+ScholarMatch = namedtuple("ScholarMatch", ["author_id", "ambiguous_profiles", "scores"])
+
+
+def _words(text):
+    text = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode().lower()
+    return re.findall(r"[a-z0-9]+", text)
+
+
+def _keywords(*texts):
+    return {word for text in texts for word in _words(text) if word not in STOP_WORDS and len(word) > 1}
+
+
+def _name_similarity(name, prospect_name):
+    """
+    Similarity of two person names in [0, 1], ignoring case, accents, titles and word order. A name written
+    with initials ("J. Doe") matches the full name it abbreviates.
+    """
+    words = [word for word in _words(name) if word not in NAME_TITLES]
+    prospect_words = [word for word in _words(prospect_name) if word not in NAME_TITLES]
+    if not words or not prospect_words:
+        return 0.0
+
+    similarity = SequenceMatcher(None, " ".join(sorted(words)), " ".join(sorted(prospect_words))).ratio()
+    shorter, longer = sorted([words, prospect_words], key=len)
+    abbreviates = all(
+        any(word == other or (len(word) == 1 and other.startswith(word)) for other in longer) for word in shorter
+    )
+    if abbreviates and shorter[-1] == longer[-1]:
+        similarity = max(similarity, 0.9)
+    return similarity
+
+
+def _overlap(words, other_words):
+    return len(words & other_words) / len(words) if words else 0.0
+
+
+def _affiliation_similarity(affiliations, organizations):
+    """
+    Share of the name of the best matching employer or school found in the affiliations. Affiliations also
+    hold roles and departments ("Professor of Physics, Stanford University"), so they are not compared whole.
+    """
+    affiliation_words = _keywords(affiliations)
+    return max((_overlap(organization, affiliation_words) for organization in organizations), default=0.0)
+
+
+def _email_domain_words(email):
+    match = re.search(r"([a-z0-9-]+(?:\.[a-z0-9-]+)+)\s*$", (email or "").lower())
+    if not match:
+        return set()
+    return {label for label in match.group(1).split(".") if label not in DOMAIN_LABELS and len(label) > 1}
+
+
+def _prospect_signals(linkedin_profile):
+    experiences = linkedin_profile.get("experiences") or []
+    education = linkedin_profile.get("education") or []
+    organizations = [experience.get("company") for experience in experiences]
+    organizations += [school.get("school") for school in education]
+    emails = [linkedin_profile.get("email"), linkedin_profile.get("work_email")]
+    emails += linkedin_profile.get("personal_emails") or []
+    fields = [experience.get("title") for experience in experiences]
+    fields += [school.get("field_of_study") for school in education]
+    fields += [linkedin_profile.get(key) for key in ("headline", "occupation", "summary", "industry")]
+    fields += linkedin_profile.get("skills") or []
+    return {
+        "name": linkedin_profile.get("full_name")
+        or " ".join(filter(None, [linkedin_profile.get("first_name"), linkedin_profile.get("last_name")])),
+        "organizations": [words for words in map(_keywords, organizations) if words],
+        "domains": {label for email in emails for label in _email_domain_words(email)},
+        "fields": _keywords(*fields),
+    }
+
+
+def score_candidate(candidate, prospect):
+    """
+    Score the signals of a Google Scholar candidate against the prospect's, each in [0, 1].
+    """
+    domain_words = _email_domain_words(candidate.get("email"))
+    organization_words = set().union(*prospect["organizations"])
+    interests = [interest.get("title") for interest in candidate.get("interests") or [] if isinstance(interest, dict)]
+    return {
+        "name": _name_similarity(candidate.get("name"), prospect["name"]),
+        "affiliation": _affiliation_similarity(candidate.get("affiliations"), prospect["organizations"]),
+        "email": 1.0 if domain_words & (organization_words | prospect["domains"]) else 0.0,
+        "interests": _overlap(_keywords(*interests), prospect["fields"]),
+    }
+
+
+class ScholarAuthorMatcher:
+    """
+    Deterministic matching of Google Scholar candidates to the prospect, on name similarity, affiliation
+    against current and past employers and schools, verified email domain and research interests. Only a
+    match it cannot settle is left to the LLM, with just the plausible candidates.
+    """
+
+    def __init__(
+        self,
+        name_threshold=SCHOLAR_NAME_THRESHOLD,
+        accept_score=SCHOLAR_ACCEPT_SCORE,
+        accept_margin=SCHOLAR_ACCEPT_MARGIN,
+        weights=SCHOLAR_SIGNAL_WEIGHTS,
+    ):
+        self.name_threshold = name_threshold
+        self.accept_score = accept_score
+        self.accept_margin = accept_margin
+        self.weights = weights
+        self.outcomes = Counter()
+        self._lock = threading.Lock()
+
+    def _score(self, signals):
+        return round(sum(self.weights[signal] * value for signal, value in signals.items()), 3)
+
+    def _record(self, outcome, scores):
+        with self._lock:
+            self.outcomes[outcome] += 1
+            total = sum(self.outcomes.values())
+            ambiguous = self.outcomes["ambiguous"]
+
+        annotate_span(scholar_match=outcome, scholar_scores=scores)
+        logger.info("Google Scholar author match: %s, LLM needed for %s of %s matches", outcome, ambiguous, total)
+
+    def match(self, candidates, linkedin_profile):
+        """
+        This method returns the author id of the candidate that is the prospect, or `None`, along with the
+        candidates the LLM has to choose from when the scores are ambiguous and the score of every candidate.
+        """
+        prospect = _prospect_signals(linkedin_profile or {})
+        scored = []
+        for candidate in candidates:
+            signals = score_candidate(candidate, prospect)
+            if signals["name"] >= self.name_threshold:
+                scored.append((self._score(signals), candidate))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        scores = {candidate.get("author_id"): score for score, candidate in scored}
+
+        if not scored:
+            self._record("no_candidate", scores)
+            return ScholarMatch(None, [], scores)
+
+        top_score, top_candidate = scored[0]
+        runner_up_score = scored[1][0] if len(scored) > 1 else 0.0
+        if top_score >= self.accept_score and top_score - runner_up_score >= self.accept_margin:
+            self._record("local_match", scores)
+            return ScholarMatch(top_candidate.get("author_id"), [], scores)
+
+        self._record("ambiguous", scores)
+        return ScholarMatch(None, [candidate for _, candidate in scored], scores)
+
+    def stats(self):
+        """
+        Counts of each outcome so far and the share of matches that needed the LLM.
+        """
+        with self._lock:
+            outcomes = dict(self.outcomes)
+        total = sum(outcomes.values())
+        llm_rate = round(outcomes.get("ambiguous", 0) / total, 3) if total else 0.0
+        return {**outcomes, "total": total, "llm_rate": llm_rate}
+
+
+scholar_author_matcher = ScholarAuthorMatcher()
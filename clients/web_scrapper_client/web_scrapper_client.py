@@ -1,6 +1,60 @@
 import asyncio
-from crawl4ai import AsyncWebCrawler
-from supabase_client import supabase_client
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from crawler_pool import crawler_pool
+from deadlines import ahedged, hedged, provider_timeout
+from instrumentation import span
+from provider_limits import aprovider_slot, provider_slot
+from supabase_client import get_async_supabase_client, supabase_client
+
+logger = logging.getLogger(__name__)
+
+
+def _markdown(result):
+    return result.markdown if result and result.markdown else ""
+
+
+def _page_markdown(website_crawler):
+    try:
+        return website_crawler.crawl_page()
+    except Exception as e:
+        logger.warning("Crawling %s failed: %s", website_crawler.url, e)
+        return ""
+
+
+async def _apage_markdown(website_crawler):
+    try:
+        return await website_crawler.acrawl_page()
+    except Exception as e:
+        logger.warning("Crawling %s failed: %s", website_crawler.url, e)
+        return ""
+
+
+def crawl_pages(urls):
+    """
+    This function crawls several pages at once on the shared browser pool and returns their markdown, in the
+    order of `urls`. Every page is crawled like `WebsiteCrawler.crawl_page`: in its own crawl4ai slot, hedged
+    and with its own timeout, so a page that fails or times out gives an empty string without losing the
+    others.
+    """
+    if not urls:
+        return []
+
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        futures = [
+            executor.submit(copy_context().run, _page_markdown, WebsiteCrawler({"website_url": url})) for url in urls
+        ]
+        return [future.result() for future in futures]
+
+
+async def acrawl_pages(urls):
+    """
+    Async variant of `crawl_pages`.
+    """
+    return list(await asyncio.gather(*(_apage_markdown(WebsiteCrawler({"website_url": url})) for url in urls)))
+
 
 class WebsiteCrawler:
     def __init__(self, website):
@@ -8,34 +62,98 @@ class WebsiteCrawler:
         self.company_profile_id = website.get("id")
         self.result = None
 
+    def _fetch_page(self):
+        with span("crawl4ai", "crawl", url=self.url) as record:
+            with provider_slot("crawl4ai"):
+                result = crawler_pool.crawl(self.url, timeout=provider_timeout("crawl4ai"))
+            record["bytes"] = len(_markdown(result).encode("utf-8"))
+
+        return result
+
+    async def _fetch(self):
+        with span("crawl4ai", "crawl", url=self.url) as record:
+            async with aprovider_slot("crawl4ai"):
+                result = await asyncio.wait_for(crawler_pool.acrawl(self.url), provider_timeout("crawl4ai"))
+            record["bytes"] = len(_markdown(result).encode("utf-8"))
+
+        return result
+
+    def _crawl_page(self):
+        """
+        Sync variant of `_crawl`, which waits on the shared browser pool instead of running an event loop.
+        """
+        try:
+            self.result = hedged("crawl4ai", self._fetch_page)
+        except TimeoutError:
+            logger.warning("Crawling %s timed out", self.url)
+
     async def _crawl(self):
-        async with AsyncWebCrawler() as crawler:
-            self.result = await crawler.arun(url=self.url)
+        """
+        This method crawls the page, with a hedged duplicate crawl if it is slow. A page that does not load
+        within the crawl timeout leaves `result` empty.
+        """
+        try:
+            self.result = await ahedged("crawl4ai", self._fetch)
+        except asyncio.TimeoutError:
+            logger.warning("Crawling %s timed out", self.url)
+
+    def _website_data(self):
+        return {
+            "url": self.url,
+            "markdown": self.result.markdown,
+            "company_profile_id": self.company_profile_id,
+        }
 
     def crawl_page(self):
         content = ""
-        asyncio.run(self._crawl())
+        self._crawl_page()
+        if self.result:
+            content = self.result.markdown
+
+        return content
+
+    async def acrawl_page(self):
+        content = ""
+        await self._crawl()
         if self.result:
             content = self.result.markdown
 
         return content
 
-    def store_company_website(self):
+    def save_company_website(self, company_profile_id=None):
+        """
+        This method stores the crawled page as the website of the company, which can be given only once its
+        profile is stored.
+        """
         websites = []
+        if company_profile_id is not None:
+            self.company_profile_id = company_profile_id
         try:
-            asyncio.run(self._crawl())
-
             if self.result:
-                website_data = {
-                    "url": self.url,
-                    "markdown": self.result.markdown,
-                    "company_profile_id": self.company_profile_id,
-                }
+                response = supabase_client.table("sdr_agent_companywebsite").insert([self._website_data()]).execute()
+                websites = response.data
 
-                response = supabase_client.table("sdr_agent_companywebsite").insert([website_data]).execute()
+        except Exception as e:
+            logger.warning("Error in WebsiteCrawler: %s", e)
+
+        return websites
+
+    async def asave_company_website(self, company_profile_id=None):
+        """
+        Async variant of `save_company_website`.
+        """
+        websites = []
+        if company_profile_id is not None:
+            self.company_profile_id = company_profile_id
+        try:
+            if self.result:
+                async_supabase_client = await get_async_supabase_client()
+                response = await async_supabase_client.table("sdr_agent_companywebsite").insert(
+                    [self._website_data()]
+                ).execute()
                 websites = response.data
 
         except Exception as e:
-            print("Error in WebsiteCrawler:", e)
+            logger.warning("Error in WebsiteCrawler: %s", e)
 
         return websites
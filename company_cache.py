@@ -0,0 +1,220 @@
+import asyncio
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from urllib.parse import unquote, urlsplit
+from weakref import WeakKeyDictionary
+
+from decouple import config
+
+from instrumentation import span
+from supabase_client import get_async_supabase_client, supabase_client
+
+COMPANY_CACHE_ENABLED = config("COMPANY_CACHE_ENABLED", default=True, cast=bool)
+# Seconds a stored company profile and its crawled website are shared by the prospects working there.
+COMPANY_CACHE_TTL = config("COMPANY_CACHE_TTL", default=7 * 24 * 3600, cast=int)
+# Companies kept in the in-process index, least recently used first out.
+COMPANY_CACHE_MAX_ENTRIES = config("COMPANY_CACHE_MAX_ENTRIES", default=1000, cast=int)
+
+COMPANY_PATH_PATTERN = re.compile(r"^/(?:company|school|showcase)/([^/]+)")
+
+CachedCompany = namedtuple("CachedCompany", ["profile", "websites"])
+
+
+def company_key(linkedin_url):
+    """
+    Cache key of a LinkedIn company or school URL: `("linkedin_internal_id", "1441")` for numeric URLs and
+    `("universal_name_id", "acme")` otherwise. Returns `None` for other URLs.
+    """
+    match = COMPANY_PATH_PATTERN.match(urlsplit((linkedin_url or "").strip()).path)
+    if not match:
+        return None
+
+    name = unquote(match.group(1)).strip().lower()
+    if not name:
+        return None
+    return ("linkedin_internal_id", name) if name.isdigit() else ("universal_name_id", name)
+
+
+def profile_keys(company_profile):
+    return [
+        (field, str(company_profile[field]).lower())
+        for field in ("universal_name_id", "linkedin_internal_id")
+        if company_profile.get(field)
+    ]
+
+
+def _fetched_at(company_profile):
+    try:
+        return datetime.fromisoformat(company_profile["created_at"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+
+
+class CompanyCache:
+    """
+    Cross-prospect cache of company intelligence, keyed by `universal_name_id` or `linkedin_internal_id`. A
+    company fetched less than `ttl` ago is served from an in-process index, or else from its latest
+    `sdr_agent_companylinkedinprofile` row and `sdr_agent_companywebsite` rows, which are then shared by
+    every prospect working there instead of being fetched, crawled and stored again. Hits and misses are
+    counted.
+
+    The rows keep the `linkedin_profile_id` of the prospect they were first fetched for: the schema has no
+    link between a company and the other prospects working there, which would need a link table. Reports
+    find their shared companies through this cache (see `AIClient._add_shared_companies`).
+    """
+
+    def __init__(self, ttl=COMPANY_CACHE_TTL, max_entries=COMPANY_CACHE_MAX_ENTRIES, enabled=COMPANY_CACHE_ENABLED):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.index = OrderedDict()
+        self.metrics = {"index_hits": 0, "database_hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        # Per-key locks of the companies being fetched, with the number of callers using them.
+        self._flights = {}
+        # asyncio locks are bound to their event loop, so the async ones are kept per loop.
+        self._async_flights: "WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = WeakKeyDictionary()
+
+    def _cutoff(self):
+        return time.time() - self.ttl
+
+    def _select(self, client, key):
+        field, value = key
+        cutoff = datetime.fromtimestamp(self._cutoff(), timezone.utc).isoformat()
+        return (
+            client.table("sdr_agent_companylinkedinprofile")
+            .select("*, sdr_agent_companywebsite(*)")
+            .eq(field, value)
+            .gte("created_at", cutoff)
+            .order("created_at", desc=True)
+            .limit(1)
+        )
+
+    def _indexed(self, key):
+        with self._lock:
+            entry = self.index.get(key)
+            if entry and entry[1] > self._cutoff():
+                self.index.move_to_end(key)
+                self.metrics["index_hits"] += 1
+                return copy.deepcopy(entry[0])
+            self.index.pop(key, None)
+        return None
+
+    def _found(self, key, rows):
+        with self._lock:
+            self.metrics["database_hits" if rows else "misses"] += 1
+        if not rows:
+            return None
+
+        company_profile = dict(rows[0])
+        websites = company_profile.pop("sdr_agent_companywebsite", None) or []
+        self.put(company_profile, websites)
+        return CachedCompany(copy.deepcopy(company_profile), copy.deepcopy(websites))
+
+    def get(self, key):
+        """
+        Return the `CachedCompany` of `key` when it was fetched less than the TTL ago, or `None`.
+        """
+        if not self.enabled or not key:
+            return None
+
+        company = self._indexed(key)
+        if company is not None:
+            return company
+
+        with span("supabase", "company_cache", key=":".join(key)):
+            return self._found(key, self._select(supabase_client, key).execute().data)
+
+    async def aget(self, key):
+        """
+        Async variant of `get`.
+        """
+        if not self.enabled or not key:
+            return None
+
+        company = self._indexed(key)
+        if company is not None:
+            return company
+
+        with span("supabase", "company_cache", key=":".join(key)):
+            async_supabase_client = await get_async_supabase_client()
+            return self._found(key, (await self._select(async_supabase_client, key).execute()).data)
+
+    def put(self, company_profile, websites):
+        """
+        Index a stored company profile and its stored websites under every key of the company.
+        """
+        if not self.enabled:
+            return
+
+        entry = (CachedCompany(copy.deepcopy(company_profile), copy.deepcopy(websites)), _fetched_at(company_profile))
+        with self._lock:
+            for key in profile_keys(company_profile):
+                self.index[key] = entry
+                self.index.move_to_end(key)
+            while len(self.index) > self.max_entries:
+                self.index.popitem(last=False)
+
+    def _join(self, flights, key, new_lock):
+        with self._lock:
+            lock, callers = flights.get(key) or (new_lock(), 0)
+            flights[key] = (lock, callers + 1)
+        return lock
+
+    def _leave(self, flights, key):
+        with self._lock:
+            lock, callers = flights[key]
+            if callers > 1:
+                flights[key] = (lock, callers - 1)
+            else:
+                del flights[key]
+
+    @contextmanager
+    def single_flight(self, key):
+        """
+        Hold the lock of `key` while the company is looked up, fetched and stored, so that prospects of the
+        same company missing the cache at the same time fetch it once: the others wait and then hit the cache.
+        """
+        if key is None:
+            yield
+            return
+
+        lock = self._join(self._flights, key, threading.Lock)
+        try:
+            with lock:
+                yield
+        finally:
+            self._leave(self._flights, key)
+
+    @asynccontextmanager
+    async def asingle_flight(self, key):
+        """
+        Async variant of `single_flight`, for the callers on the same event loop.
+        """
+        if key is None:
+            yield
+            return
+
+        with self._lock:
+            flights = self._async_flights.setdefault(asyncio.get_running_loop(), {})
+        lock = self._join(flights, key, asyncio.Lock)
+        try:
+            async with lock:
+                yield
+        finally:
+            self._leave(flights, key)
+
+    def stats(self):
+        with self._lock:
+            metrics = dict(self.metrics)
+        hits = metrics["index_hits"] + metrics["database_hits"]
+        lookups = hits + metrics["misses"]
+        return {**metrics, "hits": hits, "hit_rate": round(hits / lookups, 3) if lookups else 0.0}
+
+
+company_cache = CompanyCache()
@@ -0,0 +1,83 @@
+"""
+Measure the prompt tokens the context preparation (layout, packing and compact serialization) saves per chain.
+
+Loads a stored prospect and compares, for every chain, the input as it used to be rendered into the prompt
+(Python reprs of the raw Supabase rows) with the input `AIClient` sends now. Nothing is sent to the model.
+
+Usage:
+    python context_benchmark.py <linkedin_profile_id> [--json]
+"""
+import argparse
+import json
+
+from clients.ai_client.ai_client import AIClient
+from context_packer import count_tokens
+
+
+def _chain_inputs(ai_client):
+    return {
+        "linkedin_data_chain_prompt": ai_client._linkedin_data_chain_input(),
+        "about_company_chain_prompt": ai_client._company_about_chain_input(),
+        "engagement_style_chain_prompt": ai_client._engagement_style_chain_input(),
+        "suggested_additional_outreach_chain_prompt": ai_client._suggested_additional_outreach_chain_input(),
+        "talking_point_chain_prompt": ai_client._talking_point_chain_input("", ""),
+        "opportunities_chain_prompt": ai_client._opportunities_chain_input(),
+        "engagement_highlights_chain_prompt": ai_client._engagement_highlights_chain_input(),
+        "trigger_events_and_timing_chain_prompt": ai_client._trigger_events_and_timing_chain_input(),
+        "objection_handling_prompt": ai_client._objection_handling_chain_input(),
+        "publications_chain_prompt": ai_client._publications_chain_input(),
+        "news_chain_prompt": ai_client._google_news_content_chain_input(),
+    }
+
+
+def _input_tokens(chain_input, prefix_message=None):
+    tokens = sum(count_tokens(value) for value in chain_input.values())
+    return tokens + (count_tokens(prefix_message.content) if prefix_message else 0)
+
+
+def benchmark(linkedin_profile_id):
+    """
+    Return the token counts of every chain input before and after preparation.
+    """
+    ai_client = AIClient(linkedin_profile_id)
+    results = []
+    for prompt_name, chain_input in _chain_inputs(ai_client).items():
+        prepared_input, prefix_message = ai_client.prepare_chain_input(prompt_name, chain_input)
+        before = _input_tokens(chain_input)
+        after = _input_tokens(prepared_input, prefix_message)
+        results.append({
+            "chain": prompt_name,
+            "tokens_before": before,
+            "tokens_after": after,
+            "saved": round(1 - after / before, 3) if before else 0.0,
+            "dropped": ai_client.context_reports.get(prompt_name, {}).get("dropped", []),
+        })
+    return results
+
+
+def _print_table(results):
+    print(f"{'chain':<45}{'before':>10}{'after':>10}{'saved':>8}")
+    for result in results:
+        print(f"{result['chain']:<45}{result['tokens_before']:>10}{result['tokens_after']:>10}{result['saved']:>8.0%}")
+
+    before = sum(result["tokens_before"] for result in results)
+    after = sum(result["tokens_after"] for result in results)
+    print(f"{'total':<45}{before:>10}{after:>10}{(1 - after / before if before else 0):>8.0%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report the prompt tokens saved per chain for a stored prospect.")
+    parser.add_argument("linkedin_profile_id", help="id of the sdr_agent_linkedinprofile row")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = benchmark(args.linkedin_profile_id)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
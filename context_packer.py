@@ -0,0 +1,256 @@
+import functools
+import logging
+
+from decouple import config
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_PACKING_ENABLED = config("CONTEXT_PACKING_ENABLED", default=True, cast=bool)
+
+# Tokens of context a prompt may receive, overridable with e.g. `OPPORTUNITIES_CHAIN_PROMPT_BUDGET`.
+DEFAULT_CONTEXT_BUDGETS = {
+    "about_company_chain_prompt": 6000,
+    "opportunities_chain_prompt": 6000,
+    "trigger_events_and_timing_chain_prompt": 6000,
+    "objection_handling_prompt": 8000,
+    "talking_point_chain_prompt": 8000,
+    "engagement_highlights_chain_prompt": 4000,
+    "engagement_style_chain_prompt": 4000,
+}
+DEFAULT_CONTEXT_BUDGET = config("CONTEXT_BUDGET", default=8000, cast=int)
+
+# Fields of each kind of record that the prompts use. A field maps to `None` to keep it as is, to a list of
+# the fields kept of its nested records, or to the name of another record kind.
+RECORD_FIELDS = {
+    "profile": {
+        "full_name": None, "headline": None, "occupation": None, "summary": None, "city": None, "state": None,
+        "country_full_name": None, "industry": None, "experiences": "experience", "education": "education",
+        "certifications": ["name", "authority"], "skills": None,
+    },
+    "experience": {
+        "title": None, "company": None, "description": None, "location": None, "starts_at": None, "ends_at": None,
+    },
+    "education": {
+        "school": None, "degree_name": None, "field_of_study": None, "starts_at": None, "ends_at": None,
+    },
+    "company": {
+        "name": None, "tagline": None, "description": None, "industry": None, "company_type": None,
+        "company_size_on_linkedin": None, "founded_year": None, "follower_count": None, "specialties": None,
+        "website": None, "head_quarter": ["city", "state", "country"], "updates": ["text", "posted_on"],
+    },
+    "website": {"url": None, "digest": None, "markdown": None},
+    "post": {
+        "text": None, "post_type": None, "posted_at_relative": None, "posted_at_date": None,
+        "stats": ["total_reactions", "comments", "reposts"],
+    },
+    "comment": {"comment_text": None, "comment_created_at_relative": None, "post": ["text"]},
+}
+
+# Record kind of the chain input keys that hold records.
+INPUT_RECORD_KINDS = {
+    "linkedin_profile": "profile",
+    "linkedin_experiences": "experience",
+    "linkedin_education": "education",
+    "linkedin_companies": "company",
+    "linkedin_companies_profiles": "company",
+    "linkedin_companies_websites": "website",
+    "linkedin_posts": "post",
+    "linkedin_comments": "comment",
+}
+
+# Chain input keys that may be truncated when a prompt is over budget, in the order they are truncated.
+# Website markdown goes first: it is the largest input and its top part carries most of the information.
+# `context` holds the sources given to `add_citations_chain_prompt`, by citation id.
+TRUNCATION_ORDER = [
+    "linkedin_companies_websites", "linkedin_posts", "linkedin_comments", "google_news", "news", "publications",
+    "linkedin_companies", "linkedin_companies_profiles", "linkedin_profile", "context",
+]
+
+TRUNCATION_MARKER = " [...]"
+
+# Long text fields of website records, cut before whole websites are dropped.
+LONG_TEXT_FIELDS = ("markdown", "digest")
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning("Token counts are estimated, the tokenizer is unavailable: %s", e)
+        return None
+
+
+def count_tokens(value):
+    """
+    Number of tokens of a value as it is rendered into a prompt. Estimated from its length when the
+    tokenizer cannot be loaded.
+    """
+    text = value if isinstance(value, str) else str(value)
+    encoding = _encoding()
+    return len(encoding.encode(text, disallowed_special=())) if encoding else (len(text) + 3) // 4
+
+
+def truncate_text(text, max_tokens):
+    """
+    Cut a text to at most `max_tokens` tokens, the truncation marker included.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    keep = max(max_tokens - count_tokens(TRUNCATION_MARKER), 0)
+    encoding = _encoding()
+    if encoding:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:keep]) + TRUNCATION_MARKER
+    return text[:keep * 4] + TRUNCATION_MARKER
+
+
+def _is_empty(value):
+    return value is None or value == "" or value == [] or value == {}
+
+
+def select_fields(value, fields):
+    """
+    Keep only the given fields of a record, or of each record of a list. Records of other shapes are returned
+    as they are.
+    """
+    if isinstance(fields, str):
+        fields = RECORD_FIELDS[fields]
+    if isinstance(value, list):
+        return [select_fields(item, fields) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if isinstance(fields, list):
+        return {field: value[field] for field in fields if not _is_empty(value.get(field))}
+
+    return {
+        field: value[field] if nested_fields is None else select_fields(value[field], nested_fields)
+        for field, nested_fields in fields.items()
+        if not _is_empty(value.get(field))
+    }
+
+
+def _fair_caps(sizes, target):
+    """
+    Largest per-item cap such that the capped sizes add up to at most `target`, so that long items are cut
+    first and short items are kept whole.
+    """
+    cap = max(sizes, default=0)
+    for size in sorted(sizes, reverse=True):
+        total = sum(min(item_size, size) for item_size in sizes)
+        if total <= target:
+            break
+        cap = size
+
+    kept = sum(size for size in sizes if size < cap)
+    capped = sum(1 for size in sizes if size >= cap)
+    return max((target - kept) // capped, 0) if capped else cap
+
+
+def _long_text_field(item):
+    if isinstance(item, dict):
+        return next((field for field in LONG_TEXT_FIELDS if isinstance(item.get(field), str)), None)
+    return None
+
+
+def _shrink_sources(key, sources, excess, dropped):
+    sizes = [count_tokens(text) for text in sources.values()]
+    cap = _fair_caps(sizes, sum(sizes) - excess)
+    shrunk = {}
+    for (source, text), size in zip(sources.items(), sizes):
+        if size > cap:
+            text = truncate_text(text, cap)
+            dropped.append(f"{key}: cut {source} from {size} to {cap} tokens")
+        shrunk[source] = text
+    return shrunk
+
+
+def _shrink_texts(key, items, excess, dropped):
+    fields = [_long_text_field(item) for item in items]
+    sizes = [count_tokens(item[field]) for item, field in zip(items, fields)]
+    cap = _fair_caps(sizes, sum(sizes) - excess)
+    shrunk = []
+    for item, field, size in zip(items, fields, sizes):
+        if size > cap:
+            item = {**item, field: truncate_text(item[field], cap)}
+            dropped.append(f"{key}: cut {item.get('url') or field} from {size} to {cap} tokens")
+        shrunk.append(item)
+    return shrunk
+
+
+def _shrink(key, value, excess, dropped, render=str):
+    """
+    Shrink a chain input value by about `excess` tokens. Texts are cut at the end, websites and sources
+    keyed by citation id are cut longest first, and other lists lose their last (oldest or least relevant)
+    items.
+    """
+    if isinstance(value, str):
+        keep = max(count_tokens(value) - excess, 0)
+        dropped.append(f"{key}: cut to {keep} tokens")
+        return truncate_text(value, keep)
+
+    if isinstance(value, dict) and value and all(isinstance(text, str) for text in value.values()):
+        return _shrink_sources(key, value, excess, dropped)
+
+    if not isinstance(value, list):
+        return value
+
+    if value and all(_long_text_field(item) for item in value):
+        return _shrink_texts(key, value, excess, dropped)
+
+    items = list(value)
+    removed = 0
+    target = count_tokens(render(value)) - excess
+    while items and count_tokens(render(items)) > target:
+        items.pop()
+        removed += 1
+    if removed:
+        dropped.append(f"{key}: dropped {removed} of {len(value)} items")
+    return items
+
+
+def context_budget(prompt_name):
+    return config(
+        f"{prompt_name.upper()}_BUDGET",
+        default=DEFAULT_CONTEXT_BUDGETS.get(prompt_name, DEFAULT_CONTEXT_BUDGET),
+        cast=int,
+    )
+
+
+def pack_context(prompt_name, chain_input, budget=None, render=str):
+    """
+    Fit the input of a chain into the token budget of its prompt. Records are reduced to the fields the
+    prompts use, then the inputs in `TRUNCATION_ORDER` are truncated until the input fits. Sizes are the
+    tokens of each value as `render` turns it into prompt text, e.g. `serialize_context`. Returns the packed
+    input and a report with the token counts before and after and what was dropped.
+    """
+    budget = budget or context_budget(prompt_name)
+    tokens_before = sum(count_tokens(render(value)) for value in chain_input.values())
+    packed = {
+        key: select_fields(value, INPUT_RECORD_KINDS[key]) if key in INPUT_RECORD_KINDS else value
+        for key, value in chain_input.items()
+    }
+
+    sizes = {key: count_tokens(render(value)) for key, value in packed.items()}
+    dropped = []
+    for key in TRUNCATION_ORDER:
+        excess = sum(sizes.values()) - budget
+        if excess <= 0:
+            break
+        if key in packed and not _is_empty(packed[key]):
+            packed[key] = _shrink(key, packed[key], excess, dropped, render)
+            sizes[key] = count_tokens(render(packed[key]))
+
+    tokens_after = sum(sizes.values())
+    if tokens_after > budget:
+        dropped.append(f"still {tokens_after - budget} tokens over budget")
+
+    return packed, {
+        "prompt": prompt_name,
+        "budget": budget,
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "dropped": dropped,
+    }
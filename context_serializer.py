@@ -0,0 +1,65 @@
+from decouple import config
+
+COMPACT_CONTEXT_ENABLED = config("COMPACT_CONTEXT_ENABLED", default=True, cast=bool)
+
+# Internal row identifiers and bookkeeping timestamps, which tell the model nothing about the prospect.
+INTERNAL_FIELDS = {"id", "linkedin_profile_id", "company_profile_id", "scholar_id", "created_at", "updated_at"}
+
+INDENT = "  "
+
+
+def _is_empty(value):
+    return value is None or value == "" or value == [] or value == {}
+
+
+def compact(value):
+    """
+    Drop empty values and internal fields from nested records, recursively.
+    """
+    if isinstance(value, dict):
+        compacted = {key: compact(item) for key, item in value.items() if key not in INTERNAL_FIELDS}
+        return {key: item for key, item in compacted.items() if not _is_empty(item)}
+    if isinstance(value, (list, tuple)):
+        compacted = [compact(item) for item in value]
+        return [item for item in compacted if not _is_empty(item)]
+    if hasattr(value, "model_dump"):
+        return compact(value.model_dump())
+    return value
+
+
+def _scalar(value, prefix):
+    # Continuation lines of multi-line text are indented under their field.
+    return str(value).strip().replace("\n", "\n" + prefix + INDENT)
+
+
+def _lines(value, depth):
+    prefix = INDENT * depth
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                yield f"{prefix}{key}:"
+                yield from _lines(item, depth + 1)
+            else:
+                yield f"{prefix}{key}: {_scalar(item, prefix)}"
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, (dict, list)):
+                item_lines = list(_lines(item, depth + 1))
+                # The first field of a record goes on its bullet line, e.g. "- name: Acme".
+                yield f"{prefix}- {item_lines[0].lstrip()}" if item_lines else f"{prefix}-"
+                yield from item_lines[1:]
+            else:
+                yield f"{prefix}- {_scalar(item, prefix)}"
+    else:
+        yield f"{prefix}{_scalar(value, prefix)}"
+
+
+def serialize_context(value):
+    """
+    Render a chain input (rows, lists of rows or plain values) as compact indented `key: value` lines, without
+    empty values and internal fields. Strings are returned as they are.
+    """
+    if isinstance(value, str):
+        return value
+    value = compact(value)
+    return "\n".join(_lines(value, 0)) if not _is_empty(value) else ""
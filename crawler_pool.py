@@ -0,0 +1,112 @@
+import asyncio
+import atexit
+import itertools
+import logging
+import threading
+from contextlib import AsyncExitStack
+
+from crawl4ai import AsyncWebCrawler
+from decouple import config
+
+logger = logging.getLogger(__name__)
+
+# Browsers kept open by the pool, and pages each of them crawls at the same time.
+CRAWLER_POOL_BROWSERS = config("CRAWLER_POOL_BROWSERS", default=1, cast=int)
+CRAWLER_PAGES_PER_BROWSER = config("CRAWLER_PAGES_PER_BROWSER", default=4, cast=int)
+
+
+class CrawlerPool:
+    """
+    Long-lived crawl4ai browsers shared by every crawl of the process. The browsers are started on first use
+    and live on the pool's own event loop thread, because Playwright objects are bound to the loop that
+    created them. Sync callers block on the pool's loop and async callers await it from their own loop, so
+    both reuse the same browsers without starting an event loop or a browser per page.
+    """
+
+    def __init__(self, browsers=CRAWLER_POOL_BROWSERS, pages_per_browser=CRAWLER_PAGES_PER_BROWSER):
+        self.browsers = max(browsers, 1)
+        self.pages_per_browser = max(pages_per_browser, 1)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._crawlers = []
+        self._exit_stack = None
+        self._start_lock = None
+        self._next_crawler = itertools.count()
+
+    def _pool_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="crawler-pool", daemon=True).start()
+                atexit.register(self.close)
+            return self._loop
+
+    def _submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._pool_loop())
+
+    async def _start(self):
+        if self._crawlers:
+            return
+
+        self._start_lock = self._start_lock or asyncio.Lock()
+        async with self._start_lock:
+            if self._crawlers:
+                return
+
+            exit_stack = AsyncExitStack()
+            crawlers = []
+            for _ in range(self.browsers):
+                crawler = await exit_stack.enter_async_context(AsyncWebCrawler())
+                crawlers.append((crawler, asyncio.Semaphore(self.pages_per_browser)))
+            self._exit_stack, self._crawlers = exit_stack, crawlers
+            logger.info("Started %s crawler browser(s) with %s pages each", self.browsers, self.pages_per_browser)
+
+    async def _arun(self, url):
+        await self._start()
+        crawler, pages = self._crawlers[next(self._next_crawler) % len(self._crawlers)]
+        async with pages:
+            return await crawler.arun(url=url)
+
+    def _wait(self, future, timeout):
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def crawl(self, url, timeout=None):
+        """
+        Crawl one page on a pooled browser, from a thread without a running event loop.
+        """
+        return self._wait(self._submit(self._arun(url)), timeout)
+
+    async def acrawl(self, url):
+        """
+        Async variant of `crawl`, from any event loop.
+        """
+        return await asyncio.wrap_future(self._submit(self._arun(url)))
+
+    async def _aclose(self):
+        exit_stack, self._exit_stack, self._crawlers = self._exit_stack, None, []
+        if exit_stack:
+            await exit_stack.aclose()
+
+    def close(self):
+        """
+        Close the browsers and stop the pool's event loop. The pool starts again on its next crawl.
+        """
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._aclose(), loop).result(timeout=30)
+        except Exception as e:
+            logger.warning("Failed to close the crawler browsers: %s", e)
+        finally:
+            self._start_lock = None
+            loop.call_soon_threadsafe(loop.stop)
+
+
+crawler_pool = CrawlerPool()
@@ -0,0 +1,166 @@
+import asyncio
+import functools
+import inspect
+import logging
+import queue
+import threading
+from contextvars import copy_context
+
+from decouple import config
+
+from instrumentation import annotate_span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROVIDER_TIMEOUTS = {
+    "proxycurl": 30,
+    "apify": 300,
+    "serp": 30,
+    "openrouter": 120,
+    "sendgrid": 30,
+    "crawl4ai": 60,
+    "langsmith": 10,
+}
+
+# Seconds a single call to a provider may take, overridable with e.g. `APIFY_TIMEOUT`.
+provider_timeouts = {
+    provider: config(f"{provider.upper()}_TIMEOUT", default=timeout, cast=float)
+    for provider, timeout in DEFAULT_PROVIDER_TIMEOUTS.items()
+}
+DEFAULT_TIMEOUT = config("DEFAULT_PROVIDER_TIMEOUT", default=30, cast=float)
+
+# Seconds after which a slow idempotent read gets a duplicate request, e.g. `SERP_HEDGE_AFTER=4`.
+# Hedging is off (0) by default because every duplicate is a billed call.
+hedge_delays = {
+    provider: config(f"{provider.upper()}_HEDGE_AFTER", default=0, cast=float)
+    for provider in ("proxycurl", "serp", "crawl4ai")
+}
+
+# Wall time a graph node may take before it is abandoned, overridable per node with e.g.
+# `FETCH_LINKEDIN_POSTS_DEADLINE`. Provider timeouts normally fire first.
+DEFAULT_NODE_DEADLINE = config("NODE_DEADLINE", default=600, cast=float)
+
+
+def provider_timeout(provider):
+    return provider_timeouts.get(provider, DEFAULT_TIMEOUT)
+
+
+def node_deadline(node):
+    return config(f"{node.upper()}_DEADLINE", default=DEFAULT_NODE_DEADLINE, cast=float)
+
+
+def _start_attempt(outcomes, function, *args, **kwargs):
+    """
+    Run `function` on a daemon thread, so an attempt that never returns cannot keep the process alive,
+    and put `(succeeded, result or exception)` on the `outcomes` queue.
+    """
+    context = copy_context()
+
+    def attempt():
+        try:
+            outcomes.put((True, context.run(function, *args, **kwargs)))
+        except Exception as e:
+            outcomes.put((False, e))
+
+    threading.Thread(target=attempt, daemon=True).start()
+
+
+def hedged(provider, function, /, *args, **kwargs):
+    """
+    Call `function`, and if it has not returned after the provider's hedge delay, start a duplicate call and
+    return whichever succeeds first. Only use it for idempotent reads.
+    """
+    hedge_after = hedge_delays.get(provider)
+    if not hedge_after:
+        return function(*args, **kwargs)
+
+    outcomes = queue.Queue()
+    attempts = 1
+    _start_attempt(outcomes, function, *args, **kwargs)
+    try:
+        outcome = outcomes.get(timeout=hedge_after)
+    except queue.Empty:
+        logger.info("Hedging slow %s request after %.1fs", provider, hedge_after)
+        annotate_span(hedged=True)
+        attempts += 1
+        _start_attempt(outcomes, function, *args, **kwargs)
+        outcome = outcomes.get()
+
+    failures = 0
+    while True:
+        succeeded, value = outcome
+        if succeeded:
+            return value
+        failures += 1
+        if failures == attempts:
+            raise value
+        outcome = outcomes.get()
+
+
+async def ahedged(provider, coroutine_function, /, *args, **kwargs):
+    """
+    Async variant of `hedged`. The losing attempt is cancelled.
+    """
+    hedge_after = hedge_delays.get(provider)
+    if not hedge_after:
+        return await coroutine_function(*args, **kwargs)
+
+    pending = {asyncio.create_task(coroutine_function(*args, **kwargs))}
+    done, _ = await asyncio.wait(pending, timeout=hedge_after)
+    if not done:
+        logger.info("Hedging slow %s request after %.1fs", provider, hedge_after)
+        annotate_span(hedged=True)
+        pending.add(asyncio.create_task(coroutine_function(*args, **kwargs)))
+
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _missed_deadline(name, seconds, empty_result):
+    logger.warning("%s missed its %.0fs deadline, continuing with an empty result", name, seconds)
+    annotate_span(deadline_exceeded=True)
+    return dict(empty_result)
+
+
+def with_deadline(name, function, empty_result, seconds=None):
+    """
+    Wrap a graph node (sync or coroutine function) so that it returns `empty_result` instead of stalling the
+    graph when it runs longer than its deadline. A blocking node cannot be interrupted: it keeps running on
+    its own thread and its result is discarded.
+    """
+    seconds = seconds or node_deadline(name)
+
+    if inspect.iscoroutinefunction(function):
+        @functools.wraps(function)
+        async def async_node(state):
+            try:
+                return await asyncio.wait_for(function(state), seconds)
+            except asyncio.TimeoutError:
+                return _missed_deadline(name, seconds, empty_result)
+
+        return async_node
+
+    @functools.wraps(function)
+    def node(state):
+        outcomes = queue.Queue()
+        _start_attempt(outcomes, function, state)
+        try:
+            succeeded, value = outcomes.get(timeout=seconds)
+        except queue.Empty:
+            return _missed_deadline(name, seconds, empty_result)
+
+        if not succeeded:
+            raise value
+        return value
+
+    return node
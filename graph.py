@@ -1,4 +1,17 @@
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+import uuid
+from contextlib import asynccontextmanager
+
 import streamlit as st
+from decouple import config
+from langchain_core.runnables.config import var_child_runnable_config
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, START, END
 
 from clients.ai_client.ai_client import AIClient
@@ -10,10 +23,27 @@ from clients.proxy_curl.linkedin_company_profile import LinkedinCompanyProfileCl
 from clients.proxy_curl.linkedin_profile import LinkedinProfileClient
 from clients.serp.google_news import GoogleNewsClient
 from clients.serp.google_scholars import GoogleScholarsClient
-from clients.web_scrapper_client.web_scrapper_client import WebsiteCrawler
+from deadlines import with_deadline
+from instrumentation import trace_run, traced_node
+from node_cache import node_result_cache
+from scheduler import DependencyScheduler, format_critical_path
 from state import State
 from utils import markdown_to_pdf
 
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DB_PATH = config("CHECKPOINT_DB_PATH", default="sdr_agent_checkpoints.sqlite")
+# By default every AI section is a graph node, so each one is checkpointed and streamed as a graph update,
+# and its edges are derived from the state keys it reads. LangGraph only starts a node once the whole
+# superstep before it has finished, so a section also waits for unrelated sections of that step. The
+# dataflow mode runs every section inside one `analyze_prospect` node instead, starting each one as soon as
+# the sections it reads from are done, at the cost of checkpointing the sections together.
+ANALYSIS_DATAFLOW = config("ANALYSIS_DATAFLOW", default=False, cast=bool)
+
+# Finished sections arrive as graph updates, or on the custom stream in the dataflow mode, and their tokens
+# as messages.
+STREAM_MODES = ["updates", "custom", "messages"]
+
 
 class SDRAgent:
     """
@@ -22,11 +52,62 @@ class SDRAgent:
      that generates insights and sends personalized outreach emails.
     """
 
+    # State keys produced by other AI sections that each AI section consumes. The edges between sections are
+    # derived from these declarations, so a section runs once the sections it reads from have finished.
+    ANALYSIS_NODE_READS = {
+        "process_google_news": [],
+        "process_google_publications": [],
+        "process_opportunities": [],
+        "process_engagement_style": [],
+        "process_objection_handling": [],
+        "process_trigger_events_and_timing": [],
+        "process_engagement_highlights": [],
+        "process_company_information": [],
+        "process_linkedin_data": [],
+        "process_additional_outreaches": [],
+        "process_talking_points": ["user_publications", "user_google_news"],
+        "process_outreach_email": [
+            "opportunities", "talking_points", "engagement_style", "objection_handling",
+            "trigger_events_and_timing", "engagement_highlights", "company_information", "linkedin_data",
+        ],
+        "process_citations": ["news_available"],
+    }
+
+    ANALYSIS_NODE_WRITES = {
+        "process_google_news": ["user_google_news", "news_available"],
+        "process_google_publications": ["user_publications"],
+        "process_opportunities": ["opportunities"],
+        "process_engagement_style": ["engagement_style"],
+        "process_objection_handling": ["objection_handling"],
+        "process_trigger_events_and_timing": ["trigger_events_and_timing"],
+        "process_engagement_highlights": ["engagement_highlights"],
+        "process_company_information": ["company_information"],
+        "process_linkedin_data": ["linkedin_data"],
+        "process_additional_outreaches": ["additional_outreaches"],
+        "process_talking_points": ["talking_points"],
+        "process_outreach_email": ["outreach_email"],
+        "process_citations": ["citations"],
+    }
+
+    # What each data fetching node returns when it misses its deadline, so the run continues without it.
+    FETCH_NODE_EMPTY_RESULTS = {
+        "fetch_linkedin_profile": {"linkedin_profile": {}, "user_recent_company_linkedin_profile_urls": []},
+        "fetch_linkedin_company_profile": {
+            "linkedin_company_profiles": [], "company_websites_url": [], "company_websites": [],
+        },
+        "fetch_linkedin_posts": {"linkedin_posts": []},
+        "fetch_linkedin_comments": {"linkedin_comments": []},
+        "fetch_google_news": {"google_news": []},
+        "fetch_google_publications": {"google_publications": [], "google_scholar_profile": {}},
+    }
+
     def __init__(self, progress_callback=None):
         """
         Initialize the SDRAgent with an optional progress callback.
         """
         self.progress_callback = progress_callback
+        self.ai_clients = {}
+        self._ai_clients_lock = threading.Lock()
 
     def show_spinner_message(self, message):
         """
@@ -69,39 +150,29 @@ class SDRAgent:
 
     def _fetch_linkedin_company_profile(self, state):
         """
-        This method fetches 2 latest LinkedIn profiles and websites of companies the prospect is working for.
+        This method fetches the LinkedIn profiles and websites of the latest companies the prospect is working
+        for. Companies are fetched concurrently and each website is crawled as soon as its profile arrives.
         """
         linkedin_profile = state["linkedin_profile"]
         linkedin_company_profiles = []
         company_websites = []
 
         try:
-            self.show_spinner_message("Fetching linkedin company profile...")
+            self.show_spinner_message("Fetching linkedin company profiles and websites...")
             linkedin_company_profile_client = LinkedinCompanyProfileClient(
                 state["user_recent_company_linkedin_profile_urls"], linkedin_profile.get("id")
             )
             if state["user_recent_company_linkedin_profile_urls"]:
-                linkedin_company_profiles = linkedin_company_profile_client.store_company_linkedin_profiles()
-            self.show_status_message("✅ Linkedin company profile fetched...", 'success')
+                linkedin_company_profiles, company_websites = (
+                    linkedin_company_profile_client.store_company_profiles_and_websites()
+                )
+            self.show_status_message("✅ Linkedin company profiles and websites fetched...", 'success')
         except Exception as e:
             self.show_status_message("❌ Linkedin company profile fetching failed...", 'error')
 
-        company_websites_url = linkedin_company_profile_client.get_company_websites()
-
-        try:
-            if company_websites_url:
-                self.show_spinner_message("Fetching company websites...")
-
-                for company_website_url in company_websites_url:
-                    website_crawler = WebsiteCrawler(company_website_url)
-                    company_websites.append(website_crawler.store_company_website())
-                self.show_status_message("✅ Company websites fetched...", 'success')
-        except Exception as e:
-            self.show_status_message("❌ Company websites fetching failed...", 'error')
-
         return {
             "linkedin_company_profiles": linkedin_company_profiles,
-            "company_websites_url": company_websites_url,
+            "company_websites_url": linkedin_company_profile_client.get_company_websites(),
             "company_websites": company_websites
         }
 
@@ -127,17 +198,21 @@ class SDRAgent:
         """
         linkedin_profile = state["linkedin_profile"]
         google_publications = []
+        google_scholar_profile = {}
         try:
             self.show_spinner_message("Fetching google publications...")
-            google_scholar_client = GoogleScholarsClient(linkedin_profile.get("full_name"), linkedin_profile.get("id"))
+            google_scholar_client = GoogleScholarsClient(
+                linkedin_profile.get("full_name"), linkedin_profile.get("id"), self._run_ai_client(state)
+            )
             google_scholar_author_id = google_scholar_client.store_scholar_profile()
             if google_scholar_author_id:
                 google_publications = google_scholar_client.store_scholar_articles(google_scholar_author_id)
+            google_scholar_profile = google_scholar_client.scholar_profile or {}
             self.show_status_message("✅ Google publications fetched...", 'success')
         except Exception as e:
             self.show_status_message("❌ Google publications fetching failed...", 'error')
 
-        return {"google_publications": google_publications}
+        return {"google_publications": google_publications, "google_scholar_profile": google_scholar_profile}
 
     def _fetch_linkedin_posts(self, state):
         """
@@ -174,15 +249,70 @@ class SDRAgent:
 
         return {"linkedin_comments": linkedin_comments}
 
+    def _run_ai_client(self, state):
+        """
+        This method returns the AIClient registered for the current run, so that the Google Scholar author
+        matching and the analysis stage share one model and prompt client. It is created lightweight, with
+        only the LinkedIn profile, and the prospect data is loaded once the analysis needs it.
+        """
+        with self._ai_clients_lock:
+            run_id = state["run_id"]
+            if run_id not in self.ai_clients:
+                self.ai_clients[run_id] = AIClient.for_author_matching(state["linkedin_profile"])
+
+            return self.ai_clients[run_id]
+
+    def _has_fetched_data(self, state):
+        """
+        This method tells whether the state holds the records of every fetch node, so that the AIClient can be
+        built from them instead of reading the prospect back from Supabase.
+        """
+        return bool(state.get("linkedin_profile")) and all(
+            key in state for empty_result in self.FETCH_NODE_EMPTY_RESULTS.values() for key in empty_result
+        )
+
+    def _get_ai_client(self, state):
+        """
+        This method returns the AIClient of the current run with the prospect data loaded. The client holds
+        live connections and is kept out of the checkpointed state, so a resumed run rebuilds it from the
+        stored LinkedIn profile.
+        """
+        ai_client = self._run_ai_client(state)
+        if not ai_client.sdr_data_loaded:
+            if self._has_fetched_data(state):
+                ai_client.load_sdr_data_from_state(state)
+            else:
+                ai_client.load_sdr_data(state["linkedin_profile"].get("id"))
+
+        return ai_client
+
+    async def _aget_ai_client(self, state):
+        """
+        Async variant of `_get_ai_client`.
+        """
+        ai_client = self._run_ai_client(state)
+        if not ai_client.sdr_data_loaded:
+            if self._has_fetched_data(state):
+                await ai_client.aload_sdr_data_from_state(state)
+            else:
+                await ai_client.aload_sdr_data(state["linkedin_profile"].get("id"))
+
+        return ai_client
+
     def _initialize_ai_client(self, state):
-        linkedin_profile = state["linkedin_profile"]
-        return {"ai_client": AIClient(linkedin_profile.get("id"))}
+        """
+        This method loads the prospect data into the AIClient of the run and digests long company websites
+        once, before the company sections read them.
+        """
+        ai_client = self._get_ai_client(state)
+        ai_client.create_website_digests()
+        return {}
 
     def _process_google_news(self, state):
         """
         This method processes and analyze Google News data.
         """
-        ai_client = state["ai_client"]
+        ai_client = self._get_ai_client(state)
         return {
             "user_google_news": ai_client.process_with_spinner(
                 "Analyzing google news",
@@ -191,14 +321,15 @@ class SDRAgent:
                 self.progress_callback,
                 self.show_spinner_message,
                 self.show_status_message
-            )
+            ),
+            "news_available": ai_client.has_available_news()
         }
 
     def _process_google_publications(self, state):
         """
         This method processes and analyze academic publications.
         """
-        ai_client = state["ai_client"]
+        ai_client = self._get_ai_client(state)
         return {
             "user_publications": ai_client.process_with_spinner(
                 "Analyzing google publications",
@@ -214,7 +345,7 @@ class SDRAgent:
         """
         This method generates sales opportunities using AI analysis.
         """
-        ai_client = state["ai_client"]
+        ai_client = self._get_ai_client(state)
         return {
             "opportunities": ai_client.process_with_spinner(
                 "Generating opportunities",
@@ -233,7 +364,7 @@ class SDRAgent:
         """
         This method generates conversation talking points.
         """
-        ai_client = state["ai_client"]
+        ai_client = self._get_ai_client(state)
         return {
             "talking_points": ai_client.process_with_spinner(
                 "Identifying talking points",
@@ -252,7 +383,7 @@ class SDRAgent:
         """
         This method analyzes and determine the prospect's engagement style.
         """
-        ai_client = state["ai_client"]
+        ai_client = self._get_ai_client(state)
         return {
             "engagement_style": ai_client.process_with_spinner(
                 "Determining engagement style",
@@ -268,7 +399,7 @@ class SDRAgent:
         """
         This method generates objection handling strategies.
         """
-        ai_client = state["ai_client"]
+        ai_client = self._get_ai_client(state)
         return {
             "objection_handling": ai_client.process_with_spinner(
                 "Preparing objection handling strategies",
@@ -287,7 +418,7 @@ class SDRAgent:
         """
         This method identifies trigger events and optimal timing for outreach.
         """
-        ai_client = state["ai_client"]
+        ai_client = self._get_ai_client(state)
         return {
             "trigger_events_and_timing": ai_client.process_with_spinner(
                 "Identifying trigger events and timing",
@@ -306,7 +437,7 @@ class SDRAgent:
         """
         This method analyzes engagement highlights from prospect's social activity.
         """
-        ai_client = state["ai_client"]
+        ai_client = self._get_ai_client(state)
         return {
             "engagement_highlights": ai_client.process_with_spinner(
                 "Analyzing engagement highlights",
@@ -322,7 +453,7 @@ class SDRAgent:
         """
         This method processes and analyze company information.
         """
-        ai_client = state["ai_client"]
+        ai_client = self._get_ai_client(state)
         return {
             "company_information": ai_client.process_with_spinner(
                 "Analyzing company information",
@@ -338,14 +469,14 @@ class SDRAgent:
         """
         This method processes and analyze LinkedIn profile data.
         """
-        ai_client = state["ai_client"]
+        ai_client = self._get_ai_client(state)
         return {
             "linkedin_data": ai_client.process_with_spinner(
                 "Analyzing LinkedIn data",
                 ai_client.linkedin_data_chain,
                 lambda: {
                     **ai_client.get_profile_context(),
-                    **{f"[{ai_client.citation_list.index(company) + 1}]": company for company in ai_client.companies}
+                    **ai_client.get_context_from_sources(ai_client.companies)
                 },
                 self.progress_callback,
                 self.show_spinner_message,
@@ -353,12 +484,8 @@ class SDRAgent:
             )
         }
 
-    def _process_outreach_email(self, state):
-        """
-        This method generates personalized outreach email.
-        """
-        ai_client = state["ai_client"]
-        llm_output = {
+    def _outreach_email_llm_output(self, state):
+        return {
             "opportunities": state["opportunities"],
             "talking_points": state["talking_points"],
             "engagement_style": state["engagement_style"],
@@ -368,8 +495,14 @@ class SDRAgent:
             "about_company": state["company_information"],
             "linkedin_data": state["linkedin_data"],
         }
+
+    def _process_outreach_email(self, state):
+        """
+        This method generates personalized outreach email.
+        """
+        ai_client = self._get_ai_client(state)
         return {"outreach_email": ai_client.create_additional_outreach_email(
-            llm_output,
+            self._outreach_email_llm_output(state),
             self.progress_callback,
             self.show_spinner_message,
             self.show_status_message
@@ -379,7 +512,7 @@ class SDRAgent:
         """
         This method generate additional outreach suggestions.
         """
-        ai_client = state["ai_client"]
+        ai_client = self._get_ai_client(state)
         return {
             "additional_outreaches": ai_client.process_with_spinner(
                 "Adding additional outreaches",
@@ -395,11 +528,11 @@ class SDRAgent:
         """
         This method generates citations for all data sources used in the analysis.
         """
-        ai_client = state["ai_client"]
+        ai_client = self._get_ai_client(state)
         return {
             "citations": ai_client.process_with_spinner(
                 "Adding citations",
-                lambda: ai_client.create_citations(state["linkedin_url"]),
+                lambda: ai_client.create_citations(state["linkedin_url"], state.get("news_available", False)),
                 None,
                 self.progress_callback,
                 self.show_spinner_message,
@@ -407,11 +540,161 @@ class SDRAgent:
             )
         }
 
+    def _analysis_nodes(self):
+        return {
+            "process_google_news": self._process_google_news,
+            "process_google_publications": self._process_google_publications,
+            "process_opportunities": self._process_opportunities,
+            "process_talking_points": self._process_talking_points,
+            "process_engagement_style": self._process_engagement_style,
+            "process_objection_handling": self._process_objection_handling,
+            "process_engagement_highlights": self._process_engagement_highlights,
+            "process_trigger_events_and_timing": self._process_trigger_events_and_timing,
+            "process_company_information": self._process_company_information,
+            "process_linkedin_data": self._process_linkedin_data,
+            "process_outreach_email": self._process_outreach_email,
+            "process_additional_outreaches": self._process_additional_outreaches,
+            "process_citations": self._process_citations,
+        }
+
+    def _async_analysis_nodes(self):
+        return {
+            "process_google_news": self._aprocess_google_news,
+            "process_google_publications": self._aprocess_google_publications,
+            "process_opportunities": self._aprocess_opportunities,
+            "process_talking_points": self._aprocess_talking_points,
+            "process_engagement_style": self._aprocess_engagement_style,
+            "process_objection_handling": self._aprocess_objection_handling,
+            "process_engagement_highlights": self._aprocess_engagement_highlights,
+            "process_trigger_events_and_timing": self._aprocess_trigger_events_and_timing,
+            "process_company_information": self._aprocess_company_information,
+            "process_linkedin_data": self._aprocess_linkedin_data,
+            "process_outreach_email": self._aprocess_outreach_email,
+            "process_additional_outreaches": self._aprocess_additional_outreaches,
+            "process_citations": self._aprocess_citations,
+        }
+
+    def _section_nodes(self, asynchronous=False):
+        """
+        This method returns the AI sections ready to run: tagged with their section name and returning an
+        empty section when they miss their deadline.
+        """
+        nodes = self._async_analysis_nodes() if asynchronous else self._analysis_nodes()
+        return {
+            name: with_deadline(name, self._section_node(name, function), self._empty_section(name))
+            for name, function in nodes.items()
+        }
+
+    def create_analysis_scheduler(self, asynchronous=False):
+        """
+        This method builds the dependency scheduler of the AI sections from their declared reads and writes.
+        """
+        return DependencyScheduler(
+            self._section_nodes(asynchronous), self.ANALYSIS_NODE_READS, self.ANALYSIS_NODE_WRITES
+        )
+
+    def _add_section_edges(self, builder, start, end):
+        """
+        This method connects the AI section nodes from the dependencies the scheduler derives from their
+        declared reads and writes. A section waits for all the sections it reads from, or else for `start`,
+        and `end` waits for every section that no other section reads from.
+        """
+        dependencies = self.create_analysis_scheduler().dependencies
+        for section, section_dependencies in dependencies.items():
+            starts = section_dependencies or [start]
+            builder.add_edge(starts[0] if len(starts) == 1 else starts, section)
+
+        depended_on = set().union(*dependencies.values())
+        builder.add_edge([section for section in dependencies if section not in depended_on], end)
+
+    def _section_node(self, name, function):
+        """
+        This method wraps an AI section so that the LLM calls it makes carry the section name in their run
+        metadata, which is how tokens streamed in `messages` mode are attributed to a section.
+        """
+        def section_config():
+            parent_config = var_child_runnable_config.get() or {}
+            return {**parent_config, "metadata": {**parent_config.get("metadata", {}), "section": name}}
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_section(state):
+                token = var_child_runnable_config.set(section_config())
+                try:
+                    return await function(state)
+                finally:
+                    var_child_runnable_config.reset(token)
+
+            return async_section
+
+        @functools.wraps(function)
+        def section(state):
+            token = var_child_runnable_config.set(section_config())
+            try:
+                return function(state)
+            finally:
+                var_child_runnable_config.reset(token)
+
+        return section
+
+    @staticmethod
+    def _section_event(node, update):
+        markdown = "".join(value for value in (update or {}).values() if isinstance(value, str))
+        return {"section": node, "markdown": markdown}
+
+    def _stream_section(self):
+        """
+        This method returns a callback publishing every AI section finished by the dataflow scheduler on the
+        graph's custom stream.
+        """
+        writer = get_stream_writer()
+
+        def on_update(node, update):
+            writer(self._section_event(node, update))
+
+        return on_update
+
+    def _empty_section(self, node):
+        return {key: False if key == "news_available" else "" for key in self.ANALYSIS_NODE_WRITES[node]}
+
+    def dependency_report(self):
+        """
+        This method describes how the AI sections depend on each other and their longest sequential chain.
+        """
+        return self.create_analysis_scheduler().dependency_report()
+
+    def _analysis_result(self, scheduler, results, timings):
+        critical_path = scheduler.critical_path(timings)
+        logger.info(format_critical_path(critical_path))
+        return {**results, "analysis_critical_path": critical_path}
+
+    def _analyze_prospect(self, state):
+        """
+        This method runs every AI section in the dataflow mode, each one starting as soon as the sections it
+        reads from are done.
+        """
+        scheduler = self.create_analysis_scheduler()
+        results, timings = scheduler.run(state, self._stream_section())
+        return self._analysis_result(scheduler, results, timings)
+
+    async def _aanalyze_prospect(self, state):
+        """
+        Async variant of `_analyze_prospect`.
+        """
+        scheduler = self.create_analysis_scheduler(asynchronous=True)
+        results, timings = await scheduler.arun(state, self._stream_section())
+        return self._analysis_result(scheduler, results, timings)
+
     def _aggregate_ai_result(self, state):
         """
         This method aggregates all AI processing results into a final report.
         """
-        ai_client = state["ai_client"]
+        cache_stats = node_result_cache.stats()
+        logger.info(
+            "Node cache: %s hits, %s misses (%.0f%%)", cache_stats["hits"], cache_stats["misses"],
+            cache_stats["hit_rate"] * 100,
+        )
+        ai_client = self._get_ai_client(state)
         profile_info_markdown = ai_client.create_profile_header_markdown(state["linkedin_url"])
 
         ai_results = [
@@ -446,24 +729,326 @@ class SDRAgent:
             self.show_status_message("✅ PDF created...", 'success')
         except Exception as e:
             self.show_status_message("❌ PDF creation failed...", 'error')
+            raise
 
         return {"pdf": pdf, "final_pdf": final_pdf, "storage_path": storage_path}
 
+    def _email_kwargs(self, state):
+        return {
+            "linkedin_profile": state["linkedin_profile"],
+            "final_pdf": state["final_pdf"],
+            "email_to": state["email"],
+            "storage_path": state["storage_path"],
+            "pdf": state["pdf"],
+        }
+
     def _send_email(self, state):
         try:
             self.show_spinner_message("Sending email...")
             email_client = EmailClient()
-            email_kwargs = {
-                "linkedin_profile": state["linkedin_profile"],
-                "final_pdf": state["final_pdf"],
-                "email_to": state["email"],
-                "storage_path": state["storage_path"],
-                "pdf": state["pdf"],
-            }
-            email_client.send_email(**email_kwargs)
+            email_client.send_email(**self._email_kwargs(state))
             self.show_status_message("✅ Email sent...", 'success')
         except Exception as e:
             self.show_status_message("❌ Sending email failed...", 'error')
+            raise
+
+        return state
+
+    async def _afetch_linkedin_profile(self, state):
+        """
+        Async variant of `_fetch_linkedin_profile`.
+        """
+        profile = {}
+        try:
+            self.show_spinner_message("Fetching linkedIn profile...")
+            linkedin_profile_client = LinkedinProfileClient(state["linkedin_url"])
+            profile = await linkedin_profile_client.astore_linkedin_profile()
+            self.show_status_message("✅ LinkedIn profile fetched...", 'success')
+        except Exception as e:
+            self.show_status_message("❌ LinkedIn profile fetching failed...", 'error')
+
+        user_recent_company_linkedin_profile_urls = linkedin_profile_client.get_recent_experience()
+
+        return {
+            "linkedin_profile": profile,
+            "user_recent_company_linkedin_profile_urls": user_recent_company_linkedin_profile_urls
+        }
+
+    async def _afetch_linkedin_company_profile(self, state):
+        """
+        Async variant of `_fetch_linkedin_company_profile`.
+        """
+        linkedin_profile = state["linkedin_profile"]
+        linkedin_company_profiles = []
+        company_websites = []
+
+        try:
+            self.show_spinner_message("Fetching linkedin company profiles and websites...")
+            linkedin_company_profile_client = LinkedinCompanyProfileClient(
+                state["user_recent_company_linkedin_profile_urls"], linkedin_profile.get("id")
+            )
+            if state["user_recent_company_linkedin_profile_urls"]:
+                linkedin_company_profiles, company_websites = (
+                    await linkedin_company_profile_client.astore_company_profiles_and_websites()
+                )
+            self.show_status_message("✅ Linkedin company profiles and websites fetched...", 'success')
+        except Exception as e:
+            self.show_status_message("❌ Linkedin company profile fetching failed...", 'error')
+
+        return {
+            "linkedin_company_profiles": linkedin_company_profiles,
+            "company_websites_url": linkedin_company_profile_client.get_company_websites(),
+            "company_websites": company_websites
+        }
+
+    async def _afetch_google_news(self, state):
+        """
+        Async variant of `_fetch_google_news`.
+        """
+        linkedin_profile = state["linkedin_profile"]
+        google_news = []
+        try:
+            self.show_spinner_message("Fetching google news...")
+            google_news_client = GoogleNewsClient(linkedin_profile.get("full_name"), linkedin_profile.get("id"))
+            google_news = await google_news_client.astore_persons_news()
+            self.show_status_message("✅ Google news fetched...", 'success')
+        except Exception as e:
+            self.show_status_message("❌ Google news fetching failed...", 'error')
+
+        return {"google_news": google_news}
+
+    async def _afetch_google_publications(self, state):
+        """
+        Async variant of `_fetch_google_publications`.
+        """
+        linkedin_profile = state["linkedin_profile"]
+        google_publications = []
+        google_scholar_profile = {}
+        try:
+            self.show_spinner_message("Fetching google publications...")
+            google_scholar_client = GoogleScholarsClient(
+                linkedin_profile.get("full_name"), linkedin_profile.get("id"), self._run_ai_client(state)
+            )
+            google_scholar_author_id = await google_scholar_client.astore_scholar_profile()
+            if google_scholar_author_id:
+                google_publications = await google_scholar_client.astore_scholar_articles(google_scholar_author_id)
+            google_scholar_profile = google_scholar_client.scholar_profile or {}
+            self.show_status_message("✅ Google publications fetched...", 'success')
+        except Exception as e:
+            self.show_status_message("❌ Google publications fetching failed...", 'error')
+
+        return {"google_publications": google_publications, "google_scholar_profile": google_scholar_profile}
+
+    async def _afetch_linkedin_posts(self, state):
+        """
+        Async variant of `_fetch_linkedin_posts`.
+        """
+        linkedin_profile = state["linkedin_profile"]
+        linkedin_posts = []
+        if linkedin_profile:
+            try:
+                self.show_spinner_message("Fetching linkedin posts...")
+                linkedin_post_actor = LinkedinPostActor(state["linkedin_url"], linkedin_profile.get("id"))
+                linkedin_posts = await linkedin_post_actor.astore_linkedin_posts()
+                self.show_status_message("✅ Linkedin posts fetched...", 'success')
+            except Exception as e:
+                self.show_status_message("❌ Linkedin posts fetching failed...", 'error')
+
+        return {"linkedin_posts": linkedin_posts}
+
+    async def _afetch_linkedin_comments(self, state):
+        """
+        Async variant of `_fetch_linkedin_comments`.
+        """
+        linkedin_profile = state["linkedin_profile"]
+        linkedin_comments = []
+
+        if linkedin_profile:
+            try:
+                self.show_spinner_message("Fetching linkedin comments...")
+                linkedin_comments_actor = LinkedinCommentsActor(state["linkedin_url"], linkedin_profile.get("id"))
+                linkedin_comments = await linkedin_comments_actor.astore_linkedin_comments()
+                self.show_status_message("✅ Linkedin comments fetched...", 'success')
+            except Exception as e:
+                self.show_status_message("❌ Linkedin comments fetching failed...", 'error')
+
+        return {"linkedin_comments": linkedin_comments}
+
+    async def _ainitialize_ai_client(self, state):
+        """
+        Async variant of `_initialize_ai_client`.
+        """
+        ai_client = await self._aget_ai_client(state)
+        await ai_client.acreate_website_digests()
+        return {}
+
+    async def _aprocess_section(self, ai_client, state_key, label, chain_function, citation_context_function=None):
+        """
+        This method runs a single async AI section and stores its markdown under `state_key`.
+        """
+        return {
+            state_key: await ai_client.aprocess_with_spinner(
+                label,
+                chain_function,
+                citation_context_function,
+                self.progress_callback,
+                self.show_spinner_message,
+                self.show_status_message
+            )
+        }
+
+    async def _aprocess_google_news(self, state):
+        ai_client = await self._aget_ai_client(state)
+        return {
+            **await self._aprocess_section(
+                ai_client, "user_google_news", "Analyzing google news",
+                ai_client.aprocess_google_news_content,
+                ai_client.get_google_news_context,
+            ),
+            "news_available": ai_client.has_available_news()
+        }
+
+    async def _aprocess_google_publications(self, state):
+        ai_client = await self._aget_ai_client(state)
+        return await self._aprocess_section(
+            ai_client, "user_publications", "Analyzing google publications",
+            ai_client.apublications_chain,
+            lambda: ai_client.get_context_from_sources([ai_client.publications]),
+        )
+
+    async def _aprocess_opportunities(self, state):
+        ai_client = await self._aget_ai_client(state)
+        return await self._aprocess_section(
+            ai_client, "opportunities", "Generating opportunities",
+            ai_client.aopportunities_chain,
+            lambda: {
+                **ai_client.get_profile_context(),
+                **ai_client.get_company_context()
+            },
+        )
+
+    async def _aprocess_talking_points(self, state):
+        ai_client = await self._aget_ai_client(state)
+        return await self._aprocess_section(
+            ai_client, "talking_points", "Identifying talking points",
+            lambda: ai_client.atalking_point_chain(state["user_publications"], state["user_google_news"]),
+            lambda: ai_client.get_context_from_sources(
+                [ai_client.linkedin_profile, ai_client.posts, ai_client.comments, ai_client.google_news,
+                 ai_client.publications]
+            ),
+        )
+
+    async def _aprocess_engagement_style(self, state):
+        ai_client = await self._aget_ai_client(state)
+        return await self._aprocess_section(
+            ai_client, "engagement_style", "Determining engagement style",
+            ai_client.aengagement_style_chain,
+            lambda: ai_client.get_context_from_sources([ai_client.posts, ai_client.comments]),
+        )
+
+    async def _aprocess_objection_handling(self, state):
+        ai_client = await self._aget_ai_client(state)
+        return await self._aprocess_section(
+            ai_client, "objection_handling", "Preparing objection handling strategies",
+            ai_client.aobjection_handling_chain,
+            lambda: {
+                **ai_client.get_profile_context(),
+                **ai_client.get_company_context()
+            },
+        )
+
+    async def _aprocess_trigger_events_and_timing(self, state):
+        ai_client = await self._aget_ai_client(state)
+        return await self._aprocess_section(
+            ai_client, "trigger_events_and_timing", "Identifying trigger events and timing",
+            ai_client.atrigger_events_and_timing_chain,
+            lambda: {
+                **ai_client.get_company_context(),
+                **ai_client.get_context_from_sources([ai_client.posts])
+            },
+        )
+
+    async def _aprocess_engagement_highlights(self, state):
+        ai_client = await self._aget_ai_client(state)
+        return await self._aprocess_section(
+            ai_client, "engagement_highlights", "Analyzing engagement highlights",
+            ai_client.aengagement_highlights_chain,
+            lambda: ai_client.get_context_from_sources([ai_client.posts]),
+        )
+
+    async def _aprocess_company_information(self, state):
+        ai_client = await self._aget_ai_client(state)
+        return await self._aprocess_section(
+            ai_client, "company_information", "Analyzing company information",
+            ai_client.acompany_about_chain,
+            ai_client.get_company_context,
+        )
+
+    async def _aprocess_linkedin_data(self, state):
+        ai_client = await self._aget_ai_client(state)
+        return await self._aprocess_section(
+            ai_client, "linkedin_data", "Analyzing LinkedIn data",
+            ai_client.alinkedin_data_chain,
+            lambda: {
+                **ai_client.get_profile_context(),
+                **ai_client.get_context_from_sources(ai_client.companies)
+            },
+        )
+
+    async def _aprocess_outreach_email(self, state):
+        ai_client = await self._aget_ai_client(state)
+        return {"outreach_email": await ai_client.acreate_additional_outreach_email(
+            self._outreach_email_llm_output(state),
+            self.progress_callback,
+            self.show_spinner_message,
+            self.show_status_message
+        )}
+
+    async def _aprocess_additional_outreaches(self, state):
+        ai_client = await self._aget_ai_client(state)
+        return await self._aprocess_section(
+            ai_client, "additional_outreaches", "Adding additional outreaches",
+            ai_client.asuggested_additional_outreach_chain,
+            ai_client.get_profile_context,
+        )
+
+    async def _aprocess_citations(self, state):
+        """
+        Async variant of `_process_citations`. Building references still queries Supabase synchronously,
+        so it runs off the event loop.
+        """
+        return await asyncio.to_thread(self._process_citations, state)
+
+    async def _acreate_pdf(self, state):
+        """
+        Async variant of `_create_pdf`. PDF rendering is CPU bound and runs off the event loop.
+        """
+        data_client = DataClient()
+        pdf = ""
+        final_pdf = ""
+        storage_path = ""
+        try:
+            self.show_spinner_message("Creating PDF...")
+            pdf = await asyncio.to_thread(markdown_to_pdf, state["profile_info_markdown"], state["result"])
+            final_pdf, storage_path = await data_client.astore_processed_profile(
+                pdf, state["result"], state["email"], state["linkedin_profile"]
+            )
+            self.show_status_message("✅ PDF created...", 'success')
+        except Exception as e:
+            self.show_status_message("❌ PDF creation failed...", 'error')
+            raise
+
+        return {"pdf": pdf, "final_pdf": final_pdf, "storage_path": storage_path}
+
+    async def _asend_email(self, state):
+        try:
+            self.show_spinner_message("Sending email...")
+            email_client = EmailClient()
+            await email_client.asend_email(**self._email_kwargs(state))
+            self.show_status_message("✅ Email sent...", 'success')
+        except Exception as e:
+            self.show_status_message("❌ Sending email failed...", 'error')
+            raise
 
         return state
 
@@ -472,7 +1057,9 @@ class SDRAgent:
         This method adds multiple nodes to the workflow graph from a dictionary.
         """
         for label, function in nodes.items():
-            builder.add_node(label, function)
+            if label in self.FETCH_NODE_EMPTY_RESULTS:
+                function = with_deadline(label, function, self.FETCH_NODE_EMPTY_RESULTS[label])
+            builder.add_node(label, traced_node(label, function))
 
     def _add_edges_from_combinations(self, builder, start_keys, end_keys):
         """
@@ -482,10 +1069,20 @@ class SDRAgent:
             for end in end_keys:
                 builder.add_edge(start, end)
 
-    def create_graph(self):
-        builder = StateGraph(State)
+    def _analysis_graph_nodes(self, asynchronous=False):
+        """
+        This method returns the graph nodes of the AI sections: one per section, or the single
+        `analyze_prospect` node in the dataflow mode.
+        """
+        if ANALYSIS_DATAFLOW:
+            return {"analyze_prospect": self._aanalyze_prospect if asynchronous else self._analyze_prospect}
+        return self._section_nodes(asynchronous)
 
-        nodes = {
+    def _graph_nodes(self):
+        """
+        This method maps every graph node label to its blocking implementation.
+        """
+        return {
             "fetch_linkedin_profile": self._fetch_linkedin_profile,
             "fetch_linkedin_company_profile": self._fetch_linkedin_company_profile,
             "fetch_linkedin_posts": self._fetch_linkedin_posts,
@@ -493,24 +1090,39 @@ class SDRAgent:
             "fetch_google_news": self._fetch_google_news,
             "fetch_google_publications": self._fetch_google_publications,
             "initialize_ai_client": self._initialize_ai_client,
-            "process_google_news": self._process_google_news,
-            "process_google_publications": self._process_google_publications,
-            "process_opportunities": self._process_opportunities,
-            "process_talking_points": self._process_talking_points,
-            "process_engagement_style": self._process_engagement_style,
-            "process_objection_handling": self._process_objection_handling,
-            "process_engagement_highlights": self._process_engagement_highlights,
-            "process_trigger_events_and_timing": self._process_trigger_events_and_timing,
-            "process_company_information": self._process_company_information,
-            "process_linkedin_data": self._process_linkedin_data,
-            "process_outreach_email": self._process_outreach_email,
-            "process_additional_outreaches": self._process_additional_outreaches,
-            "process_citations": self._process_citations,
+            **self._analysis_graph_nodes(),
             "aggregate_ai_result": self._aggregate_ai_result,
             "create_pdf": self._create_pdf,
             "send_email": self._send_email,
         }
 
+    def _async_graph_nodes(self):
+        """
+        This method maps every graph node label to its coroutine implementation. Nodes that do no I/O
+        (aggregation) are shared with the blocking graph.
+        """
+        return {
+            **self._graph_nodes(),
+            "fetch_linkedin_profile": self._afetch_linkedin_profile,
+            "fetch_linkedin_company_profile": self._afetch_linkedin_company_profile,
+            "fetch_linkedin_posts": self._afetch_linkedin_posts,
+            "fetch_linkedin_comments": self._afetch_linkedin_comments,
+            "fetch_google_news": self._afetch_google_news,
+            "fetch_google_publications": self._afetch_google_publications,
+            "initialize_ai_client": self._ainitialize_ai_client,
+            **self._analysis_graph_nodes(asynchronous=True),
+            "create_pdf": self._acreate_pdf,
+            "send_email": self._asend_email,
+        }
+
+    def create_graph(self, asynchronous=False, checkpointer=None):
+        """
+        This method builds the workflow graph. With `asynchronous=True` the nodes are coroutines and the
+        compiled graph must be run with `ainvoke`. A `checkpointer` persists the state after every step.
+        """
+        builder = StateGraph(State)
+        nodes = self._async_graph_nodes() if asynchronous else self._graph_nodes()
+
         # Add nodes from the dictionary
         self._add_nodes_from_dict(builder, nodes)
 
@@ -540,53 +1152,115 @@ class SDRAgent:
             ["initialize_ai_client"]
         )
 
-        self._add_edges_from_combinations(
-            builder,
-            ["initialize_ai_client"],
-            [
-                "process_google_news",
-                "process_google_publications",
-                "process_opportunities",
-                "process_engagement_style",
-                "process_objection_handling",
-                "process_trigger_events_and_timing",
-                "process_engagement_highlights",
-                "process_company_information",
-                "process_linkedin_data",
-                "process_additional_outreaches",
-            ]
-        )
-        self._add_edges_from_combinations(
-            builder,
-            [
-                "process_google_news",
-                "process_google_publications",
-                "process_opportunities",
-                "process_engagement_style",
-                "process_objection_handling",
-                "process_trigger_events_and_timing",
-                "process_engagement_highlights",
-                "process_company_information",
-                "process_linkedin_data",
-                "process_additional_outreaches",
-            ],
-            ["process_talking_points"]
-        )
-
-        builder.add_edge("process_talking_points", "process_outreach_email")
-        builder.add_edge("process_outreach_email", "process_citations")
-        builder.add_edge("process_citations", "aggregate_ai_result")
+        if ANALYSIS_DATAFLOW:
+            builder.add_edge("initialize_ai_client", "analyze_prospect")
+            builder.add_edge("analyze_prospect", "aggregate_ai_result")
+        else:
+            self._add_section_edges(builder, "initialize_ai_client", "aggregate_ai_result")
         builder.add_edge("aggregate_ai_result", "create_pdf")
         builder.add_edge("create_pdf", "send_email")
         builder.add_edge("send_email", END)
 
-        return builder.compile()
+        return builder.compile(checkpointer=checkpointer)
 
-    def invoke_graph(self, linkedin_url: str, email: str):
+    def _run_config(self, run_id):
+        return {"configurable": {"thread_id": run_id}}
+
+    def _graph_input(self, snapshot, linkedin_url, email, run_id):
+        """
+        This method returns the graph input for a run: `None` resumes a checkpointed run from its pending
+        nodes, otherwise the run starts from the initial state.
+        """
+        if snapshot.next:
+            return None
+
+        return {"run_id": run_id, "linkedin_url": linkedin_url, "email": email}
+
+    def _is_completed(self, snapshot):
+        return bool(snapshot.values) and not snapshot.next
+
+    def _publish_stream_event(self, mode, chunk):
+        """
+        This method forwards graph stream events to the progress callback: a finished AI section as a
+        `section` message and every LLM token of a section's prose as a `token` message.
+        """
+        if not self.progress_callback:
+            return
+
+        if mode == "updates":
+            for node, update in chunk.items():
+                if node in self.ANALYSIS_NODE_WRITES:
+                    self.progress_callback('section', self._section_event(node, update))
+        elif mode == "custom":
+            self.progress_callback('section', chunk)
+        elif mode == "messages":
+            message, metadata = chunk
+            if metadata.get("section") and not metadata.get("structured") and message.content:
+                self.progress_callback('token', {
+                    "section": metadata["section"], "prompt": metadata.get("prompt"), "text": message.content
+                })
+
+    def invoke_graph(self, linkedin_url: str, email: str, run_id: str = None, stream_sections: bool = False):
+        """
+        Run the workflow for one prospect. Every completed node is checkpointed under `run_id`, so invoking
+        again with the run id of a failed or interrupted run resumes it without re-fetching paid data.
+        With `stream_sections=True` every AI section, and the LLM tokens it is made of, is sent to the
+        progress callback as soon as it is generated.
+        """
+        run_id = run_id or uuid.uuid4().hex
+        run_config = self._run_config(run_id)
+        try:
+            with trace_run(run_id), SqliteSaver.from_conn_string(CHECKPOINT_DB_PATH) as checkpointer:
+                graph = self.create_graph(checkpointer=checkpointer)
+                snapshot = graph.get_state(run_config)
+                if not self._is_completed(snapshot):
+                    graph_input = self._graph_input(snapshot, linkedin_url, email, run_id)
+                    if stream_sections:
+                        for mode, chunk in graph.stream(graph_input, run_config, stream_mode=STREAM_MODES):
+                            self._publish_stream_event(mode, chunk)
+                    else:
+                        graph.invoke(graph_input, run_config)
+            return [200, f"Email sent to {email}"]
+        except Exception as e:
+            return [None, f"Processing failed (run {run_id}): {str(e)}"]
+        finally:
+            self.ai_clients.pop(run_id, None)
+
+    @staticmethod
+    @asynccontextmanager
+    async def _acheckpointer(checkpointer=None):
+        if checkpointer is not None:
+            yield checkpointer
+            return
+
+        async with AsyncSqliteSaver.from_conn_string(CHECKPOINT_DB_PATH) as checkpointer:
+            yield checkpointer
+
+    async def ainvoke_graph(self, linkedin_url: str, email: str, run_id: str = None, stream_sections: bool = False,
+                            checkpointer=None):
+        """
+        Async entry point running every node as a coroutine, so many prospects can share one event loop.
+        Runs are checkpointed and resumed the same way as `invoke_graph`, with `checkpointer` when given
+        (e.g. one saver shared by a batch) or else with a saver of their own.
+        """
+        run_id = run_id or uuid.uuid4().hex
+        run_config = self._run_config(run_id)
         try:
-            graph = self.create_graph()
-            initial_state = {"linkedin_url": linkedin_url, "email": email}
-            graph.invoke(initial_state)
+            with trace_run(run_id):
+                async with self._acheckpointer(checkpointer) as checkpointer:
+                    graph = self.create_graph(asynchronous=True, checkpointer=checkpointer)
+                    snapshot = await graph.aget_state(run_config)
+                    if not self._is_completed(snapshot):
+                        graph_input = self._graph_input(snapshot, linkedin_url, email, run_id)
+                        if stream_sections:
+                            async for mode, chunk in graph.astream(
+                                graph_input, run_config, stream_mode=STREAM_MODES
+                            ):
+                                self._publish_stream_event(mode, chunk)
+                        else:
+                            await graph.ainvoke(graph_input, run_config)
             return [200, f"Email sent to {email}"]
         except Exception as e:
-            return [None, f"Processing failed: {str(e)}"]
+            return [None, f"Processing failed (run {run_id}): {str(e)}"]
+        finally:
+            self.ai_clients.pop(run_id, None)
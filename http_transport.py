@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from weakref import WeakKeyDictionary
+
+import httpx
+import requests
+from decouple import config
+from requests.adapters import HTTPAdapter
+
+from deadlines import provider_timeout
+from instrumentation import span
+from provider_limits import aprovider_slot, provider_slot
+
+logger = logging.getLogger(__name__)
+
+# Seconds to open a connection. Reads are bounded by the provider's timeout (`provider_timeout`).
+HTTP_CONNECT_TIMEOUT = config("HTTP_CONNECT_TIMEOUT", default=5, cast=float)
+# Keep-alive connections kept open per host.
+HTTP_POOL_SIZE = config("HTTP_POOL_SIZE", default=20, cast=int)
+# Retries of a request that failed to connect, timed out or got a retryable status.
+HTTP_MAX_RETRIES = config("HTTP_MAX_RETRIES", default=3, cast=int)
+# Base and maximum seconds of the jittered exponential backoff between retries.
+HTTP_RETRY_BACKOFF = config("HTTP_RETRY_BACKOFF", default=0.5, cast=float)
+HTTP_RETRY_MAX_WAIT = config("HTTP_RETRY_MAX_WAIT", default=30, cast=float)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_HEADERS = {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+
+
+def retry_delay(attempt, retry_after=None):
+    """
+    Seconds to wait before retry number `attempt` (from 0). A `Retry-After` header, in seconds or as an HTTP
+    date, is honoured up to `HTTP_RETRY_MAX_WAIT`; otherwise the delay is a random share of the exponential
+    backoff ("full jitter"), so that clients that failed together do not retry together.
+    """
+    if retry_after:
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                seconds = None
+        if seconds is not None:
+            return min(max(seconds, 0.0), HTTP_RETRY_MAX_WAIT)
+
+    return random.uniform(0, min(HTTP_RETRY_MAX_WAIT, HTTP_RETRY_BACKOFF * 2 ** attempt))
+
+
+def _host(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class HttpTransport:
+    """
+    Shared HTTP transport of the external API calls: one keep-alive session per host (per event loop for the
+    async clients, which are closed when their loop is shut down), connect and read timeouts, gzip, and
+    retries with jittered backoff on connection errors, timeouts and 429/5xx responses. Responses with an
+    error status raise once the retries are exhausted.
+    """
+
+    def __init__(self, max_retries=HTTP_MAX_RETRIES, pool_size=HTTP_POOL_SIZE):
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._sessions = {}
+        # httpx async clients are bound to the event loop that first uses them, so one set is kept per loop,
+        # along with the async generator that closes them.
+        self._async_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = WeakKeyDictionary()
+
+    def _session(self, url):
+        host = _host(url)
+        with self._lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                session.headers.update(DEFAULT_HEADERS)
+                session.mount(host, HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size))
+                self._sessions[host] = session
+            return self._sessions[host]
+
+    @staticmethod
+    async def _loop_clients():
+        # Stays suspended while its loop runs. `asyncio.run` closes the async generators of a loop before
+        # closing the loop, which closes the clients of the loop without every caller having to.
+        clients = {}
+        try:
+            while True:
+                yield clients
+        finally:
+            await asyncio.gather(*(client.aclose() for client in clients.values()), return_exceptions=True)
+
+    async def _async_client(self, url):
+        host = _host(url)
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_clients:
+            generator = self._loop_clients()
+            self._async_clients[loop] = (generator, await anext(generator))
+        _, loop_clients = self._async_clients[loop]
+        if host not in loop_clients:
+            loop_clients[host] = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            )
+        return loop_clients[host]
+
+    def _retry(self, attempt, status=None, retry_after=None, error=None):
+        """
+        Return the seconds to wait before retrying, or `None` when the request should not be retried.
+        """
+        if attempt >= self.max_retries or (status is not None and status not in RETRY_STATUSES):
+            return None
+        delay = retry_delay(attempt, retry_after)
+        logger.warning("Retrying request in %.1fs after %s", delay, error or f"status {status}")
+        return delay
+
+    def request(self, method, url, headers=None, params=None, provider=None):
+        session = self._session(url)
+        timeout = (HTTP_CONNECT_TIMEOUT, provider_timeout(provider))
+        with span(provider or "http", "http", method=method, url=url) as record:
+            attempt = 0
+            while True:
+                try:
+                    with provider_slot(provider):
+                        response = session.request(method, url, params=params, headers=headers, timeout=timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    delay = self._retry(attempt, error=e)
+                    if delay is None:
+                        raise
+                else:
+                    record.update(status=response.status_code, bytes=len(response.content), attempts=attempt + 1)
+                    delay = self._retry(attempt, response.status_code, response.headers.get("Retry-After"))
+                    if delay is None:
+                        response.raise_for_status()
+                        return response
+
+                time.sleep(delay)
+                attempt += 1
+
+    async def arequest(self, method, url, headers=None, params=None, provider=None):
+        """
+        Async variant of `request`.
+        """
+        client = await self._async_client(url)
+        timeout = httpx.Timeout(provider_timeout(provider), connect=HTTP_CONNECT_TIMEOUT)
+        with span(provider or "http", "http", method=method, url=url) as record:
+            attempt = 0
+            while True:
+                try:
+                    async with aprovider_slot(provider):
+                        response = await client.request(
+                            method, url, params=params, headers=headers, timeout=timeout
+                        )
+                except (httpx.TransportError, httpx.TimeoutException) as e:
+                    delay = self._retry(attempt, error=e)
+                    if delay is None:
+                        raise
+                else:
+                    record.update(status=response.status_code, bytes=len(response.content), attempts=attempt + 1)
+                    delay = self._retry(attempt, response.status_code, response.headers.get("Retry-After"))
+                    if delay is None:
+                        response.raise_for_status()
+                        return response
+
+                await asyncio.sleep(delay)
+                attempt += 1
+
+
+http_transport = HttpTransport()
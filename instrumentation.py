@@ -0,0 +1,269 @@
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+
+from decouple import config
+
+logger = logging.getLogger(__name__)
+
+TRACE_DIR = config("TRACE_DIR", default="traces")
+
+_current_trace = ContextVar("current_trace", default=None)
+_current_span = ContextVar("current_span", default=None)
+
+
+class Trace:
+    """
+    Collects the spans of one graph run: every node and every external call, with wall time, the time spent
+    queued for a provider slot, payload bytes and LLM token counts.
+    """
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.started_at = datetime.now(timezone.utc)
+        self.origin = time.monotonic()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add_span(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def critical_path(self):
+        """
+        This method walks back from the node that finished last, at every step picking the node that finished
+        latest before the current one started. Container nodes (nodes with child nodes, e.g. the analysis
+        stage) are replaced by their children.
+        """
+        node_spans = [span for span in self.spans if span["kind"] == "node" and span.get("end") is not None]
+        parent_ids = {span["parent_id"] for span in node_spans}
+        leaf_spans = [span for span in node_spans if span["id"] not in parent_ids]
+        if not leaf_spans:
+            return []
+
+        current = max(leaf_spans, key=lambda span: span["end"])
+        path = [current]
+        while True:
+            predecessors = [
+                span for span in leaf_spans
+                if span["end"] <= current["start"] + 1e-3 and span["start"] < current["start"]
+            ]
+            if not predecessors:
+                break
+            current = max(predecessors, key=lambda span: span["end"])
+            path.append(current)
+
+        return [self._critical_path_step(span) for span in reversed(path)]
+
+    def _critical_path_step(self, node_span):
+        calls = [span for span in self.spans if span["parent_id"] == node_span["id"] and span["kind"] != "node"]
+        slowest_call = max(calls, key=lambda span: span["wall_seconds"], default=None)
+        return {
+            "node": node_span["name"],
+            "start": node_span["start"],
+            "end": node_span["end"],
+            "wall_seconds": node_span["wall_seconds"],
+            "slowest_call": slowest_call and {
+                "name": slowest_call["name"],
+                "kind": slowest_call["kind"],
+                "wall_seconds": slowest_call["wall_seconds"],
+            },
+        }
+
+    def summary(self):
+        calls = [span for span in self.spans if span["kind"] not in ("node", "cache")]
+        cache_lookups = [span for span in self.spans if span["kind"] == "cache"]
+        by_kind = {}
+        for span in calls:
+            totals = by_kind.setdefault(span["name"], {"calls": 0, "wall_seconds": 0.0, "queue_seconds": 0.0,
+                                                       "bytes": 0, "input_tokens": 0, "output_tokens": 0,
+                                                       "cached_tokens": 0})
+            totals["calls"] += 1
+            for key in ("wall_seconds", "queue_seconds", "bytes", "input_tokens", "output_tokens", "cached_tokens"):
+                totals[key] += span.get(key) or 0
+
+        return {
+            "wall_seconds": round(time.monotonic() - self.origin, 3),
+            "external_calls": {
+                name: {key: round(value, 3) if isinstance(value, float) else value for key, value in totals.items()}
+                for name, totals in sorted(by_kind.items())
+            },
+            "node_cache": {
+                "hits": sum(bool(span.get("hit")) for span in cache_lookups),
+                "misses": sum(not span.get("hit") for span in cache_lookups),
+            },
+        }
+
+    def to_dict(self):
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(),
+            "summary": self.summary(),
+            "critical_path": self.critical_path(),
+            "spans": sorted(self.spans, key=lambda span: span["start"]),
+        }
+
+    def write(self, trace_dir=TRACE_DIR):
+        path = Path(trace_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        trace_file = path / f"{self.run_id}.json"
+        trace_file.write_text(json.dumps(self.to_dict(), indent=2, default=str), encoding="utf-8")
+        return trace_file
+
+
+@contextmanager
+def trace_run(run_id, trace_dir=TRACE_DIR):
+    """
+    Record every span emitted while the block runs and write the trace file with its critical path on exit.
+    """
+    trace = Trace(run_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        trace_file = trace.write(trace_dir)
+        logger.info("%s (trace: %s)", format_trace_critical_path(trace.critical_path()), trace_file)
+
+
+@contextmanager
+def span(name, kind, **attributes):
+    """
+    Time the block as a span of the current run trace. The yielded dict can be updated with measurements
+    such as `bytes`, `input_tokens` or `output_tokens`. Outside of a traced run this only yields the dict.
+    """
+    trace = _current_trace.get()
+    record = {"name": name, "kind": kind, **attributes}
+    if trace is None:
+        yield record
+        return
+
+    start = time.monotonic()
+    record.update({
+        "id": uuid.uuid4().hex[:12],
+        "parent_id": _current_span.get() and _current_span.get()["id"],
+        "start": round(start - trace.origin, 4),
+        "queue_seconds": 0.0,
+    })
+    token = _current_span.set(record)
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = str(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        end = time.monotonic()
+        record["end"] = round(end - trace.origin, 4)
+        record["wall_seconds"] = round(end - start, 4)
+        trace.add_span(record)
+
+
+def record_queue_time(seconds):
+    """
+    Add time spent waiting for a provider slot to the current span.
+    """
+    current_span = _current_span.get()
+    if current_span is not None:
+        current_span["queue_seconds"] = round(current_span.get("queue_seconds", 0.0) + seconds, 4)
+
+
+def annotate_span(**attributes):
+    """
+    Add attributes to the current span, e.g. to flag a hedged request or a missed deadline.
+    """
+    current_span = _current_span.get()
+    if current_span is not None:
+        current_span.update(attributes)
+
+
+def record_llm_usage(record, message):
+    """
+    Copy the token usage reported with an LLM message onto a span record, including the input tokens that
+    the provider served from its prompt cache.
+    """
+    usage = getattr(message, "usage_metadata", None) or {}
+    record["input_tokens"] = usage.get("input_tokens", 0)
+    record["output_tokens"] = usage.get("output_tokens", 0)
+    record["cached_tokens"] = (usage.get("input_token_details") or {}).get("cache_read", 0)
+    record["bytes"] = len(str(getattr(message, "content", "")).encode("utf-8"))
+
+
+def traced_node(name, function):
+    """
+    Wrap a graph node (sync or coroutine function) so that each execution is recorded as a node span.
+    """
+    if inspect.iscoroutinefunction(function):
+        @functools.wraps(function)
+        async def async_node(state):
+            with span(name, "node"):
+                return await function(state)
+
+        return async_node
+
+    @functools.wraps(function)
+    def node(state):
+        with span(name, "node"):
+            return function(state)
+
+    return node
+
+
+def _request_started(request):
+    request.extensions["trace_start"] = time.monotonic()
+
+
+def _response_received(response):
+    trace = _current_trace.get()
+    started = response.request.extensions.get("trace_start")
+    if trace is None or started is None:
+        return
+
+    end = time.monotonic()
+    current_span = _current_span.get()
+    trace.add_span({
+        "id": uuid.uuid4().hex[:12],
+        "parent_id": current_span and current_span["id"],
+        "name": "supabase",
+        "kind": "http",
+        "method": response.request.method,
+        "path": response.request.url.path,
+        "status": response.status_code,
+        "bytes": int(response.headers.get("content-length") or 0),
+        "start": round(started - trace.origin, 4),
+        "end": round(end - trace.origin, 4),
+        "wall_seconds": round(end - started, 4),
+        "queue_seconds": 0.0,
+    })
+
+
+async def _arequest_started(request):
+    _request_started(request)
+
+
+async def _aresponse_received(response):
+    _response_received(response)
+
+
+def instrument_httpx_client(client, asynchronous=False):
+    """
+    Record every request of an httpx client (used by the Supabase SDK) as a span of the current run.
+    """
+    client.event_hooks["request"].append(_arequest_started if asynchronous else _request_started)
+    client.event_hooks["response"].append(_aresponse_received if asynchronous else _response_received)
+
+
+def format_trace_critical_path(critical_path):
+    if not critical_path:
+        return "Run critical path: empty"
+
+    steps = ", ".join(f"{step['node']} ({step['wall_seconds']:.1f}s)" for step in critical_path)
+    return f"Run critical path ({critical_path[-1]['end']:.1f}s): {steps}"
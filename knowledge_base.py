@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from types import MappingProxyType
+
+from decouple import config
+
+from context_serializer import COMPACT_CONTEXT_ENABLED, serialize_context
+from instrumentation import span
+from supabase_client import supabase_client
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two checks of the knowledge base version (its `updated_at`).
+KNOWLEDGE_BASE_CHECK_INTERVAL = config("KNOWLEDGE_BASE_CHECK_INTERVAL", default=300, cast=int)
+
+
+def content_digest(row):
+    return hashlib.sha256(json.dumps(row, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class KnowledgeBaseSnapshot:
+    """
+    Immutable copy of the knowledge base row at one version. `fields` holds every field pre-serialized the
+    way the chains send it, so all reports built from one version send identical text. `digest` is a hash
+    of the row's content, which versions it when the row has no `updated_at`.
+    """
+
+    def __init__(self, row):
+        self.version = row.get("updated_at")
+        self.digest = content_digest(row)
+        self.row = MappingProxyType(dict(row))
+        self.fields = MappingProxyType({
+            key: serialize_context(value) if COMPACT_CONTEXT_ENABLED else value for key, value in row.items()
+        })
+
+
+class KnowledgeBaseCache:
+    """
+    Process-wide cache of the `sdr_agent_knowledgebase` row. It is loaded once, then every
+    `check_interval` seconds a background thread compares its `updated_at` with the cached version and
+    reloads the row only when it changed. A row without `updated_at` is read whole instead and replaces the
+    snapshot only when its content hash changed. Readers never wait for a check.
+    """
+
+    def __init__(self, knowledge_base_id=None, check_interval=KNOWLEDGE_BASE_CHECK_INTERVAL):
+        self.knowledge_base_id = knowledge_base_id
+        self.check_interval = check_interval
+        self.snapshot = None
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _query(self, columns):
+        with span("supabase", "knowledge_base", columns=columns):
+            return (
+                supabase_client.table("sdr_agent_knowledgebase")
+                .select(columns)
+                .eq("id", self.knowledge_base_id or config("KNOWLEDGE_BASE_ID"))
+                .single()
+                .execute()
+            ).data
+
+    def _load(self):
+        snapshot = KnowledgeBaseSnapshot(self._query("*"))
+        with self._lock:
+            self.snapshot = snapshot
+            self.checked_at = time.monotonic()
+        return snapshot
+
+    def _check(self):
+        """
+        Return the new snapshot when the knowledge base changed since the cached one, or `None`.
+        """
+        if self.snapshot.version is not None:
+            version = self._query("updated_at").get("updated_at")
+            if version == self.snapshot.version:
+                return None
+            logger.info("Reloading the knowledge base, version %s", version)
+            return KnowledgeBaseSnapshot(self._query("*"))
+
+        row = self._query("*")
+        if row.get("updated_at") is None and content_digest(row) == self.snapshot.digest:
+            return None
+        logger.info("Reloading the knowledge base, its content changed")
+        return KnowledgeBaseSnapshot(row)
+
+    def _refresh(self):
+        try:
+            snapshot = self._check()
+            with self._lock:
+                self.snapshot = snapshot or self.snapshot
+                self.checked_at = time.monotonic()
+        except Exception as e:
+            logger.warning("Failed to refresh the knowledge base: %s", e)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _cached(self):
+        with self._lock:
+            snapshot = self.snapshot
+            stale = snapshot is not None and time.monotonic() - self.checked_at > self.check_interval
+            if stale and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh, daemon=True).start()
+
+        return snapshot
+
+    def get(self):
+        """
+        Return the current snapshot, loading the knowledge base only the first time.
+        """
+        return self._cached() or self._load()
+
+    async def aget(self):
+        """
+        Async variant of `get`. Only the first load leaves the event loop.
+        """
+        return self._cached() or await asyncio.to_thread(self._load)
+
+    def preload(self):
+        """
+        Load the knowledge base at startup, so that no report waits for it.
+        """
+        try:
+            self.get()
+        except Exception as e:
+            logger.warning("Failed to preload the knowledge base: %s", e)
+
+
+knowledge_base_cache = KnowledgeBaseCache()
@@ -0,0 +1,197 @@
+import copy
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+from urllib.parse import unquote, urlsplit
+
+from decouple import config
+
+from instrumentation import annotate_span, span
+from supabase_client import get_async_supabase_client, supabase_client
+
+logger = logging.getLogger(__name__)
+
+LINKEDIN_PROFILE_CACHE_ENABLED = config("LINKEDIN_PROFILE_CACHE_ENABLED", default=True, cast=bool)
+# Seconds a Proxycurl profile is reused before Proxycurl is called again for the same person.
+LINKEDIN_PROFILE_CACHE_TTL = config("LINKEDIN_PROFILE_CACHE_TTL", default=7 * 24 * 3600, cast=int)
+# Profiles kept in the in-process index, least recently used first out.
+LINKEDIN_PROFILE_CACHE_MAX_ENTRIES = config("LINKEDIN_PROFILE_CACHE_MAX_ENTRIES", default=1000, cast=int)
+# Stored rows of one person read to find when their latest payload was fetched from Proxycurl.
+LINKEDIN_PROFILE_CACHE_HISTORY = config("LINKEDIN_PROFILE_CACHE_HISTORY", default=50, cast=int)
+
+PROFILE_PATH_PATTERN = re.compile(r"^/(?:in|pub)/([^/]+)")
+# Columns Supabase sets on every stored row; everything else is the Proxycurl payload.
+ROW_FIELDS = {"id", "created_at", "updated_at"}
+
+CachedProfile = namedtuple("CachedProfile", ["payload", "fetched_at"])
+
+
+def public_identifier(linkedin_url):
+    """
+    Canonical public identifier of a LinkedIn profile URL, e.g. "jane-doe" for
+    "https://uk.linkedin.com/in/Jane-Doe/?originalSubdomain=uk". Returns `None` for other URLs.
+    """
+    linkedin_url = (linkedin_url or "").strip()
+    parts = urlsplit(linkedin_url if "://" in linkedin_url else f"https://{linkedin_url}")
+    match = PROFILE_PATH_PATTERN.match(parts.path)
+    if not match or not parts.netloc.lower().split(":")[0].endswith("linkedin.com"):
+        return None
+
+    return unquote(match.group(1)).strip().lower() or None
+
+
+def profile_payload(profile):
+    """
+    The Proxycurl payload of a stored profile row, i.e. the row without the columns set by Supabase.
+    """
+    return {key: value for key, value in profile.items() if key not in ROW_FIELDS}
+
+
+def _created_at(profile):
+    try:
+        return datetime.fromisoformat(profile["created_at"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+
+
+def _payload_digest(profile):
+    return json.dumps(profile_payload(profile), sort_keys=True, default=str)
+
+
+def fetched_at(rows):
+    """
+    When the payload of the latest of `rows` (newest first) was fetched from Proxycurl. A reused payload is
+    stored again as a new row for every report, so this is the creation time of its oldest copy rather than
+    of the latest row; otherwise every reuse would extend the payload's life by another TTL.
+    """
+    latest = _payload_digest(rows[0])
+    fetched = _created_at(rows[0])
+    for row in rows[1:]:
+        if _payload_digest(row) != latest:
+            break
+        fetched = _created_at(row)
+    return fetched
+
+
+class LinkedinProfileCache:
+    """
+    Cache of Proxycurl profiles, keyed by public identifier. A payload fetched less than `ttl` ago is served
+    from an in-process index, or else from the latest `sdr_agent_linkedinprofile` rows of that identifier,
+    so the same person is fetched at most once per `ttl`. Only the payload is shared: every report stores it
+    as a row of its own (see `LinkedinProfileClient`). Hits and misses are counted.
+    """
+
+    def __init__(self, ttl=LINKEDIN_PROFILE_CACHE_TTL, max_entries=LINKEDIN_PROFILE_CACHE_MAX_ENTRIES,
+                 enabled=LINKEDIN_PROFILE_CACHE_ENABLED):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.index = OrderedDict()
+        self.metrics = {"index_hits": 0, "database_hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def _cutoff(self):
+        return time.time() - self.ttl
+
+    def _history_cutoff(self):
+        # Copies of a payload are only stored while it is fresh, so the oldest copy of a payload that is still
+        # fresh is at most two TTLs old.
+        return datetime.fromtimestamp(time.time() - 2 * self.ttl, timezone.utc).isoformat()
+
+    def _select(self, client, identifier):
+        return (
+            client.table("sdr_agent_linkedinprofile")
+            .select("*")
+            .eq("public_identifier", identifier)
+            .gte("created_at", self._history_cutoff())
+            .order("created_at", desc=True)
+            .limit(LINKEDIN_PROFILE_CACHE_HISTORY)
+        )
+
+    def _count(self, outcome):
+        with self._lock:
+            self.metrics[outcome] += 1
+        annotate_span(linkedin_profile_cache=outcome)
+
+    def _indexed(self, identifier):
+        with self._lock:
+            entry = self.index.get(identifier)
+            if entry and entry.fetched_at > self._cutoff():
+                self.index.move_to_end(identifier)
+            else:
+                self.index.pop(identifier, None)
+                entry = None
+        if entry:
+            self._count("index_hits")
+            return CachedProfile(copy.deepcopy(entry.payload), entry.fetched_at)
+        return None
+
+    def _found(self, identifier, rows):
+        fetched = fetched_at(rows) if rows else None
+        if fetched is None or fetched <= self._cutoff():
+            self._count("misses")
+            return None
+
+        self._count("database_hits")
+        self.put(rows[0], identifier, fetched)
+        return CachedProfile(profile_payload(copy.deepcopy(rows[0])), fetched)
+
+    def get(self, identifier):
+        """
+        Return the `CachedProfile` of `identifier` when its payload was fetched less than the TTL ago, or
+        `None`.
+        """
+        if not self.enabled or not identifier:
+            return None
+
+        profile = self._indexed(identifier)
+        if profile is not None:
+            return profile
+
+        with span("supabase", "linkedin_profile_cache", public_identifier=identifier):
+            return self._found(identifier, self._select(supabase_client, identifier).execute().data)
+
+    async def aget(self, identifier):
+        """
+        Async variant of `get`.
+        """
+        if not self.enabled or not identifier:
+            return None
+
+        profile = self._indexed(identifier)
+        if profile is not None:
+            return profile
+
+        with span("supabase", "linkedin_profile_cache", public_identifier=identifier):
+            async_supabase_client = await get_async_supabase_client()
+            return self._found(identifier, (await self._select(async_supabase_client, identifier).execute()).data)
+
+    def put(self, profile, identifier=None, fetched=None):
+        """
+        Index the payload of a stored profile under its public identifier. `fetched` is when the payload came
+        from Proxycurl, by default when the row was created.
+        """
+        identifier = identifier or (profile.get("public_identifier") or "").lower()
+        if not self.enabled or not identifier:
+            return
+
+        entry = CachedProfile(profile_payload(copy.deepcopy(profile)), fetched or _created_at(profile))
+        with self._lock:
+            self.index[identifier] = entry
+            self.index.move_to_end(identifier)
+            while len(self.index) > self.max_entries:
+                self.index.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            metrics = dict(self.metrics)
+        hits = metrics["index_hits"] + metrics["database_hits"]
+        lookups = hits + metrics["misses"]
+        return {**metrics, "hits": hits, "hit_rate": round(hits / lookups, 3) if lookups else 0.0}
+
+
+linkedin_profile_cache = LinkedinProfileCache()
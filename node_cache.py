@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from decouple import config
+
+NODE_CACHE_ENABLED = config("NODE_CACHE_ENABLED", default=True, cast=bool)
+NODE_CACHE_PATH = config("NODE_CACHE_PATH", default="sdr_agent_node_cache.sqlite")
+NODE_CACHE_TTL = config("NODE_CACHE_TTL", default=7 * 24 * 3600, cast=int)
+NODE_CACHE_MAX_ENTRIES = config("NODE_CACHE_MAX_ENTRIES", default=5000, cast=int)
+
+# Row identifiers and timestamps differ every time the same data is fetched again, so they are left out of
+# the fingerprint of a node's context.
+VOLATILE_FIELDS = {"id", "created_at", "updated_at", "linkedin_profile_id", "company_profile_id", "scholar_id"}
+
+
+def _stable_context(value):
+    if isinstance(value, dict):
+        return {key: _stable_context(item) for key, item in value.items() if key not in VOLATILE_FIELDS}
+    if isinstance(value, (list, tuple)):
+        return [_stable_context(item) for item in value]
+    if hasattr(value, "model_dump"):
+        return _stable_context(value.model_dump())
+    return value
+
+
+def fingerprint(node, prompt, model, context):
+    """
+    Stable hash of everything an LLM call of a node depends on: the node, the prompt name and tag, the model
+    and the context it is given.
+    """
+    payload = json.dumps(
+        {"node": node, "prompt": prompt, "model": model, "context": _stable_context(context)},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class NodeResultCache:
+    """
+    SQLite-backed cache of LLM outputs of graph nodes, with a TTL and least-recently-used eviction once it
+    holds more than `max_entries` results. Hits and misses are counted per node.
+    """
+
+    def __init__(self, path=NODE_CACHE_PATH, ttl=NODE_CACHE_TTL, max_entries=NODE_CACHE_MAX_ENTRIES,
+                 enabled=NODE_CACHE_ENABLED):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.metrics = {}
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _db(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS node_results (
+                    key TEXT PRIMARY KEY,
+                    node TEXT,
+                    prompt TEXT,
+                    model TEXT,
+                    value TEXT,
+                    created_at REAL,
+                    accessed_at REAL
+                )
+                """
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS node_results_accessed ON node_results (accessed_at)")
+        return self._connection
+
+    def _count(self, node, outcome):
+        node_metrics = self.metrics.setdefault(node, {"hits": 0, "misses": 0})
+        node_metrics[outcome] += 1
+
+    def get(self, key, node):
+        """
+        Return the cached output for `key`, or `None` when it is missing or older than the TTL.
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT value FROM node_results WHERE key = ? AND created_at > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row:
+                db.execute("UPDATE node_results SET accessed_at = ? WHERE key = ?", (now, key))
+                db.commit()
+            self._count(node, "hits" if row else "misses")
+
+        return row[0] if row else None
+
+    async def aget(self, key, node):
+        """
+        Async variant of `get`, querying SQLite in a worker thread so the event loop is not blocked.
+        """
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self.get, key, node)
+
+    def set(self, key, node, prompt, model, value):
+        if not self.enabled:
+            return
+
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO node_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, node, prompt, model, value, now, now),
+            )
+            db.execute("DELETE FROM node_results WHERE created_at <= ?", (now - self.ttl,))
+            db.execute(
+                """
+                DELETE FROM node_results WHERE key IN (
+                    SELECT key FROM node_results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            db.commit()
+
+    async def aset(self, key, node, prompt, model, value):
+        """
+        Async variant of `set`.
+        """
+        if not self.enabled:
+            return
+        await asyncio.to_thread(self.set, key, node, prompt, model, value)
+
+    def stats(self):
+        with self._lock:
+            nodes = {node: dict(node_metrics) for node, node_metrics in sorted(self.metrics.items())}
+        hits = sum(node_metrics["hits"] for node_metrics in nodes.values())
+        misses = sum(node_metrics["misses"] for node_metrics in nodes.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "nodes": nodes,
+        }
+
+
+node_result_cache = NodeResultCache()
@@ -0,0 +1,54 @@
+import json
+
+from decouple import config
+from langchain_core.messages import SystemMessage
+
+from context_serializer import COMPACT_CONTEXT_ENABLED, serialize_context
+
+# "inline" renders every context into the prompt of each chain. "shared_prefix" sends the context shared by
+# the chains once, as an identical first message, so that the provider's prompt cache can serve it.
+PROMPT_LAYOUT = config("PROMPT_LAYOUT", default="inline")
+SHARED_PREFIX_LAYOUT = PROMPT_LAYOUT == "shared_prefix"
+
+# Token budget of the shared context, packed once for all chains.
+SHARED_PREFIX_BUDGET = config("SHARED_PREFIX_BUDGET", default=24000, cast=int)
+
+SHARED_PREFIX_HEADER = (
+    "Shared research context about the prospect and about our own offering. The instructions that follow "
+    "refer to its sections by title."
+)
+
+
+def serialize_block(value):
+    """
+    Deterministic rendering of a context block, so that the same data always gives the same prefix.
+    """
+    if isinstance(value, str):
+        return value
+    if COMPACT_CONTEXT_ENABLED:
+        return serialize_context(value)
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def shared_prefix_message(blocks):
+    """
+    Build the shared prefix from `(title, value)` blocks. Blocks should be ordered from the most stable
+    (e.g. the knowledge base, identical for every prospect) to the most specific, so that the longest
+    possible prefix is reused.
+    """
+    sections = [f"## {title}\n{serialize_block(value)}" for title, value in blocks]
+    return SystemMessage("\n\n".join([SHARED_PREFIX_HEADER, *sections]))
+
+
+def block_reference(title):
+    return f'(see "{title}" in the shared research context)'
+
+
+def reference_shared_values(chain_input, blocks):
+    """
+    Replace the chain input values that are shared blocks with a reference to the block.
+    """
+    return {
+        key: next((block_reference(title) for title, block in blocks if value and value == block), value)
+        for key, value in chain_input.items()
+    }
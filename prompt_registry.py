@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from decouple import config
+from langchain_core.load import dumpd, load
+from langsmith import Client as LangSmithClient
+
+from deadlines import provider_timeout
+from instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+PROMPT_CACHE_TTL = config("PROMPT_CACHE_TTL", default=600, cast=int)
+PROMPT_SNAPSHOT_PATH = config("PROMPT_SNAPSHOT_PATH", default="prompt_snapshot.json")
+
+
+class PromptRegistry:
+    """
+    Process-wide cache of the LangSmith prompts used by the chains. Prompts are served from memory; once older
+    than the TTL they are still served while a background thread pulls the new version. Every pulled prompt
+    is also written to an on-disk snapshot, which is used when LangSmith is slow or unreachable.
+    """
+
+    def __init__(self, tag=None, ttl=PROMPT_CACHE_TTL, snapshot_path=PROMPT_SNAPSHOT_PATH):
+        self.tag = tag
+        self.ttl = ttl
+        self.snapshot_path = Path(snapshot_path)
+        self.prompts = {}
+        self.local_prompts = {}
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._refreshing = set()
+        self._langsmith_client = None
+
+    def _client(self):
+        if self._langsmith_client is None:
+            self._langsmith_client = LangSmithClient(
+                api_key=config("LANGSMITH_API_KEY"), timeout_ms=int(provider_timeout("langsmith") * 1000)
+            )
+        return self._langsmith_client
+
+    def _pull(self, prompt_name):
+        with span("langsmith", "prompt", prompt=prompt_name):
+            prompt = self._client().pull_prompt(f"{prompt_name}:{self.tag or config('LANGSMITH_PROMPT_TAG')}")
+
+        with self._lock:
+            self.prompts[prompt_name] = (prompt, time.monotonic())
+        return prompt
+
+    def _read_snapshot(self):
+        try:
+            return json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _write_snapshot(self):
+        with self._lock:
+            snapshot = {name: dumpd(prompt) for name, (prompt, _) in self.prompts.items()}
+
+        with self._snapshot_lock:
+            snapshot = {**self._read_snapshot(), **snapshot}
+            temporary_path = self.snapshot_path.with_suffix(".tmp")
+            try:
+                temporary_path.write_text(json.dumps(snapshot), encoding="utf-8")
+                os.replace(temporary_path, self.snapshot_path)
+            except OSError as e:
+                logger.warning("Failed to write the prompt snapshot: %s", e)
+
+    def _load_from_snapshot(self, prompt_name):
+        snapshot = self._read_snapshot()
+        if prompt_name not in snapshot:
+            return None
+
+        logger.warning("Using the on-disk snapshot of prompt %s", prompt_name)
+        prompt = load(snapshot[prompt_name])
+        with self._lock:
+            # Stamped as expired, so the next use tries LangSmith again in the background.
+            self.prompts[prompt_name] = (prompt, time.monotonic() - self.ttl)
+        return prompt
+
+    def _pull_or_snapshot(self, prompt_name):
+        try:
+            prompt = self._pull(prompt_name)
+        except Exception as e:
+            logger.warning("Failed to pull prompt %s: %s", prompt_name, e)
+            prompt = self._load_from_snapshot(prompt_name)
+            if prompt is None:
+                raise
+            return prompt
+
+        self._write_snapshot()
+        return prompt
+
+    def _refresh_in_background(self, prompt_name):
+        with self._lock:
+            if prompt_name in self._refreshing:
+                return
+            self._refreshing.add(prompt_name)
+
+        def refresh():
+            try:
+                self._pull(prompt_name)
+                self._write_snapshot()
+            except Exception as e:
+                logger.warning("Failed to refresh prompt %s: %s", prompt_name, e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(prompt_name)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def register(self, prompt_name, prompt):
+        """
+        Serve a prompt defined in code under `prompt_name`, without pulling it from LangSmith.
+        """
+        self.local_prompts[prompt_name] = prompt
+
+    def _cached(self, prompt_name):
+        if prompt_name in self.local_prompts:
+            return self.local_prompts[prompt_name]
+
+        with self._lock:
+            cached = self.prompts.get(prompt_name)
+
+        if cached is None:
+            return None
+
+        prompt, pulled_at = cached
+        if time.monotonic() - pulled_at > self.ttl:
+            self._refresh_in_background(prompt_name)
+        return prompt
+
+    def get(self, prompt_name):
+        """
+        Return the prompt, pulling it only when it has never been loaded in this process.
+        """
+        prompt = self._cached(prompt_name)
+        return prompt if prompt is not None else self._pull_or_snapshot(prompt_name)
+
+    async def aget(self, prompt_name):
+        """
+        Async variant of `get`. Only a first pull leaves the event loop.
+        """
+        prompt = self._cached(prompt_name)
+        return prompt if prompt is not None else await asyncio.to_thread(self._pull_or_snapshot, prompt_name)
+
+    def preload(self, prompt_names):
+        """
+        Pull all prompts concurrently, e.g. at startup, so no chain waits for LangSmith.
+        """
+        missing = [prompt_name for prompt_name in prompt_names if prompt_name not in self.prompts]
+        with ThreadPoolExecutor(max_workers=max(len(missing), 1)) as executor:
+            for prompt_name, outcome in zip(missing, executor.map(self._safe_pull, missing)):
+                if isinstance(outcome, Exception):
+                    logger.warning("Failed to pull prompt %s: %s", prompt_name, outcome)
+                    self._load_from_snapshot(prompt_name)
+
+        if missing:
+            self._write_snapshot()
+
+    def _safe_pull(self, prompt_name):
+        try:
+            return self._pull(prompt_name)
+        except Exception as e:
+            return e
+
+
+prompt_registry = PromptRegistry()
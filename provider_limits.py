@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from weakref import WeakKeyDictionary
+
+from decouple import config
+
+from instrumentation import record_queue_time
+
+DEFAULT_PROVIDER_LIMITS = {
+    "proxycurl": 10,
+    "apify": 5,
+    "serp": 10,
+    "openrouter": 20,
+    "sendgrid": 5,
+    "crawl4ai": 4,
+}
+
+# Maximum number of in-flight calls per external provider, overridable with e.g. `PROXYCURL_MAX_CONCURRENCY`.
+provider_limits = {
+    provider: config(f"{provider.upper()}_MAX_CONCURRENCY", default=limit, cast=int)
+    for provider, limit in DEFAULT_PROVIDER_LIMITS.items()
+}
+
+_lock = threading.Lock()
+_thread_semaphores = {}
+# asyncio semaphores are bound to the event loop that first uses them, so one set is kept per loop.
+_async_semaphores: "WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = WeakKeyDictionary()
+
+
+def configure_provider_limits(limits):
+    """
+    Override the concurrency limit of one or more providers. Takes effect for calls made afterwards.
+    """
+    unknown_providers = set(limits) - set(provider_limits)
+    if unknown_providers:
+        raise ValueError(f"Unknown providers: {', '.join(sorted(unknown_providers))}")
+
+    with _lock:
+        provider_limits.update(limits)
+        _thread_semaphores.clear()
+        _async_semaphores.clear()
+
+
+def _thread_semaphore(provider):
+    with _lock:
+        if provider not in _thread_semaphores:
+            _thread_semaphores[provider] = threading.BoundedSemaphore(provider_limits[provider])
+        return _thread_semaphores[provider]
+
+
+def _async_semaphore(provider):
+    loop_semaphores = _async_semaphores.setdefault(asyncio.get_running_loop(), {})
+    if provider not in loop_semaphores:
+        loop_semaphores[provider] = asyncio.Semaphore(provider_limits[provider])
+    return loop_semaphores[provider]
+
+
+@contextmanager
+def provider_slot(provider):
+    """
+    Block until a call slot for `provider` is free. `None` means the call is not limited. The time spent
+    waiting is recorded as queue time on the current span.
+    """
+    queued_at = time.monotonic()
+    with _thread_semaphore(provider) if provider else nullcontext():
+        record_queue_time(time.monotonic() - queued_at)
+        yield
+
+
+@asynccontextmanager
+async def aprovider_slot(provider):
+    """
+    Async variant of `provider_slot`.
+    """
+    if not provider:
+        yield
+        return
+
+    queued_at = time.monotonic()
+    async with _async_semaphore(provider):
+        record_queue_time(time.monotonic() - queued_at)
+        yield
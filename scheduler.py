@@ -0,0 +1,177 @@
+import asyncio
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+
+from instrumentation import span
+
+
+class DependencyScheduler:
+    """
+    Runs a set of graph nodes as a dataflow: every node starts as soon as the nodes producing the state keys
+    it reads have finished, instead of waiting for a whole LangGraph superstep.
+
+    `nodes` maps node names to callables taking a state dict and returning a state update, `reads` and `writes`
+    map node names to the state keys they consume and produce. Keys read but not written by any node must be
+    present in the input state.
+    """
+
+    def __init__(self, nodes, reads, writes):
+        self.nodes = nodes
+        self.reads = reads
+        self.writes = writes
+
+        producers = {}
+        for node, keys in writes.items():
+            for key in keys:
+                if key in producers:
+                    raise ValueError(f"State key '{key}' is written by both {producers[key]} and {node}")
+                producers[key] = node
+
+        self.produced_keys = set(producers)
+        self.dependencies = {
+            node: sorted({producers[key] for key in reads.get(node, []) if key in producers})
+            for node in nodes
+        }
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        order = []
+        remaining = dict(self.dependencies)
+        while remaining:
+            ready = sorted(node for node, dependencies in remaining.items() if set(dependencies) <= set(order))
+            if not ready:
+                raise ValueError(f"Dependency cycle between nodes: {', '.join(sorted(remaining))}")
+            order.extend(ready)
+            for node in ready:
+                remaining.pop(node)
+
+        return order
+
+    def _node_state(self, node, state, results):
+        """
+        This method builds the state a node sees: the input state plus only the produced keys it declared.
+        Reading an undeclared produced key raises a KeyError instead of silently racing its producer.
+        """
+        node_state = {key: value for key, value in state.items() if key not in self.produced_keys}
+        node_state.update({key: results[key] for key in self.reads.get(node, []) if key in results})
+        return node_state
+
+    def _ready_nodes(self, finished, started):
+        return [
+            node for node in self.order
+            if node not in started and all(dependency in finished for dependency in self.dependencies[node])
+        ]
+
+    def run(self, state, on_update=None):
+        """
+        Run all nodes on a thread pool and return the merged updates together with per-node timings.
+        `on_update(node, update)` is called as soon as each node finishes.
+        """
+        results, timings, finished, started, futures = {}, {}, set(), set(), {}
+        stage_start = time.monotonic()
+
+        def timed(node, node_state, queued_at):
+            start = time.monotonic()
+            with span(node, "node") as record:
+                record["queue_seconds"] = round(start - queued_at, 4)
+                update = self.nodes[node](node_state)
+            return update, start - stage_start, time.monotonic() - stage_start
+
+        with ThreadPoolExecutor(max_workers=len(self.nodes)) as executor:
+            while len(finished) < len(self.nodes):
+                for node in self._ready_nodes(finished, started):
+                    started.add(node)
+                    future = executor.submit(
+                        copy_context().run, timed, node, self._node_state(node, state, results), time.monotonic()
+                    )
+                    futures[future] = node
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = futures.pop(future)
+                    update, start, end = future.result()
+                    results.update(update or {})
+                    if on_update:
+                        on_update(node, update)
+                    timings[node] = {"start": start, "end": end}
+                    finished.add(node)
+
+        return results, timings
+
+    async def arun(self, state, on_update=None):
+        """
+        Async variant of `run` for coroutine nodes, running them as tasks on the current event loop.
+        """
+        results, timings, finished, started, tasks = {}, {}, set(), set(), {}
+        stage_start = time.monotonic()
+
+        async def timed(node, node_state, queued_at):
+            start = time.monotonic()
+            with span(node, "node") as record:
+                record["queue_seconds"] = round(start - queued_at, 4)
+                update = await self.nodes[node](node_state)
+            return update, start - stage_start, time.monotonic() - stage_start
+
+        while len(finished) < len(self.nodes):
+            for node in self._ready_nodes(finished, started):
+                started.add(node)
+                task = asyncio.create_task(timed(node, self._node_state(node, state, results), time.monotonic()))
+                tasks[task] = node
+
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node = tasks.pop(task)
+                update, start, end = task.result()
+                results.update(update or {})
+                if on_update:
+                    on_update(node, update)
+                timings[node] = {"start": start, "end": end}
+                finished.add(node)
+
+        return results, timings
+
+    def critical_path(self, timings):
+        """
+        This method walks back from the last node to finish, following at every step the dependency that
+        finished last, and returns the chain of nodes that determined the stage's wall time.
+        """
+        if not timings:
+            return []
+
+        node = max(timings, key=lambda name: timings[name]["end"])
+        path = [node]
+        while self.dependencies[node]:
+            node = max(self.dependencies[node], key=lambda name: timings[name]["end"])
+            path.append(node)
+
+        return [
+            {"node": name, "start": round(timings[name]["start"], 3), "end": round(timings[name]["end"], 3)}
+            for name in reversed(path)
+        ]
+
+    def dependency_report(self):
+        """
+        This method describes the derived dependencies and the longest chain of sequential nodes.
+        """
+        depth = {}
+        for node in self.order:
+            depth[node] = 1 + max((depth[dependency] for dependency in self.dependencies[node]), default=0)
+
+        chain = [max(self.order, key=lambda name: depth[name])]
+        while self.dependencies[chain[-1]]:
+            chain.append(max(self.dependencies[chain[-1]], key=lambda name: depth[name]))
+
+        lines = [
+            f"{node} <- {', '.join(self.dependencies[node]) or 'stage input'}" for node in self.order
+        ]
+        lines.append(f"Longest chain ({len(chain)} sequential nodes): {' -> '.join(reversed(chain))}")
+        return "\n".join(lines)
+
+
+def format_critical_path(critical_path):
+    if not critical_path:
+        return "Critical path: empty"
+
+    steps = ", ".join(f"{step['node']} {step['start']:.1f}s→{step['end']:.1f}s" for step in critical_path)
+    return f"Critical path ({critical_path[-1]['end']:.1f}s): {steps}"
@@ -1,9 +1,8 @@
-from typing import TypedDict, Optional
-
-from clients.ai_client.ai_client import AIClient
+from typing import TypedDict
 
 
 class State(TypedDict):
+    run_id: str
     linkedin_url: str
     linkedin_profile: dict
     user_recent_company_linkedin_profile_urls: list
@@ -12,11 +11,12 @@ class State(TypedDict):
     company_websites: list
     google_news: list
     google_publications: list
+    google_scholar_profile: dict
     linkedin_posts: list
     linkedin_comments: list
     knowledge_base: dict
-    ai_client: Optional[AIClient]
     user_google_news: str
+    news_available: bool
     user_publications: str
     opportunities: str
     talking_points: str
@@ -29,6 +29,7 @@ class State(TypedDict):
     outreach_email: str
     additional_outreaches: str
     citations: str
+    analysis_critical_path: list
     email: str
     result: str
     profile_info_markdown: str
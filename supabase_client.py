@@ -1,8 +1,29 @@
+import asyncio
+from weakref import WeakKeyDictionary
+
 from decouple import config
-from supabase import Client, create_client
+from supabase import AsyncClient, Client, acreate_client, create_client
+
+from instrumentation import instrument_httpx_client
 
 
 url = config("SUPABASE_URL")
 key = config("SUPABASE_KEY")
 
 supabase_client: Client = create_client(url, key)
+instrument_httpx_client(supabase_client.postgrest.session)
+instrument_httpx_client(supabase_client.storage.session)
+
+# The async client pools its connections on the event loop it was created in, so one is kept per loop.
+_async_supabase_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = WeakKeyDictionary()
+
+
+async def get_async_supabase_client() -> AsyncClient:
+    loop = asyncio.get_running_loop()
+    if loop not in _async_supabase_clients:
+        async_supabase_client = await acreate_client(url, key)
+        instrument_httpx_client(async_supabase_client.postgrest.session, asynchronous=True)
+        instrument_httpx_client(async_supabase_client.storage.session, asynchronous=True)
+        _async_supabase_clients[loop] = async_supabase_client
+
+    return _async_supabase_clients[loop]
@@ -0,0 +1,53 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Module-level clients read these at import time; the tests never reach the services.
+for name, value in {
+    "SUPABASE_URL": "https://example.supabase.co",
+    "SUPABASE_KEY": "eyJhbGciOiJIUzI1NiJ9.e30.test",
+    "LANGSMITH_API_KEY": "test",
+    "LANGSMITH_PROMPT_TAG": "test",
+    "OPEN_ROUTER_API_KEY": "test",
+    "PROXY_CURL_API_KEY": "test",
+    "PROXY_CURL_LINKEDIN_PROFILE_URL": "https://proxycurl.test/profile?url=",
+    "PROXY_CURL_LINKEDIN_COMPANY_PROFILE_URL": "https://proxycurl.test/company?url=",
+    "PROXY_CURL_LINKEDIN_SCHOOL_PROFILE_URL": "https://proxycurl.test/school?url=",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+
+@pytest.fixture
+def fake_ai_client(tmp_path, monkeypatch):
+    """
+    Build an AIClient for a small prospect whose model answers with `responses` in turn, with a node result
+    cache of its own.
+    """
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    import clients.ai_client.ai_client as ai_client_module
+    from clients.ai_client.ai_client import AIClient
+    from node_cache import NodeResultCache
+
+    class FakeModel(FakeListChatModel):
+        model_name: str = "fake-model"
+
+    node_cache = NodeResultCache(path=str(tmp_path / "node_cache.sqlite"))
+    monkeypatch.setattr(ai_client_module, "node_result_cache", node_cache)
+
+    def build(responses):
+        ai_client = AIClient.__new__(AIClient)
+        ai_client.model = FakeModel(responses=list(responses))
+        ai_client.news_availability = False
+        ai_client.context_reports = {}
+        ai_client._shared_prefix = None
+        ai_client._set_sdr_data({"id": 1, "full_name": "Jane Doe", "headline": "CTO at Acme"})
+        return ai_client
+
+    build.node_cache = node_cache
+    return build
@@ -0,0 +1,102 @@
+import asyncio
+import copy
+from types import SimpleNamespace
+
+import pytest
+
+import clients.ai_client.ai_client as ai_client_module
+from clients.ai_client.ai_client import AIClient
+from graph import SDRAgent
+
+
+def _fetched_state():
+    return {
+        "run_id": "run-1",
+        "linkedin_profile": {"id": 1, "full_name": "Jane Doe", "headline": "CTO at Acme"},
+        "user_recent_company_linkedin_profile_urls": ["https://www.linkedin.com/company/acme/"],
+        "linkedin_company_profiles": [{"id": 7, "name": "Acme"}, {"id": 8, "name": "Globex"}],
+        "company_websites_url": ["https://acme.com"],
+        "company_websites": [[{"id": 3, "url": "https://acme.com", "company_profile_id": 7}], []],
+        "linkedin_posts": [{"id": 4, "text": "Hiring!"}],
+        "linkedin_comments": [],
+        "google_news": [{"id": 5, "title": "Acme raises $10M"}],
+        "google_publications": [{"id": 6, "title": "Robots", "scholar_id": 2}],
+        "google_scholar_profile": {"id": 2, "author_id": "abc"},
+    }
+
+
+@pytest.fixture
+def knowledge_base(monkeypatch):
+    snapshot = SimpleNamespace(fields={"product": "Video platform"})
+
+    async def aget():
+        return snapshot
+
+    monkeypatch.setattr(ai_client_module, "knowledge_base_cache", SimpleNamespace(get=lambda: snapshot, aget=aget))
+
+
+def _lightweight_client(linkedin_profile):
+    ai_client = AIClient.__new__(AIClient)
+    ai_client.model = SimpleNamespace(model_name="model")
+    ai_client.sdr_data_loaded = False
+    ai_client.linkedin_profile = linkedin_profile
+    return ai_client
+
+
+def test_prospect_data_is_loaded_from_the_fetched_records(knowledge_base):
+    state = _fetched_state()
+    fetched = copy.deepcopy(state)
+    ai_client = _lightweight_client(state["linkedin_profile"])
+
+    ai_client.load_sdr_data_from_state(state)
+
+    assert ai_client.linkedin_profile["full_name"] == "Jane Doe"
+    assert [company["name"] for company in ai_client.companies] == ["Acme", "Globex"]
+    assert [website["url"] for website in ai_client.companies[0]["sdr_agent_companywebsite"]] == ["https://acme.com"]
+    assert ai_client.companies_websites == [state["company_websites"][0][0]]
+    assert ai_client.posts == state["linkedin_posts"]
+    assert ai_client.google_news == state["google_news"]
+    assert ai_client.publications == state["google_publications"]
+    assert ai_client.knowledge_base == {"product": "Video platform"}
+    assert state == fetched
+
+
+def test_async_prospect_data_is_loaded_from_the_fetched_records(knowledge_base):
+    state = _fetched_state()
+    ai_client = _lightweight_client(state["linkedin_profile"])
+
+    asyncio.run(ai_client.aload_sdr_data_from_state(state))
+
+    assert [company["name"] for company in ai_client.companies] == ["Acme", "Globex"]
+    assert ai_client.knowledge_base == {"product": "Video platform"}
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    loads = []
+    monkeypatch.setattr(AIClient, "for_author_matching", classmethod(lambda cls, profile: _lightweight_client(profile)))
+    monkeypatch.setattr(AIClient, "load_sdr_data_from_state", lambda self, state: loads.append("state"))
+    monkeypatch.setattr(AIClient, "load_sdr_data", lambda self, linkedin_profile_id: loads.append(linkedin_profile_id))
+
+    agent = SDRAgent(progress_callback=lambda *args: None)
+    agent.loads = loads
+    return agent
+
+
+def test_the_run_client_is_built_from_the_state_once(agent):
+    state = _fetched_state()
+
+    ai_client = agent._get_ai_client(state)
+    ai_client.sdr_data_loaded = True
+
+    assert agent._get_ai_client(state) is ai_client
+    assert agent.loads == ["state"]
+
+
+def test_the_prospect_is_read_back_when_the_state_lacks_fetched_records(agent):
+    state = _fetched_state()
+    del state["google_news"]
+
+    agent._get_ai_client(state)
+
+    assert agent.loads == [1]
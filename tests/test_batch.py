@@ -0,0 +1,44 @@
+import argparse
+
+import pytest
+
+from batch import _parse_limit, load_prospects, main, prospect_run_id
+
+
+def test_limits_name_a_known_provider():
+    assert _parse_limit(" ProxyCurl=5") == ("proxycurl", 5)
+
+    with pytest.raises(argparse.ArgumentTypeError, match="Unknown provider 'proxycurll'"):
+        _parse_limit("proxycurll=5")
+    with pytest.raises(argparse.ArgumentTypeError, match="N >= 1"):
+        _parse_limit("proxycurl=0")
+
+
+def test_unknown_provider_is_rejected_before_the_batch_runs(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(tmp_path / "prospects.csv"), "--limit", "openruoter=30"])
+
+    assert exit_info.value.code == 2
+    assert "Unknown provider 'openruoter'" in capsys.readouterr().err
+
+
+def test_prospects_without_url_or_email_are_skipped(tmp_path):
+    input_path = tmp_path / "prospects.csv"
+    input_path.write_text(
+        "linkedin_url,email,run_id\n"
+        "https://www.linkedin.com/in/jane-doe,jane@example.com,\n"
+        "https://www.linkedin.com/in/john-doe,,\n"
+        ",sam@example.com,run-3\n",
+        encoding="utf-8",
+    )
+
+    assert load_prospects(input_path) == [
+        {"linkedin_url": "https://www.linkedin.com/in/jane-doe", "email": "jane@example.com", "run_id": None}
+    ]
+
+
+def test_run_ids_are_stable_per_prospect():
+    run_id = prospect_run_id("batch", "https://www.linkedin.com/in/jane-doe", "jane@example.com")
+    assert run_id == prospect_run_id("batch", "https://www.linkedin.com/in/jane-doe", "jane@example.com")
+    assert run_id.startswith("batch-")
+    assert run_id != prospect_run_id("batch", "https://www.linkedin.com/in/jane-doe", "john@example.com")
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+import graph
+from graph import SDRAgent
+
+LINKEDIN_URL = "https://www.linkedin.com/in/jane-doe/"
+
+
+class Calls(dict):
+    def record(self, name):
+        self[name] = self.get(name, 0) + 1
+
+
+def _agent(ai_client, calls, failing_section, asynchronous=False):
+    """
+    Build an agent whose data fetching, PDF and email nodes only record that they ran, and whose AI sections
+    run through the section runner of `ai_client`, `failing_section` raising on its first attempt.
+    """
+    agent = SDRAgent(progress_callback=lambda *args: None)
+
+    def chain(name):
+        calls.record(name)
+        if name == failing_section and calls[name] == 1:
+            raise RuntimeError("model unavailable")
+        return f"{name} done"
+
+    def section(name):
+        key = SDRAgent.ANALYSIS_NODE_WRITES[name][0]
+
+        def process(state):
+            output = ai_client.process_with_spinner(
+                name, lambda: chain(name), None, None, agent.show_spinner_message, agent.show_status_message,
+            )
+            return {**agent._empty_section(name), key: output}
+
+        async def aprocess(state):
+            async def achain():
+                return chain(name)
+
+            output = await ai_client.aprocess_with_spinner(
+                name, achain, None, None, agent.show_spinner_message, agent.show_status_message,
+            )
+            return {**agent._empty_section(name), key: output}
+
+        return aprocess if asynchronous else process
+
+    def step(name, update=None):
+        def node(state):
+            calls.record(name)
+            return update or {}
+
+        return node
+
+    sections = {name: section(name) for name in SDRAgent.ANALYSIS_NODE_WRITES}
+    agent._analysis_nodes = agent._async_analysis_nodes = lambda: sections
+    agent._get_ai_client = lambda state: ai_client
+    agent._aggregate_ai_result = lambda state: {"profile_info_markdown": "", "result": ""}
+    agent._graph_nodes = agent._async_graph_nodes = lambda: {
+        "fetch_linkedin_profile": step("fetch_linkedin_profile", {"linkedin_profile": {"id": 1}}),
+        **{name: step(name) for name in SDRAgent.FETCH_NODE_EMPTY_RESULTS if name != "fetch_linkedin_profile"},
+        "initialize_ai_client": step("initialize_ai_client"),
+        **agent._analysis_graph_nodes(asynchronous),
+        "aggregate_ai_result": agent._aggregate_ai_result,
+        "create_pdf": step("create_pdf"),
+        "send_email": step("send_email"),
+    }
+    return agent
+
+
+@pytest.fixture
+def checkpoint_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph, "CHECKPOINT_DB_PATH", str(tmp_path / "checkpoints.sqlite"))
+
+
+def _assert_only_the_failed_section_is_retried(calls, failing_section):
+    assert calls[failing_section] == 2
+    assert all(count == 1 for name, count in calls.items() if name != failing_section)
+    assert calls["send_email"] == 1
+
+
+def test_resumed_run_retries_only_the_failed_section(fake_ai_client, checkpoint_db):
+    calls = Calls()
+    agent = _agent(fake_ai_client([]), calls, "process_opportunities")
+
+    status, message = agent.invoke_graph(LINKEDIN_URL, "sdr@example.com", run_id="run-1")
+    assert status is None and "model unavailable" in message
+    assert "send_email" not in calls
+
+    assert agent.invoke_graph(LINKEDIN_URL, "sdr@example.com", run_id="run-1")[0] == 200
+    _assert_only_the_failed_section_is_retried(calls, "process_opportunities")
+
+
+def test_async_resumed_run_retries_only_the_failed_section(fake_ai_client, checkpoint_db):
+    calls = Calls()
+    agent = _agent(fake_ai_client([]), calls, "process_outreach_email", asynchronous=True)
+
+    status, message = asyncio.run(agent.ainvoke_graph(LINKEDIN_URL, "sdr@example.com", run_id="run-1"))
+    assert status is None and "model unavailable" in message
+
+    assert asyncio.run(agent.ainvoke_graph(LINKEDIN_URL, "sdr@example.com", run_id="run-1"))[0] == 200
+    _assert_only_the_failed_section_is_retried(calls, "process_outreach_email")
+
+
+def test_completed_run_is_not_run_again(fake_ai_client, checkpoint_db):
+    calls = Calls()
+    agent = _agent(fake_ai_client([]), calls, None)
+
+    assert agent.invoke_graph(LINKEDIN_URL, "sdr@example.com", run_id="run-1")[0] == 200
+    assert agent.invoke_graph(LINKEDIN_URL, "sdr@example.com", run_id="run-1")[0] == 200
+    assert calls["fetch_linkedin_profile"] == 1 and calls["send_email"] == 1
+
+
+def test_failed_sections_raise_after_reporting_the_error(fake_ai_client):
+    ai_client, messages = fake_ai_client([]), []
+
+    def chain():
+        raise RuntimeError("model unavailable")
+
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        ai_client.process_with_spinner(
+            "Generating opportunities", chain, None, None, lambda message: None,
+            lambda message, status: messages.append((status, message)),
+        )
+
+    assert messages == [("error", "❌ Generating opportunities...model unavailable")]
@@ -0,0 +1,43 @@
+from citations import CitationRegistry, citation_ids, repair_citations
+
+
+def test_citation_ids_are_read_from_the_context_keys():
+    assert citation_ids({"[1]": "profile", "[3]": "website", "sources": "ignored"}) == {1, 3}
+
+
+def test_groups_and_ranges_become_separate_markers():
+    text, removed_ids = repair_citations("Acme sells robots [1, 3] and software [2-3].", {1, 2, 3})
+
+    assert text == "Acme sells robots [1][3] and software [2][3]."
+    assert removed_ids == []
+
+
+def test_unknown_ids_are_removed():
+    text, removed_ids = repair_citations("Jane leads sales [2][7]. She joined in 2020 [9].", {1, 2})
+
+    assert text == "Jane leads sales [2]. She joined in 2020."
+    assert removed_ids == [7, 9]
+
+
+def test_repeated_markers_are_collapsed_and_links_are_left_alone():
+    text, _ = repair_citations("Acme [^2] [2][3] raised funding, see [4](https://acme.ai).", {2, 3, 4})
+
+    assert text == "Acme [2][3] raised funding, see [4](https://acme.ai)."
+
+
+def test_registry_assigns_ids_by_identity_in_citation_order():
+    registry = CitationRegistry()
+    company = {"name": "Acme"}
+    same_content = {"name": "Acme"}
+    website = {"url": "https://acme.ai"}
+
+    assert registry.add("company", company) == 1
+    assert registry.add("company", company) is None
+    assert registry.add("company", same_content) == 2
+    assert registry.add("website", website, company) == 3
+    assert registry.add("posts", []) is None
+
+    assert registry.key_of(same_content) == "[2]"
+    assert registry.key_of({"name": "Acme"}) is None
+    assert registry[3].company is company
+    assert [citation.kind for citation in registry] == ["company", "company", "website"]
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import clients.proxy_curl.linkedin_company_profile as linkedin_company_profile
+from clients.proxy_curl.linkedin_company_profile import LinkedinCompanyProfileClient
+from company_cache import CachedCompany, CompanyCache, company_key, profile_keys
+
+
+class _Rows:
+    data = []
+
+    def execute(self):
+        return self
+
+
+@pytest.mark.parametrize("url, key", [
+    ("https://www.linkedin.com/company/Acme/", ("universal_name_id", "acme")),
+    ("https://www.linkedin.com/company/1441/about", ("linkedin_internal_id", "1441")),
+    ("https://www.linkedin.com/school/uni/", ("universal_name_id", "uni")),
+    ("https://www.linkedin.com/in/jane-doe/", None),
+])
+def test_company_key(url, key):
+    assert company_key(url) == key
+
+
+def test_put_indexes_every_key_of_the_company():
+    cache = CompanyCache()
+    company = {"id": 1, "universal_name_id": "Acme", "linkedin_internal_id": 1441}
+    cache.put(company, [{"url": "https://acme.com"}])
+
+    assert profile_keys(company) == [("universal_name_id", "acme"), ("linkedin_internal_id", "1441")]
+    assert cache.get(("linkedin_internal_id", "1441")) == CachedCompany(company, [{"url": "https://acme.com"}])
+    assert cache.stats()["index_hits"] == 1
+
+
+def test_single_flight_serializes_a_key_only():
+    cache = CompanyCache()
+    running, overlaps = {}, []
+
+    def fetch(key):
+        with cache.single_flight(key):
+            running[key] = running.get(key, 0) + 1
+            overlaps.append(dict(running))
+            time.sleep(0.05)
+            running[key] -= 1
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(fetch, [("universal_name_id", "acme")] * 2 + [("universal_name_id", "globex")] * 2))
+
+    assert max(counts.get(("universal_name_id", "acme"), 0) for counts in overlaps) == 1
+    assert any(counts.get(("universal_name_id", "globex")) and counts.get(("universal_name_id", "acme"))
+               for counts in overlaps)
+    assert cache._flights == {}
+
+
+def test_async_single_flight_serializes_a_key():
+    cache = CompanyCache()
+    running = []
+
+    async def fetch():
+        async with cache.asingle_flight(("universal_name_id", "acme")):
+            running.append(1)
+            assert len(running) == 1
+            await asyncio.sleep(0.01)
+            running.pop()
+
+    async def main():
+        await asyncio.gather(*(fetch() for _ in range(3)))
+
+    asyncio.run(main())
+
+
+def test_concurrent_prospects_of_a_company_fetch_it_once(monkeypatch):
+    cache = CompanyCache()
+    cache._select = lambda client, key: _Rows()
+    monkeypatch.setattr(linkedin_company_profile, "company_cache", cache)
+    fetches, started = [], threading.Barrier(2)
+
+    def fetch_company_profile(self, url):
+        fetches.append(url)
+        time.sleep(0.05)
+        return {"universal_name_id": "acme", "website": None}
+
+    def store_company(self, record, website_crawler):
+        company_profile = {"id": len(fetches), **record}
+        cache.put(company_profile, [])
+        return CachedCompany(company_profile, [])
+
+    monkeypatch.setattr(LinkedinCompanyProfileClient, "_fetch_company_profile", fetch_company_profile)
+    monkeypatch.setattr(LinkedinCompanyProfileClient, "_store_company", store_company)
+
+    def prospect(linkedin_profile_id):
+        client = LinkedinCompanyProfileClient(["https://www.linkedin.com/company/acme/"], linkedin_profile_id)
+        started.wait()
+        return client.store_company_profiles_and_websites()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(prospect, [1, 2]))
+
+    assert len(fetches) == 1
+    assert [profiles[0]["id"] for profiles, _ in results] == [1, 1]
+
+
+def test_reports_load_the_companies_they_share(monkeypatch):
+    from clients.ai_client.ai_client import AIClient
+
+    linked = {"id": 1, "universal_name_id": "uni", "sdr_agent_companywebsite": []}
+    profile = {
+        "experiences": [
+            {"company_linkedin_profile_url": "https://www.linkedin.com/company/acme/", "ends_at": None},
+            {"company_linkedin_profile_url": "https://www.linkedin.com/school/uni/", "ends_at": None},
+        ],
+        "sdr_agent_companylinkedinprofile": [linked],
+    }
+    shared = CachedCompany({"id": 7, "universal_name_id": "acme"}, [{"url": "https://acme.com"}])
+
+    assert AIClient._shared_company_keys(profile) == [("universal_name_id", "acme")]
+    AIClient._add_shared_companies(profile, [shared, None])
+    assert profile["sdr_agent_companylinkedinprofile"] == [
+        linked, {"id": 7, "universal_name_id": "acme", "sdr_agent_companywebsite": [{"url": "https://acme.com"}]},
+    ]
+
+
+def _report_client(companies):
+    from types import SimpleNamespace
+
+    from clients.ai_client.ai_client import AIClient
+
+    ai_client = AIClient.__new__(AIClient)
+    ai_client.model = SimpleNamespace(model_name="model")
+    ai_client._set_sdr_data({"id": 1, "full_name": "Jane Doe", "sdr_agent_companylinkedinprofile": companies})
+    return ai_client
+
+
+def _company_section_key(ai_client):
+    import clients.ai_client.ai_client as ai_client_module
+
+    token = ai_client_module._citation_context_function.set(ai_client.get_company_context)
+    try:
+        return ai_client._cache_key(
+            "about_company_chain_prompt", ai_client._company_about_chain_input(),
+            citation_message=ai_client._citation_message(None), cache_context=ai_client._company_versions(),
+        )[1]
+    finally:
+        ai_client_module._citation_context_function.reset(token)
+
+
+def _companies():
+    return [
+        {"id": 1, "universal_name_id": "acme", "name": "Acme", "created_at": "2026-10-01",
+         "sdr_agent_companywebsite": [{"id": 3, "url": "https://acme.ai", "created_at": "2026-10-01"}]},
+        {"id": 2, "universal_name_id": "globex", "name": "Globex", "created_at": "2026-10-01",
+         "sdr_agent_companywebsite": []},
+    ]
+
+
+def test_company_section_is_shared_only_under_the_same_citation_ids():
+    first = _report_client(_companies())
+    same_order = _report_client(_companies())
+    other_order = _report_client(list(reversed(_companies())))
+
+    # The versions of the companies match, but the reports cite Acme under different ids.
+    assert first._company_versions() == other_order._company_versions()
+    assert first.citations.key_of(first.companies[0]) != other_order.citations.key_of(other_order.companies[1])
+
+    assert _company_section_key(first) == _company_section_key(same_order)
+    assert _company_section_key(first) != _company_section_key(other_order)
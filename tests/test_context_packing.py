@@ -0,0 +1,96 @@
+from context_packer import TRUNCATION_MARKER, count_tokens, pack_context, select_fields
+from context_serializer import serialize_context
+
+
+def test_select_fields_keeps_the_fields_prompts_use():
+    company = {"id": 3, "name": "Acme", "tagline": "", "head_quarter": {"city": "Berlin", "line1": "Main St 1"}}
+    assert select_fields(company, "company") == {"name": "Acme", "head_quarter": {"city": "Berlin"}}
+
+
+def test_serialize_context_renders_compact_lines():
+    rows = [{"id": 1, "name": "Acme", "specialties": ["AI", "Data"], "website": None}]
+    assert serialize_context(rows) == "- name: Acme\n  specialties:\n    - AI\n    - Data"
+    assert serialize_context("as is") == "as is"
+
+
+def test_budget_holds_for_the_serialized_text():
+    posts = [{"text": f"post number {index} " * 20, "post_type": "post"} for index in range(40)]
+    chain_input = {"linkedin_posts": posts, "instructions": "Summarize."}
+
+    packed, report = pack_context("engagement_highlights_chain_prompt", chain_input, 300, serialize_context)
+
+    serialized_tokens = sum(count_tokens(serialize_context(value)) for value in packed.values())
+    assert serialized_tokens == report["tokens_after"] <= 300
+    # The newest posts are kept whole and the oldest are dropped.
+    assert packed["linkedin_posts"] == posts[:len(packed["linkedin_posts"])]
+    assert packed["instructions"] == "Summarize."
+
+
+def test_citation_sources_are_cut_longest_first():
+    context = {"[1]": "short profile", "[2]": "website text " * 500, "[3]": "post text " * 100}
+    chain_input = {"content": "Section with claims.", "context": context}
+
+    packed, report = pack_context("add_citations_chain_prompt", chain_input, 400)
+
+    assert packed["content"] == "Section with claims."
+    assert packed["context"]["[1]"] == "short profile"
+    assert packed["context"]["[2]"].endswith(TRUNCATION_MARKER)
+    assert report["tokens_after"] <= 400 + 10
+
+
+def test_inputs_within_budget_are_only_reduced_to_the_fields_prompts_use():
+    chain_input = {"linkedin_posts": [{"id": 7, "text": "Hiring!", "media": None}], "instructions": "Summarize."}
+
+    packed, report = pack_context("engagement_style_chain_prompt", chain_input, 1000)
+
+    assert packed == {"linkedin_posts": [{"text": "Hiring!"}], "instructions": "Summarize."}
+    assert report["dropped"] == []
+    assert report["tokens_after"] <= report["tokens_before"]
+
+
+def test_websites_are_cut_before_other_inputs_and_short_ones_stay_whole():
+    websites = [
+        {"url": "https://acme.com", "markdown": "acme products " * 400},
+        {"url": "https://acme.com/about", "markdown": "about acme"},
+    ]
+    posts = [{"text": f"post number {index}"} for index in range(5)]
+    chain_input = {"linkedin_companies_websites": websites, "linkedin_posts": posts}
+
+    packed, report = pack_context("about_company_chain_prompt", chain_input, 300)
+
+    assert packed["linkedin_companies_websites"][0]["markdown"].endswith(TRUNCATION_MARKER)
+    assert packed["linkedin_companies_websites"][1] == websites[1]
+    assert packed["linkedin_posts"] == posts
+    assert report["tokens_after"] <= 300
+    assert [line.split(":")[0] for line in report["dropped"]] == ["linkedin_companies_websites"]
+
+
+def test_inputs_are_truncated_in_order_until_the_input_fits():
+    chain_input = {
+        "linkedin_posts": [{"text": f"post number {index} " * 10} for index in range(20)],
+        "news": "news headline " * 200,
+        "linkedin_profile": {"full_name": "Jane Doe", "summary": "leads sales " * 50},
+    }
+
+    packed, report = pack_context("talking_point_chain_prompt", chain_input, 200)
+
+    assert packed["linkedin_posts"] == []
+    assert packed["news"].endswith(TRUNCATION_MARKER)
+    assert packed["linkedin_profile"] == chain_input["linkedin_profile"]
+    assert report["tokens_after"] <= 200
+
+
+def test_inputs_that_cannot_be_cut_are_reported_over_budget():
+    packed, report = pack_context("opportunities_chain_prompt", {"instructions": "Find deals. " * 100}, 50)
+
+    assert packed == {"instructions": "Find deals. " * 100}
+    assert report["dropped"] == [f"still {report['tokens_after'] - 50} tokens over budget"]
+
+
+def test_budgets_are_set_per_prompt(monkeypatch):
+    monkeypatch.setenv("OPPORTUNITIES_CHAIN_PROMPT_BUDGET", "120")
+
+    _, report = pack_context("opportunities_chain_prompt", {"news": "news headline " * 200})
+
+    assert report["budget"] == 120
+    assert report["tokens_after"] <= 120
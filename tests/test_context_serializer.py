@@ -0,0 +1,65 @@
+from typing import Union
+
+from pydantic import BaseModel
+
+import clients.ai_client.ai_client as ai_client_module
+from context_serializer import compact, serialize_context
+
+
+class Headline(BaseModel):
+    title: str
+    link: Union[str, None] = None
+
+
+def test_compact_drops_internal_fields_and_empty_values_at_every_depth():
+    post = {
+        "id": 4, "linkedin_profile_id": 1, "text": "Hiring!", "media": [], "created_at": "2026-10-01",
+        "stats": {"total_reactions": 12, "comments": 0, "reposts": None},
+        "comments": [{"id": 9, "text": ""}],
+    }
+
+    assert compact(post) == {"text": "Hiring!", "stats": {"total_reactions": 12, "comments": 0}}
+
+
+def test_records_render_as_indented_lines():
+    company = {
+        "name": "Acme", "description": "Robots.\nFor warehouses.",
+        "locations": [{"city": "Berlin", "country": "DE"}, {"city": "Austin"}],
+        "updates": [],
+    }
+
+    assert serialize_context([company, Headline(title="Acme raises $10M")]) == (
+        "- name: Acme\n"
+        "  description: Robots.\n"
+        "    For warehouses.\n"
+        "  locations:\n"
+        "    - city: Berlin\n"
+        "      country: DE\n"
+        "    - city: Austin\n"
+        "- title: Acme raises $10M"
+    )
+
+
+def test_empty_contexts_render_as_nothing():
+    assert serialize_context([{"id": 1, "text": None}]) == ""
+    assert serialize_context({}) == ""
+
+
+def test_chain_inputs_reach_the_prompt_serialized(fake_ai_client):
+    ai_client = fake_ai_client([])
+    chain_input = {"linkedin_posts": [{"id": 4, "text": "Hiring!", "media": None}], "instructions": "Summarize."}
+
+    prepared, prefix_message = ai_client.prepare_chain_input("engagement_style_chain_prompt", chain_input)
+
+    assert prepared == {"linkedin_posts": "- text: Hiring!", "instructions": "Summarize."}
+    assert prefix_message is None
+
+
+def test_chain_inputs_keep_their_values_without_compact_context(fake_ai_client, monkeypatch):
+    monkeypatch.setattr(ai_client_module, "COMPACT_CONTEXT_ENABLED", False)
+    ai_client = fake_ai_client([])
+    chain_input = {"linkedin_posts": [{"id": 4, "text": "Hiring!"}], "instructions": "Summarize."}
+
+    prepared, _ = ai_client.prepare_chain_input("engagement_style_chain_prompt", chain_input)
+
+    assert prepared == {"linkedin_posts": [{"text": "Hiring!"}], "instructions": "Summarize."}
@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+import clients.web_scrapper_client.web_scrapper_client as web_scrapper_client
+from crawler_pool import CrawlerPool
+
+
+class _Crawler:
+    def __init__(self):
+        self.running = self.most_running = 0
+
+    async def arun(self, url):
+        self.running += 1
+        self.most_running = max(self.most_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if "broken" in url:
+            raise RuntimeError("page crashed")
+        return SimpleNamespace(markdown=f"# {url}")
+
+
+def test_pool_crawls_hold_a_page_slot_of_their_browser():
+    pool, crawler = CrawlerPool(pages_per_browser=2), _Crawler()
+
+    async def main():
+        pool._crawlers = [(crawler, asyncio.Semaphore(pool.pages_per_browser))]
+        urls = ["https://a", "https://broken", "https://c", "https://d"]
+        return await asyncio.gather(*(pool._arun(url) for url in urls), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [getattr(result, "markdown", None) for result in results] == [
+        "# https://a", None, "# https://c", "# https://d"
+    ]
+    assert crawler.most_running == 2
+
+
+def _fake_pool(monkeypatch):
+    def crawl(url, timeout=None):
+        if "slow" in url:
+            raise TimeoutError()
+        if "broken" in url:
+            raise RuntimeError("page crashed")
+        return SimpleNamespace(markdown=f"# {url}")
+
+    async def acrawl(url):
+        return crawl(url)
+
+    monkeypatch.setattr(web_scrapper_client, "crawler_pool", SimpleNamespace(crawl=crawl, acrawl=acrawl))
+
+
+def test_crawl_pages_keeps_the_pages_that_loaded(monkeypatch):
+    _fake_pool(monkeypatch)
+    urls = ["https://a", "https://slow", "https://broken", "https://d"]
+
+    assert web_scrapper_client.crawl_pages(urls) == ["# https://a", "", "", "# https://d"]
+    assert asyncio.run(web_scrapper_client.acrawl_pages(urls)) == ["# https://a", "", "", "# https://d"]
@@ -0,0 +1,203 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import deadlines
+from deadlines import ahedged, hedged, with_deadline
+
+
+@pytest.fixture
+def hedge_serp(monkeypatch):
+    monkeypatch.setitem(deadlines.hedge_delays, "serp", 0.05)
+
+
+def _slow_first_call(result="fast"):
+    calls = []
+    lock = threading.Lock()
+
+    def fetch():
+        with lock:
+            calls.append(len(calls))
+            first = len(calls) == 1
+        if first:
+            time.sleep(1)
+            return "slow"
+        return result
+
+    return fetch, calls
+
+
+def test_slow_read_is_hedged_and_the_first_success_wins(hedge_serp):
+    fetch, calls = _slow_first_call()
+
+    assert hedged("serp", fetch) == "fast"
+    assert len(calls) == 2
+
+
+def test_hedging_is_off_without_a_hedge_delay():
+    fetch, calls = _slow_first_call()
+
+    assert hedged("proxycurl", fetch) == "slow"
+    assert len(calls) == 1
+
+
+def test_hedged_read_raises_only_when_every_attempt_failed(hedge_serp):
+    def fail():
+        time.sleep(0.1)
+        raise ValueError("down")
+
+    with pytest.raises(ValueError, match="down"):
+        hedged("serp", fail)
+
+
+def test_async_hedge_cancels_the_losing_attempt(hedge_serp):
+    attempts = []
+
+    async def fetch():
+        attempts.append(asyncio.current_task())
+        if len(attempts) == 1:
+            await asyncio.sleep(1)
+            return "slow"
+        return "fast"
+
+    async def run():
+        result = await ahedged("serp", fetch)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == "fast"
+    assert attempts[0].cancelled()
+
+
+def test_nodes_past_their_deadline_return_the_empty_result():
+    def slow_node(state):
+        time.sleep(1)
+        return {"google_news": ["late"]}
+
+    async def aslow_node(state):
+        await asyncio.sleep(1)
+        return {"google_news": ["late"]}
+
+    empty_result = {"google_news": []}
+    assert with_deadline("fetch_google_news", slow_node, empty_result, 0.05)({}) == empty_result
+    assert asyncio.run(with_deadline("fetch_google_news", aslow_node, empty_result, 0.05)({})) == empty_result
+
+
+def test_node_errors_within_the_deadline_are_raised():
+    def failing_node(state):
+        raise RuntimeError("Proxycurl is down")
+
+    with pytest.raises(RuntimeError, match="Proxycurl is down"):
+        with_deadline("fetch_linkedin_profile", failing_node, {}, 1)({})
+
+
+
+class _Table:
+    def insert(self, rows):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+class _AsyncTable(_Table):
+    async def execute(self):
+        return super().execute()
+
+
+class _Builder(dict):
+    def add_node(self, label, function):
+        self[label] = function
+
+
+@pytest.fixture
+def news_node(monkeypatch):
+    """
+    Return a builder of the Google News fetch node, wired as in the graph, whose first SERP call is slow.
+    The number of SERP calls made is kept on `calls`.
+    """
+    import clients.serp.google_news as google_news
+    from graph import SDRAgent
+
+    monkeypatch.setenv("SERP_URL", "https://serp.test/search")
+    monkeypatch.setenv("SERP_API_KEY", "test")
+    monkeypatch.setattr(google_news, "supabase_client", SimpleNamespace(table=lambda name: _Table()))
+
+    async def get_async_supabase_client():
+        return SimpleNamespace(table=lambda name: _AsyncTable())
+
+    monkeypatch.setattr(google_news, "get_async_supabase_client", get_async_supabase_client)
+    calls = []
+
+    def news():
+        calls.append(1)
+        return {"news_results": [{"title": f"Attempt {len(calls)}"}]}
+
+    def call_api(*args, **kwargs):
+        result = news()
+        if len(calls) == 1:
+            time.sleep(1)
+        return result
+
+    async def acall_api(*args, **kwargs):
+        result = news()
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return result
+
+    monkeypatch.setattr(google_news, "call_api", call_api)
+    monkeypatch.setattr(google_news, "acall_api", acall_api)
+
+    def node(asynchronous=False):
+        agent, builder = SDRAgent(progress_callback=lambda *args: None), _Builder()
+        agent._add_nodes_from_dict(builder, agent._async_graph_nodes() if asynchronous else agent._graph_nodes())
+        return builder["fetch_google_news"]
+
+    node.calls = calls
+    return node
+
+
+STATE = {"linkedin_profile": {"id": 1, "full_name": "Jane Doe"}}
+
+
+def test_fetch_nodes_return_the_hedged_read(news_node, hedge_serp):
+    assert [news["title"] for news in news_node()(STATE)["google_news"]] == ["Attempt 2"]
+    assert len(news_node.calls) == 2
+
+
+def test_async_fetch_nodes_return_the_hedged_read(news_node, hedge_serp):
+    result = asyncio.run(news_node(asynchronous=True)(STATE))
+
+    assert [news["title"] for news in result["google_news"]] == ["Attempt 2"]
+    assert len(news_node.calls) == 2
+
+
+def test_fetch_nodes_past_their_deadline_let_the_run_continue(news_node, monkeypatch):
+    monkeypatch.setenv("FETCH_GOOGLE_NEWS_DEADLINE", "0.05")
+
+    assert news_node()(STATE) == {"google_news": []}
+
+
+def test_async_fetch_nodes_past_their_deadline_let_the_run_continue(news_node, monkeypatch):
+    monkeypatch.setenv("FETCH_GOOGLE_NEWS_DEADLINE", "0.05")
+
+    assert asyncio.run(news_node(asynchronous=True)(STATE)) == {"google_news": []}
+
+
+def test_sections_past_their_deadline_leave_their_section_empty(monkeypatch):
+    from graph import SDRAgent
+
+    monkeypatch.setenv("PROCESS_GOOGLE_NEWS_DEADLINE", "0.05")
+    agent = SDRAgent(progress_callback=lambda *args: None)
+
+    def slow_section(state):
+        time.sleep(1)
+        return {"user_google_news": "late", "news_available": True}
+
+    monkeypatch.setattr(agent, "_analysis_nodes", lambda: {"process_google_news": slow_section})
+
+    assert agent._section_nodes()["process_google_news"]({}) == {"user_google_news": "", "news_available": False}
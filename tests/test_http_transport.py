@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_transport import HTTP_RETRY_MAX_WAIT, HttpTransport, retry_delay
+
+
+def test_retry_after_is_honoured_up_to_the_maximum_wait():
+    assert retry_delay(0, "2") == 2.0
+    assert retry_delay(0, str(HTTP_RETRY_MAX_WAIT * 10)) == HTTP_RETRY_MAX_WAIT
+    assert 3 < retry_delay(0, formatdate(time.time() + 5, usegmt=True)) <= 5
+    assert retry_delay(3, "-5") == 0.0
+
+
+def test_backoff_is_jittered_within_the_exponential_bound():
+    delays = [retry_delay(2) for _ in range(200)]
+    assert all(0 <= delay <= 0.5 * 2 ** 2 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_only_retryable_statuses_are_retried_while_attempts_remain():
+    transport = HttpTransport(max_retries=2)
+    assert transport._retry(0, 503, "0") == 0.0
+    assert transport._retry(1, 429, "0") == 0.0
+    assert transport._retry(2, 503, "0") is None
+    assert transport._retry(0, 404) is None
+
+
+@pytest.fixture
+def flaky_server():
+    statuses = [503, 503, 200]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status = statuses.pop(0) if statuses else 200
+            body = b'{"ok": true}'
+            self.send_response(status)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/", statuses
+    server.shutdown()
+
+
+def test_requests_are_retried_until_they_succeed(flaky_server):
+    url, statuses = flaky_server
+
+    assert HttpTransport(max_retries=3).request("get", url).json() == {"ok": True}
+    assert statuses == []
+
+
+def test_error_status_is_raised_once_retries_are_exhausted(flaky_server):
+    url, _ = flaky_server
+
+    with pytest.raises(requests.HTTPError):
+        HttpTransport(max_retries=1).request("get", url)
+
+
+def test_async_clients_are_closed_with_their_loop(flaky_server):
+    url, _ = flaky_server
+    transport = HttpTransport(max_retries=3)
+
+    async def run():
+        response = await transport.arequest("get", url)
+        return response.json(), await transport._async_client(url)
+
+    body, client = asyncio.run(run())
+
+    assert body == {"ok": True}
+    assert client.is_closed
@@ -0,0 +1,31 @@
+import json
+import time
+
+from instrumentation import annotate_span, span, trace_run
+
+
+def test_trace_records_nested_spans_and_the_critical_path(tmp_path):
+    with trace_run("run-1", tmp_path) as trace:
+        with span("fetch_linkedin_profile", "node"):
+            with span("proxycurl", "http") as record:
+                annotate_span(hedged=True)
+                record["bytes"] = 100
+            time.sleep(0.01)
+        with span("fetch_google_news", "node"):
+            with span("serp", "http"):
+                pass
+
+    path = [step["node"] for step in trace.critical_path()]
+    assert path == ["fetch_linkedin_profile", "fetch_google_news"]
+
+    written = json.loads((tmp_path / "run-1.json").read_text(encoding="utf-8"))
+    proxycurl = next(span for span in written["spans"] if span["name"] == "proxycurl")
+    assert proxycurl["hedged"] is True
+    assert written["summary"]["external_calls"]["proxycurl"]["bytes"] == 100
+
+
+def test_spans_outside_a_run_only_yield_their_record():
+    with span("serp", "http", url="https://serpapi.com") as record:
+        annotate_span(hedged=True)
+
+    assert record == {"name": "serp", "kind": "http", "url": "https://serpapi.com"}
@@ -0,0 +1,45 @@
+from knowledge_base import KnowledgeBaseCache
+
+
+class FakeKnowledgeBase(KnowledgeBaseCache):
+    def __init__(self, row):
+        super().__init__(knowledge_base_id=1, check_interval=0)
+        self.stored_row = row
+        self.queries = []
+
+    def _query(self, columns):
+        self.queries.append(columns)
+        return dict(self.stored_row) if columns == "*" else {"updated_at": self.stored_row.get("updated_at")}
+
+
+def test_unchanged_updated_at_is_checked_without_reading_the_row():
+    knowledge_base = FakeKnowledgeBase({"pitch": "Video for every classroom.", "updated_at": "2026-10-01T00:00:00"})
+    snapshot = knowledge_base.get()
+
+    knowledge_base._refresh()
+
+    assert knowledge_base.snapshot is snapshot
+    assert knowledge_base.queries == ["*", "updated_at"]
+
+
+def test_changed_updated_at_reloads_the_row():
+    knowledge_base = FakeKnowledgeBase({"pitch": "Video for every classroom.", "updated_at": "2026-10-01T00:00:00"})
+    knowledge_base.get()
+    knowledge_base.stored_row = {"pitch": "Video for every team.", "updated_at": "2026-10-02T00:00:00"}
+
+    knowledge_base._refresh()
+
+    assert knowledge_base.snapshot.row["pitch"] == "Video for every team."
+
+
+def test_rows_without_updated_at_are_versioned_by_content():
+    knowledge_base = FakeKnowledgeBase({"pitch": "Video for every classroom."})
+    snapshot = knowledge_base.get()
+
+    knowledge_base._refresh()
+    assert knowledge_base.snapshot is snapshot
+
+    knowledge_base.stored_row = {"pitch": "Video for every team."}
+    knowledge_base._refresh()
+    assert knowledge_base.snapshot is not snapshot
+    assert knowledge_base.snapshot.row["pitch"] == "Video for every team."
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from linkedin_profile_cache import LinkedinProfileCache, fetched_at, profile_payload, public_identifier
+
+DAY = 24 * 3600
+
+
+def _row(row_id, days_ago, **payload):
+    created_at = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    return {"id": row_id, "created_at": created_at.isoformat(), "public_identifier": "jane-doe", **payload}
+
+
+class _Rows:
+    def __init__(self, rows):
+        self.data = rows
+
+    def execute(self):
+        return self
+
+
+@pytest.mark.parametrize("url, identifier", [
+    ("https://www.linkedin.com/in/jane-doe/", "jane-doe"),
+    ("https://uk.linkedin.com/in/Jane-Doe/?originalSubdomain=uk", "jane-doe"),
+    ("linkedin.com/pub/jane-doe/details/experience", "jane-doe"),
+    ("https://www.linkedin.com/company/acme/", None),
+    ("https://example.com/in/jane-doe/", None),
+])
+def test_public_identifier(url, identifier):
+    assert public_identifier(url) == identifier
+
+
+def test_payload_excludes_row_columns():
+    assert profile_payload(_row(1, 0, headline="CTO")) == {"public_identifier": "jane-doe", "headline": "CTO"}
+
+
+def test_fetched_at_is_the_oldest_copy_of_the_latest_payload():
+    rows = [_row(3, 1, headline="CTO"), _row(2, 5, headline="CTO"), _row(1, 9, headline="VP")]
+    assert fetched_at(rows) == pytest.approx(datetime.fromisoformat(rows[1]["created_at"]).timestamp())
+
+
+def test_copies_do_not_extend_the_ttl():
+    cache = LinkedinProfileCache(ttl=7 * DAY)
+    # Fetched 8 days ago and copied by a report 2 days ago: stale although the latest row is recent.
+    rows = [_row(2, 2, headline="CTO"), _row(1, 8, headline="CTO")]
+    cache._select = lambda client, identifier: _Rows(rows)
+
+    assert cache.get("jane-doe") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_database_hit_is_indexed_with_its_fetch_time():
+    cache = LinkedinProfileCache(ttl=7 * DAY)
+    rows = [_row(2, 1, headline="CTO"), _row(1, 3, headline="CTO")]
+    cache._select = lambda client, identifier: _Rows(rows)
+
+    cached = cache.get("jane-doe")
+    assert cached.payload == {"public_identifier": "jane-doe", "headline": "CTO"}
+    assert cached.fetched_at == pytest.approx(datetime.fromisoformat(rows[1]["created_at"]).timestamp())
+
+    cache._select = None
+    assert cache.get("jane-doe") == cached
+    assert cache.stats() == {"index_hits": 1, "database_hits": 1, "misses": 0, "hits": 2, "hit_rate": 1.0}
+
+
+def test_put_keeps_the_original_fetch_time_of_a_copy():
+    cache = LinkedinProfileCache(ttl=7 * DAY)
+    original = datetime.now(timezone.utc) - timedelta(days=8)
+    cache.put(_row(5, 0, headline="CTO"), "jane-doe", original.timestamp())
+
+    cache._select = lambda client, identifier: _Rows([])
+    assert cache.get("jane-doe") is None
+
+
+def test_returned_payload_is_a_copy():
+    cache = LinkedinProfileCache()
+    cache.put(_row(1, 0, experiences=[{"company": "Acme"}]))
+
+    cache.get("jane-doe").payload["experiences"].clear()
+    assert cache.get("jane-doe").payload["experiences"] == [{"company": "Acme"}]
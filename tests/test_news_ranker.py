@@ -0,0 +1,50 @@
+from clients.serp.news_ranker import rank_news
+
+PROSPECT = {
+    "full_name": "Jane Doe",
+    "experiences": [
+        {"company": "Acme Robotics", "ends_at": None},
+        {"company": "Globex", "ends_at": {"year": 2020}},
+    ],
+}
+
+
+def _news(position, title, source_name="Daily News"):
+    return {"position": position, "title": title, "source_name": source_name, "link": f"https://news/{position}"}
+
+
+def test_articles_naming_the_prospect_rank_first():
+    news = [
+        _news(1, "Acme Robotics raises new funding"),
+        _news(2, "Jane Doe named CTO of Acme Robotics"),
+        _news(3, "Jane Doe speaks at robotics summit"),
+    ]
+
+    ranked = rank_news(news, PROSPECT)
+
+    assert [item["position"] for item in ranked] == [2, 3]
+    assert ranked[0]["score"] == 1.0
+
+
+def test_last_name_alone_needs_an_employer():
+    news = [_news(1, "John Doe wins marathon"), _news(2, "Doe leads Globex spin-off")]
+
+    assert [item["position"] for item in rank_news(news, PROSPECT)] == [2]
+
+
+def test_syndicated_copies_are_kept_once_and_the_limit_holds():
+    news = [
+        _news(1, "Jane Doe named CTO of Acme Robotics", "Reuters"),
+        _news(2, "Jane Doe named CTO of Acme Robotics - report", "Yahoo"),
+        _news(3, "Jane Doe on the future of warehouse robots"),
+        _news(4, "Jane Doe joins the board of a robotics nonprofit"),
+    ]
+
+    ranked = rank_news(news, PROSPECT, limit=2)
+
+    assert [item["position"] for item in ranked] == [1, 3]
+
+
+def test_results_without_a_link_or_profile_are_dropped():
+    assert rank_news([{"title": "Jane Doe named CTO of Acme Robotics"}], PROSPECT) == []
+    assert rank_news([_news(1, "Jane Doe named CTO")], None) == []
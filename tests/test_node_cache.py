@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from langchain_core.exceptions import OutputParserException
+
+from node_cache import NodeResultCache, fingerprint
+
+
+def test_fingerprint_ignores_row_ids_and_timestamps():
+    company = {"name": "Acme", "website": "https://acme.ai"}
+    fetched = fingerprint("about_company", "prompt:prod", "model", [{**company, "id": 1, "created_at": "2026-01-01"}])
+    refetched = fingerprint("about_company", "prompt:prod", "model", [{**company, "id": 7, "created_at": "2026-02-01"}])
+
+    assert fetched == refetched
+    assert fetched != fingerprint("about_company", "prompt:prod", "model", [{**company, "name": "Acme Inc"}])
+    assert fetched != fingerprint("news", "prompt:prod", "model", [{**company, "id": 1}])
+
+
+def test_results_expire_and_are_counted_per_node(tmp_path):
+    cache = NodeResultCache(path=str(tmp_path / "cache.sqlite"), ttl=3600)
+    cache.set("key", "about_company", "prompt", "model", "Acme builds robots.")
+
+    assert cache.get("key", "about_company") == "Acme builds robots."
+    assert cache.get("other", "news") is None
+
+    cache.ttl = 0
+    assert cache.get("key", "about_company") is None
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 2,
+        "hit_rate": 0.333,
+        "nodes": {"about_company": {"hits": 1, "misses": 1}, "news": {"hits": 0, "misses": 1}},
+    }
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = NodeResultCache(path=str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.set("first", "node", "prompt", "model", "1")
+    cache.set("second", "node", "prompt", "model", "2")
+    cache.get("first", "node")
+    cache.set("third", "node", "prompt", "model", "3")
+
+    assert cache.get("first", "node") == "1"
+    assert cache.get("second", "node") is None
+    assert cache.get("third", "node") == "3"
+
+
+def test_async_calls_share_the_cache(tmp_path):
+    cache = NodeResultCache(path=str(tmp_path / "cache.sqlite"))
+
+    async def run():
+        await cache.aset("key", "node", "prompt", "model", "value")
+        return await cache.aget("key", "node")
+
+    assert asyncio.run(run()) == "value"
+    assert cache.get("key", "node") == "value"
+
+
+@pytest.fixture
+def news_available_prompt(monkeypatch):
+    from langchain_core.prompts import ChatPromptTemplate
+
+    from prompt_registry import prompt_registry
+
+    prompt = ChatPromptTemplate.from_messages([("human", "Is any of this news about the prospect? {news}")])
+    monkeypatch.setitem(prompt_registry.local_prompts, "news_available_chain_prompt", prompt)
+
+
+def test_malformed_structured_outputs_are_not_cached(fake_ai_client, news_available_prompt):
+    news = [{"title": "Jane Doe named CTO of Acme"}]
+
+    with pytest.raises(OutputParserException):
+        fake_ai_client(["not json"])._check_google_news_availability_chain(news)
+    assert fake_ai_client.node_cache.stats()["misses"] == 1
+
+    assert fake_ai_client(['{"news_available": true}'])._check_google_news_availability_chain(news).news_available
+    # The valid output was cached: a model without answers is not called again.
+    assert fake_ai_client([])._check_google_news_availability_chain(news).news_available
+    assert fake_ai_client.node_cache.stats()["hits"] == 1
+
+
+def test_async_chains_cache_only_parsed_outputs(fake_ai_client, news_available_prompt):
+    news = [{"title": "Jane Doe named CTO of Acme"}]
+
+    with pytest.raises(OutputParserException):
+        asyncio.run(fake_ai_client(["not json"])._acheck_google_news_availability_chain(news))
+
+    output = asyncio.run(fake_ai_client(['{"news_available": false}'])._acheck_google_news_availability_chain(news))
+    assert output.news_available is False
+    assert asyncio.run(fake_ai_client([])._acheck_google_news_availability_chain(news)).news_available is False
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import time
+
+import pytest
+from langchain_core.prompts import ChatPromptTemplate
+
+from prompt_registry import PromptRegistry
+
+
+class LangSmith:
+    """
+    Stand-in for the LangSmith client, serving version `version` of every prompt unless it is down.
+    """
+
+    def __init__(self):
+        self.version = 1
+        self.down = False
+        self.pulls = []
+
+    def pull_prompt(self, prompt_identifier):
+        self.pulls.append(prompt_identifier)
+        if self.down:
+            raise ConnectionError("LangSmith is unreachable")
+        return ChatPromptTemplate.from_messages([("human", f"v{self.version}: {{input}}")])
+
+
+def _registry(tmp_path, langsmith, ttl=600):
+    registry = PromptRegistry(tag="test", ttl=ttl, snapshot_path=tmp_path / "prompt_snapshot.json")
+    registry._langsmith_client = langsmith
+    return registry
+
+
+def _version(prompt):
+    return prompt.messages[0].prompt.template.split(":")[0]
+
+
+def _wait_for_refreshes(registry):
+    deadline = time.monotonic() + 5
+    while registry._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_prompts_are_pulled_once_and_snapshotted(tmp_path):
+    langsmith = LangSmith()
+    registry = _registry(tmp_path, langsmith)
+
+    assert _version(registry.get("opportunities")) == "v1"
+    assert _version(asyncio.run(registry.aget("opportunities"))) == "v1"
+    assert langsmith.pulls == ["opportunities:test"]
+    assert list(json.loads(registry.snapshot_path.read_text(encoding="utf-8"))) == ["opportunities"]
+
+
+def test_expired_prompts_are_served_while_they_refresh(tmp_path):
+    langsmith = LangSmith()
+    registry = _registry(tmp_path, langsmith, ttl=0)
+    registry.get("opportunities")
+    langsmith.version = 2
+
+    assert _version(registry.get("opportunities")) == "v1"
+    _wait_for_refreshes(registry)
+    assert _version(registry.get("opportunities")) == "v2"
+    assert _version(registry._load_from_snapshot("opportunities")) == "v2"
+
+
+def test_a_failed_refresh_keeps_the_prompt_served(tmp_path):
+    langsmith = LangSmith()
+    registry = _registry(tmp_path, langsmith, ttl=0)
+    registry.get("opportunities")
+    langsmith.down = True
+
+    registry.get("opportunities")
+    _wait_for_refreshes(registry)
+    assert _version(registry.get("opportunities")) == "v1"
+
+
+def test_the_snapshot_is_used_when_langsmith_is_down(tmp_path):
+    _registry(tmp_path, LangSmith()).preload(["opportunities", "talking_points"])
+    langsmith = LangSmith()
+    langsmith.down, langsmith.version = True, 2
+    registry = _registry(tmp_path, langsmith)
+
+    assert _version(registry.get("opportunities")) == "v1"
+    registry.preload(["talking_points"])
+    assert _version(registry.get("talking_points")) == "v1"
+
+    # The snapshot prompts are stamped as expired, so they are refreshed once LangSmith is back.
+    langsmith.down = False
+    registry.get("opportunities")
+    _wait_for_refreshes(registry)
+    assert _version(registry.get("opportunities")) == "v2"
+
+
+def test_a_prompt_missing_from_langsmith_and_the_snapshot_fails(tmp_path):
+    langsmith = LangSmith()
+    langsmith.down = True
+
+    with pytest.raises(ConnectionError):
+        _registry(tmp_path, langsmith).get("opportunities")
+
+
+def test_registered_prompts_are_not_pulled(tmp_path):
+    langsmith = LangSmith()
+    registry = _registry(tmp_path, langsmith)
+    prompt = ChatPromptTemplate.from_messages([("human", "local: {input}")])
+    registry.register("website_digest", prompt)
+
+    assert registry.get("website_digest") is prompt
+    assert langsmith.pulls == []
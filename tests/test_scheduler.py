@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from graph import SDRAgent
+from scheduler import DependencyScheduler
+
+READS = {"profile": [], "news": [], "points": ["profile_summary", "news_summary"], "email": ["points"]}
+WRITES = {"profile": ["profile_summary"], "news": ["news_summary"], "points": ["points"], "email": ["email"]}
+
+
+def _nodes(log, delay=0.02):
+    def node(name):
+        def run(state):
+            log.append(("start", name, sorted(state)))
+            time.sleep(delay)
+            log.append(("end", name))
+            return {key: name for key in WRITES[name]}
+        return run
+    return {name: node(name) for name in READS}
+
+
+def test_dependencies_are_derived_from_reads_and_writes():
+    scheduler = DependencyScheduler(_nodes([]), READS, WRITES)
+
+    assert scheduler.dependencies == {"profile": [], "news": [], "points": ["news", "profile"], "email": ["points"]}
+    assert scheduler.order == ["news", "profile", "points", "email"]
+    assert "Longest chain (3 sequential nodes)" in scheduler.dependency_report()
+
+
+def test_a_key_written_twice_or_a_cycle_is_rejected():
+    with pytest.raises(ValueError, match="written by both"):
+        DependencyScheduler({"a": None, "b": None}, {}, {"a": ["x"], "b": ["x"]})
+    with pytest.raises(ValueError, match="cycle"):
+        DependencyScheduler({"a": None, "b": None}, {"a": ["y"], "b": ["x"]}, {"a": ["x"], "b": ["y"]})
+
+
+def test_run_starts_nodes_once_their_producers_finish():
+    log, updates = [], []
+    scheduler = DependencyScheduler(_nodes(log), READS, WRITES)
+
+    results, timings = scheduler.run({"linkedin_url": "url"}, lambda node, update: updates.append(node))
+
+    assert results == {"profile_summary": "profile", "news_summary": "news", "points": "points", "email": "email"}
+    starts = [entry for entry in log if entry[0] == "start"]
+    # A node only sees the input state and the produced keys it declared.
+    assert ("start", "points", ["linkedin_url", "news_summary", "profile_summary"]) in starts
+    assert log.index(("start", "points", starts[2][2])) > max(log.index(("end", "news")), log.index(("end", "profile")))
+    assert updates[-1] == "email"
+    assert [step["node"] for step in scheduler.critical_path(timings)][-2:] == ["points", "email"]
+
+
+def test_undeclared_produced_keys_are_not_visible():
+    scheduler = DependencyScheduler(
+        {"a": lambda state: {"x": 1}, "b": lambda state: {"y": state["x"]}},
+        {"a": [], "b": []},
+        {"a": ["x"], "b": ["y"]},
+    )
+    with pytest.raises(KeyError):
+        scheduler.run({})
+
+
+def test_arun_runs_independent_nodes_concurrently():
+    running, most_running = [], []
+
+    def node(name):
+        async def run(state):
+            running.append(name)
+            most_running.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(name)
+            return {key: name for key in WRITES[name]}
+        return run
+
+    scheduler = DependencyScheduler({name: node(name) for name in READS}, READS, WRITES)
+    results, _ = asyncio.run(scheduler.arun({}))
+
+    assert results["email"] == "email"
+    assert max(most_running) == 2
+
+
+def _waiting_edges(graph):
+    edges = {(start, end) for start, end in graph.builder.edges}
+    edges |= {(tuple(sorted(starts)), end) for starts, end in graph.builder.waiting_edges}
+    return edges
+
+
+def test_sections_are_graph_nodes_connected_by_their_declared_reads():
+    graph = SDRAgent(lambda *args: None).create_graph()
+    edges = _waiting_edges(graph)
+
+    assert set(SDRAgent.ANALYSIS_NODE_WRITES) <= set(graph.nodes)
+    assert ("initialize_ai_client", "process_opportunities") in edges
+    assert (("process_google_news", "process_google_publications"), "process_talking_points") in edges
+    assert ("process_google_news", "process_citations") in edges
+    # Only the sections no other section reads from lead to the report.
+    assert (("process_additional_outreaches", "process_citations", "process_outreach_email"),
+            "aggregate_ai_result") in edges
+
+
+def test_dataflow_mode_runs_the_sections_in_one_node(monkeypatch):
+    import graph as graph_module
+
+    monkeypatch.setattr(graph_module, "ANALYSIS_DATAFLOW", True)
+    graph = SDRAgent(lambda *args: None).create_graph()
+
+    assert "analyze_prospect" in graph.nodes and "process_opportunities" not in graph.nodes
+    assert ("initialize_ai_client", "analyze_prospect") in _waiting_edges(graph)
@@ -0,0 +1,62 @@
+from clients.serp.scholar_matcher import ScholarAuthorMatcher, _name_similarity
+
+PROSPECT = {
+    "full_name": "Jane Doe",
+    "work_email": "jane@acme.ai",
+    "headline": "Machine learning lead at Acme",
+    "experiences": [{"company": "Acme Robotics", "title": "Machine Learning Lead"}],
+    "education": [{"school": "Stanford University", "field_of_study": "Computer Science"}],
+}
+
+
+def _candidate(author_id, name, affiliations="", email="", interests=()):
+    return {
+        "author_id": author_id,
+        "name": name,
+        "affiliations": affiliations,
+        "email": email,
+        "interests": [{"title": interest} for interest in interests],
+    }
+
+
+def test_names_match_regardless_of_titles_order_and_initials():
+    assert _name_similarity("Dr. Jane Doe", "Jane Doe") == 1.0
+    assert _name_similarity("Doe, Jane", "Jane Doe") == 1.0
+    assert _name_similarity("J. Doe", "Jane Doe") >= 0.9
+    assert _name_similarity("John Smith", "Jane Doe") < 0.5
+
+
+def test_a_clear_candidate_is_matched_without_the_llm():
+    matcher = ScholarAuthorMatcher()
+    candidates = [
+        _candidate("a1", "Jane Doe", "Acme Robotics", "Verified email at acme.ai", ["Machine Learning"]),
+        _candidate("a2", "Jane Doe", "University of Somewhere", "", ["Medieval History"]),
+        _candidate("a3", "John Smith", "Acme Robotics", "Verified email at acme.ai"),
+    ]
+
+    match = matcher.match(candidates, PROSPECT)
+
+    assert match.author_id == "a1"
+    assert match.ambiguous_profiles == []
+    assert set(match.scores) == {"a1", "a2"}
+    assert matcher.stats() == {"local_match": 1, "total": 1, "llm_rate": 0.0}
+
+
+def test_close_candidates_are_left_to_the_llm():
+    matcher = ScholarAuthorMatcher()
+    candidates = [_candidate("a1", "Jane Doe", "Acme Robotics"), _candidate("a2", "Jane Doe", "Acme Robotics")]
+
+    match = matcher.match(candidates, PROSPECT)
+
+    assert match.author_id is None
+    assert [candidate["author_id"] for candidate in match.ambiguous_profiles] == ["a1", "a2"]
+    assert matcher.stats()["llm_rate"] == 1.0
+
+
+def test_no_similar_name_means_no_candidate():
+    matcher = ScholarAuthorMatcher()
+
+    match = matcher.match([_candidate("a3", "John Smith", "Acme Robotics")], PROSPECT)
+
+    assert match == (None, [], {})
+    assert matcher.stats()["no_candidate"] == 1
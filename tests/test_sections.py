@@ -0,0 +1,50 @@
+import asyncio
+
+
+class StatusMessages(list):
+    def spinner(self, message):
+        self.append(("spinner", message))
+
+    def status(self, message, status_type):
+        self.append((status_type, message))
+
+
+def test_single_pass_sections_keep_only_the_citations_they_were_given(fake_ai_client):
+    ai_client, messages = fake_ai_client([]), StatusMessages()
+
+    output = ai_client.process_with_spinner(
+        "Analyzing profile", lambda: "Jane leads sales [1][9].", ai_client.get_profile_context, None,
+        messages.spinner, messages.status,
+    )
+
+    assert output == "Jane leads sales [1].\n\n"
+    assert messages == [("spinner", "Analyzing profile..."), ("success", "✅ Analyzing profile...")]
+
+
+def test_async_sections_share_the_sync_handling(fake_ai_client):
+    ai_client, messages = fake_ai_client([]), StatusMessages()
+
+    async def chain():
+        return "Jane leads sales [1, 9]."
+
+    output = asyncio.run(ai_client.aprocess_with_spinner(
+        "Analyzing profile", chain, ai_client.get_profile_context, None, messages.spinner, messages.status,
+    ))
+
+    assert output == "Jane leads sales [1].\n\n"
+    assert messages[-1] == ("success", "✅ Analyzing profile...")
+
+
+def test_sections_cite_with_a_second_pass_when_single_pass_is_off(fake_ai_client, monkeypatch):
+    import clients.ai_client.ai_client as ai_client_module
+
+    monkeypatch.setattr(ai_client_module, "SINGLE_PASS_CITATIONS", False)
+    ai_client, messages = fake_ai_client([]), StatusMessages()
+    monkeypatch.setattr(ai_client, "_add_citations_chain", lambda content, context: f"{content} {sorted(context)}")
+
+    output = ai_client.process_with_spinner(
+        "Analyzing profile", lambda: "Jane leads sales.", ai_client.get_profile_context, None,
+        messages.spinner, messages.status,
+    )
+
+    assert output == "Jane leads sales. ['[1]']\n\n"
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+import graph
+from graph import SDRAgent
+
+
+class Events:
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, kind, data):
+        if kind in ("section", "token"):
+            self.events.append((kind, data))
+
+    def of(self, kind):
+        return [data for event_kind, data in self.events if event_kind == kind]
+
+
+def test_stream_events_of_the_sections_reach_the_progress_callback():
+    events = Events()
+    agent = SDRAgent(progress_callback=events)
+
+    agent._publish_stream_event("updates", {"fetch_google_news": {"google_news": []}})
+    agent._publish_stream_event("updates", {
+        "process_google_news": {"user_google_news": "News", "news_available": True}
+    })
+    agent._publish_stream_event("custom", {"section": "process_opportunities", "markdown": "Deals"})
+    agent._publish_stream_event("messages", (AIMessageChunk(content="Dea"), {"section": "process_opportunities"}))
+    agent._publish_stream_event("messages", (
+        AIMessageChunk(content="{}"), {"section": "process_citations", "structured": True}
+    ))
+    agent._publish_stream_event("messages", (AIMessageChunk(content="Hi"), {}))
+
+    assert events.events == [
+        ("section", {"section": "process_google_news", "markdown": "News"}),
+        ("section", {"section": "process_opportunities", "markdown": "Deals"}),
+        ("token", {"section": "process_opportunities", "prompt": None, "text": "Dea"}),
+    ]
+
+
+def _streaming_agent(ai_client, events, asynchronous=False):
+    """
+    Build an agent whose data fetching, PDF and email nodes do nothing and whose AI sections ask the model
+    of `ai_client` for their markdown.
+    """
+    agent = SDRAgent(progress_callback=events)
+
+    def section(name):
+        key = SDRAgent.ANALYSIS_NODE_WRITES[name][0]
+
+        def process(state):
+            output = ai_client.process_with_spinner(
+                name, lambda: ai_client.model.invoke(name).content, None, None,
+                agent.show_spinner_message, agent.show_status_message,
+            )
+            return {**agent._empty_section(name), key: output}
+
+        async def aprocess(state):
+            async def chain():
+                return (await ai_client.model.ainvoke(name)).content
+
+            output = await ai_client.aprocess_with_spinner(
+                name, chain, None, None, agent.show_spinner_message, agent.show_status_message,
+            )
+            return {**agent._empty_section(name), key: output}
+
+        return aprocess if asynchronous else process
+
+    sections = {name: section(name) for name in SDRAgent.ANALYSIS_NODE_WRITES}
+    agent._analysis_nodes = agent._async_analysis_nodes = lambda: sections
+    agent._graph_nodes = agent._async_graph_nodes = lambda: {
+        **{name: lambda state: {} for name in SDRAgent.FETCH_NODE_EMPTY_RESULTS},
+        "initialize_ai_client": lambda state: {},
+        **agent._analysis_graph_nodes(asynchronous),
+        "aggregate_ai_result": lambda state: {"profile_info_markdown": "", "result": ""},
+        "create_pdf": lambda state: {},
+        "send_email": lambda state: {},
+    }
+    return agent
+
+
+@pytest.fixture
+def checkpoint_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph, "CHECKPOINT_DB_PATH", str(tmp_path / "checkpoints.sqlite"))
+
+
+def _assert_every_section_is_streamed(events):
+    sections = {event["section"]: event["markdown"] for event in events.of("section")}
+    assert set(sections) == set(SDRAgent.ANALYSIS_NODE_WRITES)
+    assert sections["process_opportunities"] == "Insight\n\n"
+
+    drafts = {}
+    for event in events.of("token"):
+        drafts[event["section"]] = drafts.get(event["section"], "") + event["text"]
+    assert drafts == {name: "Insight" for name in SDRAgent.ANALYSIS_NODE_WRITES}
+
+
+def test_streamed_runs_publish_every_section_and_its_tokens(fake_ai_client, checkpoint_db):
+    events = Events()
+    agent = _streaming_agent(fake_ai_client(["Insight"]), events)
+
+    result = agent.invoke_graph("https://www.linkedin.com/in/jane-doe/", "sdr@example.com", stream_sections=True)
+
+    assert result[0] == 200
+    _assert_every_section_is_streamed(events)
+
+
+def test_async_streamed_runs_publish_every_section_and_its_tokens(fake_ai_client, checkpoint_db):
+    events = Events()
+    agent = _streaming_agent(fake_ai_client(["Insight"]), events, asynchronous=True)
+
+    result = asyncio.run(agent.ainvoke_graph(
+        "https://www.linkedin.com/in/jane-doe/", "sdr@example.com", stream_sections=True
+    ))
+
+    assert result[0] == 200
+    _assert_every_section_is_streamed(events)
@@ -0,0 +1,30 @@
+from clients.ai_client.ai_client import AIClient
+from website_digest import WEBSITE_DIGEST_CHUNK_SIZE, combine_digest, digest_chunk_inputs, needs_digest
+
+
+def _website(url, size):
+    return {"id": 1, "url": url, "markdown": "# About\n\n" + "word " * (size // 5)}
+
+
+def test_only_long_undigested_websites_need_a_digest():
+    assert not needs_digest(_website("https://short.example", WEBSITE_DIGEST_CHUNK_SIZE // 2))
+    assert needs_digest(_website("https://long.example", WEBSITE_DIGEST_CHUNK_SIZE * 2))
+    assert not needs_digest({**_website("https://long.example", WEBSITE_DIGEST_CHUNK_SIZE * 2), "digest": "notes"})
+
+
+def test_chunk_inputs_number_their_parts():
+    chunk_inputs = digest_chunk_inputs(_website("https://long.example", WEBSITE_DIGEST_CHUNK_SIZE * 2))
+    assert len(chunk_inputs) > 1
+    assert [chunk_input["part"] for chunk_input in chunk_inputs] == list(range(1, len(chunk_inputs) + 1))
+    assert {chunk_input["parts"] for chunk_input in chunk_inputs} == {len(chunk_inputs)}
+
+
+def test_digests_are_set_on_the_websites_and_failures_keep_the_markdown():
+    ai_client = AIClient.__new__(AIClient)
+    digested, failed = _website("https://a.example", 100), _website("https://b.example", 100)
+    chunks = [(digested, {}), (digested, {}), (failed, {}), (failed, {})]
+
+    ai_client._set_website_digests(chunks, ["- one", "- two", "- three", RuntimeError("rate limited")])
+
+    assert digested["digest"] == combine_digest(digested, ["- one", "- two"])
+    assert "digest" not in failed
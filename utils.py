@@ -4,12 +4,17 @@ from datetime import datetime
 
 import markdown2
 import pdfkit
-import requests
 import streamlit as st
 
+from http_transport import http_transport
 
-def call_api(method, url, headers, params=None):
-    response = requests.request(method=method, url=url, params=params, headers=headers)
+
+def call_api(method, url, headers, params=None, provider=None):
+    return http_transport.request(method, url, headers=headers, params=params, provider=provider).json()
+
+
+async def acall_api(method, url, headers, params=None, provider=None):
+    response = await http_transport.arequest(method, url, headers=headers, params=params, provider=provider)
     return response.json()
 
 
@@ -0,0 +1,55 @@
+from decouple import config
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_text_splitters import MarkdownTextSplitter
+
+from prompt_registry import prompt_registry
+
+WEBSITE_DIGEST_ENABLED = config("WEBSITE_DIGEST_ENABLED", default=True, cast=bool)
+# Characters of website markdown per summarized chunk. Shorter websites are used as their own digest.
+WEBSITE_DIGEST_CHUNK_SIZE = config("WEBSITE_DIGEST_CHUNK_SIZE", default=12000, cast=int)
+WEBSITE_DIGEST_CHUNK_OVERLAP = config("WEBSITE_DIGEST_CHUNK_OVERLAP", default=300, cast=int)
+# Chunks summarized per website; the rest of a very long crawl is left out of the digest.
+WEBSITE_DIGEST_MAX_CHUNKS = config("WEBSITE_DIGEST_MAX_CHUNKS", default=8, cast=int)
+
+WEBSITE_DIGEST_PROMPT_NAME = "website_digest_chunk_prompt"
+
+WEBSITE_DIGEST_PROMPT = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        "You condense crawled company websites into notes for a sales research report. Keep concrete facts: what "
+        "the company does, products and services, customers and industries served, pricing, partnerships, "
+        "locations, size, hiring, funding, recent announcements and dates. Leave out navigation, cookie banners, "
+        "legal text and marketing filler. Answer with a short markdown bullet list and nothing else.",
+    ),
+    (
+        "human",
+        "Company website: {url}\nPart {part} of {parts} of the crawled markdown:\n\n{markdown}",
+    ),
+])
+prompt_registry.register(WEBSITE_DIGEST_PROMPT_NAME, WEBSITE_DIGEST_PROMPT)
+
+
+def split_website_markdown(markdown):
+    """
+    Split crawled website markdown into the chunks that are summarized for its digest, along markdown
+    headings where possible.
+    """
+    splitter = MarkdownTextSplitter(chunk_size=WEBSITE_DIGEST_CHUNK_SIZE, chunk_overlap=WEBSITE_DIGEST_CHUNK_OVERLAP)
+    return splitter.split_text(markdown)[:WEBSITE_DIGEST_MAX_CHUNKS]
+
+
+def needs_digest(website):
+    markdown = website.get("markdown") or ""
+    return not website.get("digest") and len(markdown) > WEBSITE_DIGEST_CHUNK_SIZE
+
+
+def digest_chunk_inputs(website):
+    chunks = split_website_markdown(website.get("markdown") or "")
+    return [
+        {"url": website.get("url"), "part": part, "parts": len(chunks), "markdown": chunk}
+        for part, chunk in enumerate(chunks, start=1)
+    ]
+
+
+def combine_digest(website, summaries):
+    return f"Digest of {website.get('url')}:\n\n" + "\n\n".join(summary.strip() for summary in summaries if summary)